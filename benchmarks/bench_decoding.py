@@ -0,0 +1,109 @@
+"""
+Decoding Benchmark
+
+Compares decoding table results of the SQL library with the standard json module
+and with the fastest backend installed (orjson or msgspec), from the JSON string to
+a ResultSet. The payloads are synthetic JDBC results of 10k, 100k and 1M cells.
+
+Usage:
+    python benchmarks/bench_decoding.py [--repeat N]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "src", "main", "python")
+)
+
+from opensearchsql_cli.query import decoding
+from opensearchsql_cli.query.result_set import ResultSet
+
+SCHEMA = [
+    {"name": "id", "type": "long"},
+    {"name": "latency", "type": "double"},
+    {"name": "status", "type": "integer"},
+    {"name": "method", "type": "keyword"},
+    {"name": "path", "type": "text"},
+]
+
+CELLS = (10_000, 100_000, 1_000_000)
+
+
+def payload(cells):
+    """
+    Build a JDBC result with about the given number of cells
+    """
+    rng = random.Random(cells)
+    rows = cells // len(SCHEMA)
+    datarows = [
+        [
+            i,
+            rng.random() * 1000,
+            rng.choice((200, 201, 404, 500)),
+            rng.choice(("GET", "POST", "PUT", "DELETE")),
+            f"/api/v1/items/{rng.randrange(1_000_000)}",
+        ]
+        for i in range(rows)
+    ]
+    return json.dumps(
+        {"schema": SCHEMA, "datarows": datarows, "total": rows, "size": rows}
+    )
+
+
+def best_of(repeat, function):
+    """
+    Best duration of a call, in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return min(durations)
+
+
+def decode_with(backend, text):
+    """
+    Decode a result into a ResultSet with the given backend
+    """
+    saved = decoding.BACKEND
+    decoding.BACKEND = backend
+    try:
+        return ResultSet.from_json(text)
+    finally:
+        decoding.BACKEND = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = ["json"]
+    if decoding.BACKEND != "json":
+        backends.append(decoding.BACKEND)
+    else:
+        print("orjson and msgspec are not installed, only json is measured")
+
+    print(f"{'cells':>10} {'bytes':>12} {'json.loads':>12}", end="")
+    for backend in backends:
+        print(f" {backend + ' ResultSet':>18}", end="")
+    print()
+
+    for cells in CELLS:
+        text = payload(cells)
+        baseline = best_of(args.repeat, lambda: json.loads(text))
+        print(f"{cells:>10,} {len(text):>12,} {baseline * 1000:>10.1f}ms", end="")
+        for backend in backends:
+            duration = best_of(args.repeat, lambda: decode_with(backend, text))
+            print(f" {duration * 1000:>9.1f}ms ({baseline / duration:>4.1f}x)", end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     install_requires=install_requirements,
+    extras_require={"fast": ["orjson>=3.9"]},
     entry_points={"console_scripts": ["opensearchsql=opensearchsql_cli.main:main"]},
     classifiers=[
         "Intended Audience :: Developers",
@@ -3,6 +3,7 @@
  * SPDX-License-Identifier: Apache-2.0
  */
 
+import client.ClientOptions;
 import java.io.File;
 import java.io.FileReader;
 import java.io.IOException;
@@ -161,6 +162,158 @@ public class Config {
     }
   }
 
+  /**
+   * Get options for the OpenSearch REST client
+   *
+   * @return ClientOptions object with values from the ClientSettings section of the config file
+   */
+  public static ClientOptions getClientOptions() {
+    ClientOptions.ClientOptionsBuilder builder = ClientOptions.builder();
+
+    try {
+      // Load the YAML configuration
+      loadConfig();
+
+      // SCHEDULER_POOL_SIZE
+      if (yamlConfig.containsKey("ClientSettings.SCHEDULER_POOL_SIZE")) {
+        builder.schedulerPoolSize(yamlConfig.getInt("ClientSettings.SCHEDULER_POOL_SIZE"));
+      }
+
+      // SCHEDULER_QUEUE_SIZE
+      if (yamlConfig.containsKey("ClientSettings.SCHEDULER_QUEUE_SIZE")) {
+        builder.schedulerQueueSize(yamlConfig.getInt("ClientSettings.SCHEDULER_QUEUE_SIZE"));
+      }
+
+      // PREFETCH_DEPTH
+      if (yamlConfig.containsKey("ClientSettings.PREFETCH_DEPTH")) {
+        builder.prefetchDepth(yamlConfig.getInt("ClientSettings.PREFETCH_DEPTH"));
+      }
+
+      // ENDPOINTS
+      if (yamlConfig.containsKey("ClientSettings.ENDPOINTS")) {
+        builder.endpoints(yamlConfig.getList(String.class, "ClientSettings.ENDPOINTS"));
+      }
+
+      // SNIFF_NODES
+      if (yamlConfig.containsKey("ClientSettings.SNIFF_NODES")) {
+        builder.sniffNodes(yamlConfig.getBoolean("ClientSettings.SNIFF_NODES"));
+      }
+
+      // SNIFF_INTERVAL_SECONDS
+      if (yamlConfig.containsKey("ClientSettings.SNIFF_INTERVAL_SECONDS")) {
+        builder.sniffIntervalSeconds(yamlConfig.getInt("ClientSettings.SNIFF_INTERVAL_SECONDS"));
+      }
+
+      // COORDINATING_ONLY
+      if (yamlConfig.containsKey("ClientSettings.COORDINATING_ONLY")) {
+        builder.coordinatingOnly(yamlConfig.getBoolean("ClientSettings.COORDINATING_ONLY"));
+      }
+
+      // MAX_RETRIES
+      if (yamlConfig.containsKey("ClientSettings.MAX_RETRIES")) {
+        builder.maxRetries(yamlConfig.getInt("ClientSettings.MAX_RETRIES"));
+      }
+
+      // RETRY_INITIAL_BACKOFF_MS
+      if (yamlConfig.containsKey("ClientSettings.RETRY_INITIAL_BACKOFF_MS")) {
+        builder.retryInitialBackoffMillis(
+            yamlConfig.getLong("ClientSettings.RETRY_INITIAL_BACKOFF_MS"));
+      }
+
+      // RETRY_MAX_BACKOFF_MS
+      if (yamlConfig.containsKey("ClientSettings.RETRY_MAX_BACKOFF_MS")) {
+        builder.retryMaxBackoffMillis(yamlConfig.getLong("ClientSettings.RETRY_MAX_BACKOFF_MS"));
+      }
+
+      // RETRY_BUDGET
+      if (yamlConfig.containsKey("ClientSettings.RETRY_BUDGET")) {
+        builder.retryBudget(yamlConfig.getInt("ClientSettings.RETRY_BUDGET"));
+      }
+
+      // RESPONSE_BUFFER_LIMIT_MB
+      if (yamlConfig.containsKey("ClientSettings.RESPONSE_BUFFER_LIMIT_MB")) {
+        builder.responseBufferLimitMb(
+            yamlConfig.getInt("ClientSettings.RESPONSE_BUFFER_LIMIT_MB"));
+      }
+
+      // REQUEST_CACHE
+      if (yamlConfig.containsKey("ClientSettings.REQUEST_CACHE")) {
+        builder.requestCache(yamlConfig.getBoolean("ClientSettings.REQUEST_CACHE"));
+      }
+
+      // PREFERENCE
+      if (yamlConfig.containsKey("ClientSettings.PREFERENCE")) {
+        builder.preference(yamlConfig.getString("ClientSettings.PREFERENCE"));
+      }
+
+      // PIT_REUSE_WINDOW_SECONDS
+      if (yamlConfig.containsKey("ClientSettings.PIT_REUSE_WINDOW_SECONDS")) {
+        builder.pitReuseWindowSeconds(yamlConfig.getInt("ClientSettings.PIT_REUSE_WINDOW_SECONDS"));
+      }
+
+      // TRACK_TOTAL_HITS
+      if (yamlConfig.containsKey("ClientSettings.TRACK_TOTAL_HITS")) {
+        builder.trackTotalHits(yamlConfig.getString("ClientSettings.TRACK_TOTAL_HITS"));
+      }
+
+      // EXPORT_SLICES
+      if (yamlConfig.containsKey("ClientSettings.EXPORT_SLICES")) {
+        builder.exportSlices(yamlConfig.getInt("ClientSettings.EXPORT_SLICES"));
+      }
+
+      // EXPORT_MAX_SLICES
+      if (yamlConfig.containsKey("ClientSettings.EXPORT_MAX_SLICES")) {
+        builder.exportMaxSlices(yamlConfig.getInt("ClientSettings.EXPORT_MAX_SLICES"));
+      }
+
+      // EXPORT_PAGE_SIZE
+      if (yamlConfig.containsKey("ClientSettings.EXPORT_PAGE_SIZE")) {
+        builder.exportPageSize(yamlConfig.getInt("ClientSettings.EXPORT_PAGE_SIZE"));
+      }
+
+      // MSEARCH_ENABLED
+      if (yamlConfig.containsKey("ClientSettings.MSEARCH_ENABLED")) {
+        builder.msearchEnabled(yamlConfig.getBoolean("ClientSettings.MSEARCH_ENABLED"));
+      }
+
+      // MSEARCH_MAX_BATCH
+      if (yamlConfig.containsKey("ClientSettings.MSEARCH_MAX_BATCH")) {
+        builder.msearchMaxBatch(yamlConfig.getInt("ClientSettings.MSEARCH_MAX_BATCH"));
+      }
+
+      // MSEARCH_MAX_WAIT_MS
+      if (yamlConfig.containsKey("ClientSettings.MSEARCH_MAX_WAIT_MS")) {
+        builder.msearchMaxWaitMillis(yamlConfig.getLong("ClientSettings.MSEARCH_MAX_WAIT_MS"));
+      }
+
+      // QUERY_TIMEOUT_SECONDS
+      if (yamlConfig.containsKey("ClientSettings.QUERY_TIMEOUT_SECONDS")) {
+        builder.queryTimeoutSeconds(yamlConfig.getInt("ClientSettings.QUERY_TIMEOUT_SECONDS"));
+      }
+
+      // MAX_REQUESTS_PER_SECOND
+      if (yamlConfig.containsKey("ClientSettings.MAX_REQUESTS_PER_SECOND")) {
+        builder.maxRequestsPerSecond(
+            yamlConfig.getDouble("ClientSettings.MAX_REQUESTS_PER_SECOND"));
+      }
+
+      // MAX_IN_FLIGHT_REQUESTS
+      if (yamlConfig.containsKey("ClientSettings.MAX_IN_FLIGHT_REQUESTS")) {
+        builder.maxInFlightRequests(yamlConfig.getInt("ClientSettings.MAX_IN_FLIGHT_REQUESTS"));
+      }
+
+      // ADAPTIVE_RATE_LIMIT
+      if (yamlConfig.containsKey("ClientSettings.ADAPTIVE_RATE_LIMIT")) {
+        builder.adaptiveRateLimit(yamlConfig.getBoolean("ClientSettings.ADAPTIVE_RATE_LIMIT"));
+      }
+    } catch (Exception e) {
+      System.err.println("Error parsing client settings from config file: " + e.getMessage());
+      e.printStackTrace();
+    }
+
+    return builder.build();
+  }
+
   /** Load the YAML configuration from file */
   private static void loadConfig() {
     if (yamlConfig != null) {
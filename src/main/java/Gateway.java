@@ -3,8 +3,18 @@
  * SPDX-License-Identifier: Apache-2.0
  */
 
+import client.HttpMetrics;
+import client.OpenSearchRestClientImpl;
+import client.QueryContext;
+import client.RateLimiter;
+import client.RetryPolicy;
+import client.SlicedExport;
 import com.google.inject.Guice;
 import com.google.inject.Injector;
+import java.io.IOException;
+import java.nio.file.Paths;
+import org.json.JSONArray;
+import org.json.JSONObject;
 import org.opensearch.sql.ppl.PPLService;
 import org.opensearch.sql.sql.SQLService;
 import py4j.GatewayServer;
@@ -17,6 +27,7 @@ public class Gateway {
   private PPLService pplService;
   private SQLService sqlService;
   private QueryExecution queryExecution;
+  private OpenSearchRestClientImpl restClient;
 
   public Gateway() {
     // Empty constructor - services will be initialized when OpenSearch CLI connects
@@ -33,9 +44,7 @@ public class Gateway {
       Injector injector = Guice.createInjector(new GatewayModule(hostPort));
 
       // Initialize services
-      this.pplService = injector.getInstance(PPLService.class);
-      this.sqlService = injector.getInstance(SQLService.class);
-      this.queryExecution = injector.getInstance(QueryExecution.class);
+      initializeServices(injector);
 
       System.out.println("Successfully initialized AWS connection to " + hostPort);
 
@@ -60,9 +69,7 @@ public class Gateway {
               new GatewayModule(host, port, protocol, username, password, ignoreSSL));
 
       // Initialize services
-      this.pplService = injector.getInstance(PPLService.class);
-      this.sqlService = injector.getInstance(SQLService.class);
-      this.queryExecution = injector.getInstance(QueryExecution.class);
+      initializeServices(injector);
 
       System.out.println(
           "Successfully initialized connection to " + protocol + "://" + host + ":" + port);
@@ -74,11 +81,227 @@ public class Gateway {
     }
   }
 
+  private void initializeServices(Injector injector) {
+    // Release the client of a previous connection before replacing it
+    shutdown();
+
+    this.restClient = injector.getInstance(OpenSearchRestClientImpl.class);
+    this.pplService = injector.getInstance(PPLService.class);
+    this.sqlService = injector.getInstance(SQLService.class);
+    this.queryExecution = injector.getInstance(QueryExecution.class);
+  }
+
+  /** Stop the client's background threads and close its connections. */
+  public synchronized void shutdown() {
+    if (restClient == null) {
+      return;
+    }
+
+    try {
+      restClient.close();
+    } catch (IOException e) {
+      System.err.println("Failed to close OpenSearch client: " + e.getMessage());
+    } finally {
+      restClient = null;
+    }
+  }
+
   public String queryExecution(String query, boolean isPPL, String format) {
     // Use the QueryExecution class to execute the query
     return queryExecution.execute(query, isPPL, format);
   }
 
+  /**
+   * Cancel the cluster tasks of the query being executed, e.g. when the user interrupts it.
+   *
+   * @return the number of tasks cancelled
+   */
+  public int cancelQuery() {
+    QueryExecution execution = queryExecution;
+    QueryContext current = QueryContext.current();
+    if (restClient == null || execution == null || current == null) {
+      return 0;
+    }
+    return execution.cancelTasks(current);
+  }
+
+  /**
+   * Retry counters of the current connection, as JSON.
+   *
+   * @return the session totals, the current rate limits and the number of retries of the last
+   *     query
+   */
+  public String getRetryStats() {
+    JSONObject stats = new JSONObject();
+    OpenSearchRestClientImpl client = restClient;
+    if (client != null) {
+      RetryPolicy retryPolicy = client.getRetryPolicy();
+      stats.put("retries", retryPolicy.getRetries());
+      stats.put("recovered", retryPolicy.getRecovered());
+      stats.put("exhausted", retryPolicy.getExhausted());
+      RateLimiter rateLimiter = client.getRateLimiter();
+      stats.put("rejections", rateLimiter.getRejections());
+      stats.put("throttled", rateLimiter.getThrottled());
+      stats.put("requests_per_second_limit", rateLimiter.getRequestsPerSecond());
+      stats.put("in_flight_limit", rateLimiter.getInFlightLimit());
+    }
+    QueryContext last = QueryContext.last();
+    stats.put("last_query_retries", last == null ? 0 : last.getRetries());
+    return stats.toString();
+  }
+
+  /**
+   * HTTP metrics of the session and of the most recent queries, as JSON.
+   *
+   * @return the session totals and one entry per query, newest first
+   */
+  public String getHttpStats() {
+    JSONObject stats = new JSONObject();
+    stats.put("session", toJson(HttpMetrics.session()));
+    JSONArray queries = new JSONArray();
+    for (QueryContext context : QueryContext.recent()) {
+      queries.put(
+          toJson(context.getHttpMetrics())
+              .put("query_id", context.getId())
+              .put("query", context.getQuery()));
+    }
+    stats.put("queries", queries);
+    return stats.toString();
+  }
+
+  private static JSONObject toJson(HttpMetrics metrics) {
+    JSONObject json = new JSONObject();
+    json.put("requests", metrics.getRequests());
+    json.put("request_bytes", metrics.getRequestBytes());
+    json.put("response_bytes", metrics.getResponseBytes());
+    json.put("total_latency_ms", metrics.getTotalLatencyMillis());
+    json.put("max_latency_ms", metrics.getMaxLatencyMillis());
+    json.put("new_connections", metrics.getNewConnections());
+    json.put("tls_handshakes", metrics.getTlsHandshakes());
+    json.put("reused_connections", metrics.getReusedConnections());
+    return json;
+  }
+
+  /**
+   * Details of the last query, as JSON.
+   *
+   * @return the query ID, its retries, the hit count reported by the cluster, the rows returned
+   *     and the duration of each phase in milliseconds
+   */
+  public String getLastQueryInfo() {
+    JSONObject info = new JSONObject();
+    QueryContext last = QueryContext.last();
+    if (last == null) {
+      return info.toString();
+    }
+
+    info.put("query_id", last.getId());
+    info.put("retries", last.getRetries());
+    if (last.hasTotalHits()) {
+      info.put("total_hits", last.getTotalHits() == null ? JSONObject.NULL : last.getTotalHits());
+      info.put("total_hits_relation", last.isTotalHitsLowerBound() ? "gte" : "eq");
+    }
+    if (last.getRows() != null) {
+      info.put("rows", last.getRows());
+    }
+    info.put("timings", new JSONObject(last.getTimings()));
+    return info.toString();
+  }
+
+  /**
+   * Change a search setting of the current session.
+   *
+   * @return an error message, or an empty string if the setting was changed
+   */
+  public String setSessionSetting(String key, String value) {
+    OpenSearchRestClientImpl client = restClient;
+    if (client == null) {
+      return "Not connected to OpenSearch";
+    }
+
+    try {
+      client.getSessionSettings().set(key, value);
+      return "";
+    } catch (IllegalArgumentException e) {
+      return e.getMessage();
+    }
+  }
+
+  /** Search settings of the current session, as JSON. */
+  public String getSessionSettings() {
+    OpenSearchRestClientImpl client = restClient;
+    if (client == null) {
+      return new JSONObject().toString();
+    }
+    return new JSONObject(client.getSessionSettings().asMap()).toString();
+  }
+
+  /**
+   * Start exporting every document of an index to a newline-delimited JSON file.
+   *
+   * @param slices number of slices read concurrently, 0 for the configured default
+   * @return an error message, or an empty string if the export started
+   */
+  public String startExport(String index, String path, int slices) {
+    OpenSearchRestClientImpl client = restClient;
+    if (client == null) {
+      return "Not connected to OpenSearch";
+    }
+
+    try {
+      client.startExport(index, Paths.get(path), slices);
+      return "";
+    } catch (Exception e) {
+      e.printStackTrace();
+      return e.getMessage() != null ? e.getMessage() : e.toString();
+    }
+  }
+
+  /**
+   * Progress of the last export, as JSON.
+   *
+   * @return the export state, documents written per slice and overall rows per second
+   */
+  public String getExportProgress() {
+    JSONObject progress = new JSONObject();
+    OpenSearchRestClientImpl client = restClient;
+    SlicedExport export = client == null ? null : client.getExport();
+    if (export == null) {
+      return progress.toString();
+    }
+
+    JSONArray slices = new JSONArray();
+    for (int slice = 0; slice < export.getSlices(); slice++) {
+      slices.put(
+          new JSONObject()
+              .put("id", slice)
+              .put("docs", export.getSliceDocs(slice))
+              .put("done", export.isSliceDone(slice)));
+    }
+    long docs = export.getDocs();
+    long elapsedMillis = export.getElapsedMillis();
+    progress.put("index", export.getIndex());
+    progress.put("path", export.getOutput().toString());
+    progress.put("state", export.getState().name().toLowerCase());
+    progress.put("docs", docs);
+    progress.put("elapsed_seconds", elapsedMillis / 1000.0);
+    progress.put("rows_per_second", elapsedMillis == 0 ? 0 : docs * 1000.0 / elapsedMillis);
+    progress.put("slices", slices);
+    if (export.getError() != null) {
+      progress.put("error", export.getError());
+    }
+    return progress.toString();
+  }
+
+  /** Stop the running export, if any. */
+  public void cancelExport() {
+    OpenSearchRestClientImpl client = restClient;
+    SlicedExport export = client == null ? null : client.getExport();
+    if (export != null) {
+      export.cancel();
+    }
+  }
+
   public static void main(String[] args) {
     try {
       System.out.println("Starting Gateway Server...");
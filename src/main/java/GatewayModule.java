@@ -4,8 +4,11 @@
  */
 
 import client.Client;
+import client.ClientOptions;
+import client.OpenSearchRestClientImpl;
 import com.google.inject.AbstractModule;
 import com.google.inject.Provides;
+import com.google.inject.Singleton;
 import com.google.inject.name.Named;
 import java.util.Collections;
 import java.util.List;
@@ -90,24 +93,38 @@ public class GatewayModule extends AbstractModule {
   @Override
   protected void configure() {}
 
+  // One client per connection, so every engine component shares its thread pool and connections
   @Provides
-  public OpenSearchClient openSearchClient() {
+  @Singleton
+  public OpenSearchRestClientImpl openSearchRestClient(ClientOptions options) {
     try {
       if (useAwsAuth) {
         // Use AWS authentication
-        return Client.createAwsClient(awsEndpoint);
+        return Client.createAwsClient(awsEndpoint, options);
       } else if (protocol.equalsIgnoreCase("https")) {
         // Use HTTPS authentication
-        return Client.createHttpsClient(host, port, username, password, ignoreSSL);
+        return Client.createHttpsClient(host, port, username, password, ignoreSSL, options);
       } else {
         // Use HTTP authentication
-        return Client.createHttpClient(host, port);
+        return Client.createHttpClient(host, port, options);
       }
     } catch (Exception e) {
       throw new RuntimeException("Failed to create OpenSearchClient", e);
     }
   }
 
+  @Provides
+  public OpenSearchClient openSearchClient(OpenSearchRestClientImpl restClient) {
+    return restClient;
+  }
+
+  @Provides
+  @Singleton
+  ClientOptions clientOptions() {
+    // Get client options from the ClientSettings section of the configuration file
+    return Config.getClientOptions();
+  }
+
   @Provides
   QueryManager queryManager(OpenSearchClient openSearchClient) {
     return new CustomQueryManager(openSearchClient);
@@ -252,8 +269,12 @@ public class GatewayModule extends AbstractModule {
   }
 
   @Provides
-  QueryExecution queryExecution(PPLService pplService, SQLService sqlService) {
-    return new QueryExecution(pplService, sqlService);
+  QueryExecution queryExecution(
+      PPLService pplService,
+      SQLService sqlService,
+      OpenSearchRestClientImpl restClient,
+      ClientOptions options) {
+    return new QueryExecution(pplService, sqlService, restClient, options);
   }
 
   @Provides
@@ -5,6 +5,10 @@
 
 package client;
 
+import java.util.ArrayList;
+import java.util.Iterator;
+import java.util.List;
+import java.util.concurrent.TimeUnit;
 import javax.net.ssl.SSLContext;
 import javax.net.ssl.SSLEngine;
 import org.apache.hc.client5.http.auth.AuthScope;
@@ -18,14 +22,21 @@ import org.apache.hc.core5.http.EntityDetails;
 import org.apache.hc.core5.http.HttpHost;
 import org.apache.hc.core5.http.HttpRequest;
 import org.apache.hc.core5.http.HttpRequestInterceptor;
+import org.apache.hc.core5.http.HttpResponse;
+import org.apache.hc.core5.http.HttpResponseInterceptor;
 import org.apache.hc.core5.http.nio.ssl.TlsStrategy;
 import org.apache.hc.core5.http.protocol.HttpContext;
 import org.apache.hc.core5.reactor.ssl.TlsDetails;
 import org.apache.hc.core5.ssl.SSLContextBuilder;
+import org.opensearch.client.Node;
+import org.opensearch.client.NodeSelector;
 import org.opensearch.client.RestClient;
 import org.opensearch.client.RestClientBuilder;
 import org.opensearch.client.RestHighLevelClient;
-import org.opensearch.sql.opensearch.client.OpenSearchClient;
+import org.opensearch.client.sniff.NodesSniffer;
+import org.opensearch.client.sniff.OpenSearchNodesSniffer;
+import org.opensearch.client.sniff.SniffOnFailureListener;
+import org.opensearch.client.sniff.Sniffer;
 import software.amazon.awssdk.auth.credentials.AwsCredentials;
 import software.amazon.awssdk.auth.credentials.AwsCredentialsProvider;
 import software.amazon.awssdk.auth.credentials.DefaultCredentialsProvider;
@@ -36,7 +47,8 @@ import software.amazon.awssdk.regions.providers.DefaultAwsRegionProviderChain;
 /** Client class for creating OpenSearch clients with different authentication methods. */
 public class Client {
 
-  public static OpenSearchClient createAwsClient(String awsEndpoint) {
+  public static OpenSearchRestClientImpl createAwsClient(
+      String awsEndpoint, ClientOptions options) {
     try {
       // Determine the service name based on the endpoint URL
       String serviceName;
@@ -81,9 +93,11 @@ public class Client {
             }
           };
 
-      // Add our URI modification and logging interceptors
+      // Add our URI modification, query tagging and metrics interceptors
       HttpRequestInterceptor newShowURI = createNewShowURI();
-      HttpRequestInterceptor loggingInterceptor = createLoggingInterceptor(true);
+      HttpRequestInterceptor opaqueId = createOpaqueIdInterceptor();
+      HttpRequestInterceptor metrics = createMetricsInterceptor();
+      HttpResponseInterceptor responseMetrics = createMetricsResponseInterceptor();
 
       // Build RestClientBuilder with interceptors
       RestClientBuilder restClientBuilder =
@@ -91,29 +105,48 @@ public class Client {
               .setHttpClientConfigCallback(
                   httpClientBuilder -> {
                     httpClientBuilder.addRequestInterceptorFirst(newShowURI);
+                    // Tag the request before it is signed, the header is part of the signature
+                    httpClientBuilder.addRequestInterceptorFirst(opaqueId);
                     httpClientBuilder.addRequestInterceptorLast(interceptor);
-                    httpClientBuilder.addRequestInterceptorLast(loggingInterceptor);
+                    httpClientBuilder.addRequestInterceptorLast(metrics);
+                    httpClientBuilder.addResponseInterceptorLast(responseMetrics);
                     return httpClientBuilder;
                   });
 
       // Use the builder for the high-level client
       RestHighLevelClient restHighLevelClient = new RestHighLevelClient(restClientBuilder);
-      return new OpenSearchRestClientImpl(restHighLevelClient);
+
+      // The SigV4 interceptor signs bodies from a shared file, so requests must stay sequential
+      ClientOptions awsOptions =
+          options.toBuilder()
+              .prefetchDepth(0)
+              .pitReuseWindowSeconds(0)
+              .exportMaxSlices(1)
+              .msearchEnabled(false)
+              .build();
+      return new OpenSearchRestClientImpl(restHighLevelClient, awsOptions);
     } catch (Exception e) {
       throw new RuntimeException("Failed to create AWS OpenSearchClient", e);
     }
   }
 
-  public static OpenSearchClient createHttpsClient(
-      String host, int port, String username, String password, boolean ignoreSSL) {
+  public static OpenSearchRestClientImpl createHttpsClient(
+      String host,
+      int port,
+      String username,
+      String password,
+      boolean ignoreSSL,
+      ClientOptions options) {
     try {
       final HttpHost httpHost = new HttpHost("https", host, port);
+      final HttpHost[] hosts = createHosts(httpHost, options);
 
       // For HTTPS: Set up credentials and SSL
+      // Credentials are shared by every node when balancing across more than one
       final BasicCredentialsProvider credentialsProvider = new BasicCredentialsProvider();
       if (username != null && password != null) {
         credentialsProvider.setCredentials(
-            new AuthScope(httpHost),
+            isMultiNode(hosts, options) ? new AuthScope(null, -1) : new AuthScope(httpHost),
             new UsernamePasswordCredentials(username, password.toCharArray()));
       }
 
@@ -126,72 +159,233 @@ public class Client {
 
       // Create our interceptors
       HttpRequestInterceptor newShowURI = createNewShowURI();
-      HttpRequestInterceptor loggingInterceptor = createLoggingInterceptor(true);
-
-      // Create RestHighLevelClient with SSL and authentication
-      final RestHighLevelClient restHighLevelClient =
-          new RestHighLevelClient(
-              RestClient.builder(httpHost)
-                  .setHttpClientConfigCallback(
-                      httpClientBuilder -> {
-                        // Set up TLS strategy
-                        final TlsStrategy tlsStrategy =
-                            ClientTlsStrategyBuilder.create()
-                                .setSslContext(sslContext)
-                                .setTlsDetailsFactory(
-                                    new Factory<SSLEngine, TlsDetails>() {
-                                      @Override
-                                      public TlsDetails create(final SSLEngine sslEngine) {
-                                        return new TlsDetails(
-                                            sslEngine.getSession(),
-                                            sslEngine.getApplicationProtocol());
-                                      }
-                                    })
-                                .build();
-
-                        // Set up connection manager
-                        final PoolingAsyncClientConnectionManager connectionManager =
-                            PoolingAsyncClientConnectionManagerBuilder.create()
-                                .setTlsStrategy(tlsStrategy)
-                                .build();
-
-                        return httpClientBuilder
-                            .setDefaultCredentialsProvider(credentialsProvider)
-                            .setConnectionManager(connectionManager)
-                            .addRequestInterceptorFirst(newShowURI)
-                            .addRequestInterceptorLast(loggingInterceptor);
-                      }));
-
-      return new OpenSearchRestClientImpl(restHighLevelClient);
+      HttpRequestInterceptor opaqueId = createOpaqueIdInterceptor();
+      HttpRequestInterceptor metrics = createMetricsInterceptor();
+      HttpResponseInterceptor responseMetrics = createMetricsResponseInterceptor();
+
+      // Create RestClientBuilder with SSL and authentication
+      final RestClientBuilder restClientBuilder =
+          RestClient.builder(hosts)
+              .setHttpClientConfigCallback(
+                  httpClientBuilder -> {
+                    // Set up TLS strategy
+                    final TlsStrategy tlsStrategy =
+                        ClientTlsStrategyBuilder.create()
+                            .setSslContext(sslContext)
+                            .setTlsDetailsFactory(
+                                new Factory<SSLEngine, TlsDetails>() {
+                                  @Override
+                                  public TlsDetails create(final SSLEngine sslEngine) {
+                                    return new TlsDetails(
+                                        sslEngine.getSession(), sslEngine.getApplicationProtocol());
+                                  }
+                                })
+                            .build();
+
+                    // Set up connection manager
+                    final PoolingAsyncClientConnectionManager connectionManager =
+                        PoolingAsyncClientConnectionManagerBuilder.create()
+                            .setTlsStrategy(tlsStrategy)
+                            .build();
+
+                    return httpClientBuilder
+                        .setDefaultCredentialsProvider(credentialsProvider)
+                        .setConnectionManager(connectionManager)
+                        .addRequestInterceptorFirst(newShowURI)
+                        .addRequestInterceptorFirst(opaqueId)
+                        .addRequestInterceptorLast(metrics)
+                        .addResponseInterceptorLast(responseMetrics);
+                  });
+      final SniffOnFailureListener sniffOnFailure = configureNodes(restClientBuilder, options);
+
+      final RestHighLevelClient restHighLevelClient = new RestHighLevelClient(restClientBuilder);
+      final OpenSearchRestClientImpl openSearchClient =
+          new OpenSearchRestClientImpl(restHighLevelClient, options);
+      startSniffer(
+          openSearchClient,
+          restHighLevelClient,
+          sniffOnFailure,
+          OpenSearchNodesSniffer.Scheme.HTTPS,
+          options);
+      return openSearchClient;
     } catch (Exception e) {
       throw new RuntimeException("Failed to create HTTPS OpenSearchClient", e);
     }
   }
 
-  public static OpenSearchClient createHttpClient(String host, int port) {
+  public static OpenSearchRestClientImpl createHttpClient(
+      String host, int port, ClientOptions options) {
     try {
       final HttpHost httpHost = new HttpHost("http", host, port);
 
       // Create our interceptors
       HttpRequestInterceptor newShowURI = createNewShowURI();
-      HttpRequestInterceptor loggingInterceptor = createLoggingInterceptor(false);
-
-      RestHighLevelClient restHighLevelClient =
-          new RestHighLevelClient(
-              RestClient.builder(httpHost)
-                  .setHttpClientConfigCallback(
-                      httpClientBuilder -> {
-                        return httpClientBuilder
-                            .addRequestInterceptorFirst(newShowURI)
-                            .addRequestInterceptorLast(loggingInterceptor);
-                      }));
-
-      return new OpenSearchRestClientImpl(restHighLevelClient);
+      HttpRequestInterceptor opaqueId = createOpaqueIdInterceptor();
+      HttpRequestInterceptor metrics = createMetricsInterceptor();
+      HttpResponseInterceptor responseMetrics = createMetricsResponseInterceptor();
+
+      RestClientBuilder restClientBuilder =
+          RestClient.builder(createHosts(httpHost, options))
+              .setHttpClientConfigCallback(
+                  httpClientBuilder -> {
+                    return httpClientBuilder
+                        .addRequestInterceptorFirst(newShowURI)
+                        .addRequestInterceptorFirst(opaqueId)
+                        .addRequestInterceptorLast(metrics)
+                        .addResponseInterceptorLast(responseMetrics);
+                  });
+      SniffOnFailureListener sniffOnFailure = configureNodes(restClientBuilder, options);
+
+      RestHighLevelClient restHighLevelClient = new RestHighLevelClient(restClientBuilder);
+      OpenSearchRestClientImpl openSearchClient =
+          new OpenSearchRestClientImpl(restHighLevelClient, options);
+      startSniffer(
+          openSearchClient,
+          restHighLevelClient,
+          sniffOnFailure,
+          OpenSearchNodesSniffer.Scheme.HTTP,
+          options);
+      return openSearchClient;
     } catch (Exception e) {
       throw new RuntimeException("Failed to create HTTP OpenSearchClient", e);
     }
   }
 
+  /**
+   * Nodes to balance requests across: the primary endpoint followed by the ENDPOINTS of the
+   * ClientSettings section, given as host or host:port and sharing the primary endpoint's protocol.
+   * The REST client round-robins requests over them and retries dead nodes with an exponential
+   * backoff.
+   */
+  private static HttpHost[] createHosts(HttpHost primary, ClientOptions options) {
+    List<HttpHost> hosts = new ArrayList<>();
+    hosts.add(primary);
+
+    for (String endpoint : options.getEndpoints()) {
+      String address = endpoint.trim();
+      if (address.contains("://")) {
+        address = address.substring(address.indexOf("://") + 3);
+      }
+      if (address.endsWith("/")) {
+        address = address.substring(0, address.length() - 1);
+      }
+      if (address.isEmpty()) {
+        continue;
+      }
+
+      int separator = address.lastIndexOf(':');
+      HttpHost host =
+          separator > 0
+              ? new HttpHost(
+                  primary.getSchemeName(),
+                  address.substring(0, separator),
+                  Integer.parseInt(address.substring(separator + 1)))
+              : new HttpHost(primary.getSchemeName(), address, primary.getPort());
+      if (!hosts.contains(host)) {
+        hosts.add(host);
+      }
+    }
+
+    if (hosts.size() > 1) {
+      System.out.println("Balancing requests across nodes: " + hosts);
+    }
+    return hosts.toArray(new HttpHost[0]);
+  }
+
+  private static boolean isMultiNode(HttpHost[] hosts, ClientOptions options) {
+    return hosts.length > 1 || options.isSniffNodes();
+  }
+
+  /**
+   * Apply the node selection settings to the builder.
+   *
+   * @return listener re-sniffing nodes on failure, or null if sniffing is disabled
+   */
+  private static SniffOnFailureListener configureNodes(
+      RestClientBuilder restClientBuilder, ClientOptions options) {
+    if (options.isCoordinatingOnly()) {
+      restClientBuilder.setNodeSelector(createCoordinatingOnlySelector());
+    }
+
+    if (!options.isSniffNodes()) {
+      return null;
+    }
+    SniffOnFailureListener sniffOnFailure = new SniffOnFailureListener();
+    restClientBuilder.setFailureListener(sniffOnFailure);
+    return sniffOnFailure;
+  }
+
+  /**
+   * Discover the cluster's HTTP nodes through _nodes/http, once on start and then periodically. The
+   * sniffer is closed together with the client.
+   */
+  private static void startSniffer(
+      OpenSearchRestClientImpl openSearchClient,
+      RestHighLevelClient restHighLevelClient,
+      SniffOnFailureListener sniffOnFailure,
+      OpenSearchNodesSniffer.Scheme scheme,
+      ClientOptions options) {
+    if (sniffOnFailure == null) {
+      return;
+    }
+
+    RestClient lowLevelClient = restHighLevelClient.getLowLevelClient();
+    NodesSniffer nodesSniffer =
+        new OpenSearchNodesSniffer(
+            lowLevelClient, OpenSearchNodesSniffer.DEFAULT_SNIFF_REQUEST_TIMEOUT, scheme);
+    // Sniffing shares the session's rate and in-flight limits with the queries
+    RateLimiter rateLimiter = openSearchClient.getRateLimiter();
+    Sniffer sniffer =
+        Sniffer.builder(lowLevelClient)
+            .setSniffIntervalMillis(
+                (int) TimeUnit.SECONDS.toMillis(Math.max(1, options.getSniffIntervalSeconds())))
+            .setNodesSniffer(() -> rateLimiter.run(nodesSniffer::sniff))
+            .build();
+    sniffOnFailure.setSniffer(sniffer);
+    openSearchClient.closeWith(sniffer);
+  }
+
+  /**
+   * Keep only coordinating-only nodes (no cluster manager, data or ingest role). Roles are only
+   * known for sniffed nodes, so all nodes are kept when none of them qualifies.
+   */
+  private static NodeSelector createCoordinatingOnlySelector() {
+    return new NodeSelector() {
+      @Override
+      public void select(Iterable<Node> nodes) {
+        boolean hasCoordinatingOnly = false;
+        for (Node node : nodes) {
+          if (isCoordinatingOnly(node)) {
+            hasCoordinatingOnly = true;
+            break;
+          }
+        }
+        if (!hasCoordinatingOnly) {
+          return;
+        }
+
+        for (Iterator<Node> iterator = nodes.iterator(); iterator.hasNext(); ) {
+          if (!isCoordinatingOnly(iterator.next())) {
+            iterator.remove();
+          }
+        }
+      }
+
+      private boolean isCoordinatingOnly(Node node) {
+        Node.Roles roles = node.getRoles();
+        return roles != null
+            && !roles.isClusterManagerEligible()
+            && !roles.isData()
+            && !roles.isIngest();
+      }
+
+      @Override
+      public String toString() {
+        return "COORDINATING_ONLY";
+      }
+    };
+  }
+
   /**
    * Creates a URI modification interceptor for SHOW command Original URI:
    * /?ignore_throttled=false&ignore_unavailable=false&expand_wildcards=open%2Cclosed&allow_no_indices=false&cluster_manager_timeout=30s
@@ -225,28 +419,34 @@ public class Client {
     };
   }
 
-  private static HttpRequestInterceptor createLoggingInterceptor(boolean isHttps) {
-    final String protocol = isHttps ? "HTTPS" : "HTTP";
+  /** Tags every request sent during a query with the query's ID, to find its cluster tasks. */
+  private static HttpRequestInterceptor createOpaqueIdInterceptor() {
     return new HttpRequestInterceptor() {
       @Override
       public void process(HttpRequest request, EntityDetails entityDetails, HttpContext context) {
-        System.out.println("===== " + protocol + " REQUEST =====");
-        System.out.println("Method: " + request.getMethod());
-        System.out.println("URI: " + request.getRequestUri());
-        System.out.println("Request Type: " + request.getClass().getSimpleName());
-
-        // Log headers
-        System.out.println("Headers:");
-        request
-            .headerIterator()
-            .forEachRemaining(
-                header -> System.out.println("  " + header.getName() + ": " + header.getValue()));
-
-        if (entityDetails != null) {
-          System.out.println("Content Type: " + entityDetails.getContentType());
-          System.out.println("Content Length: " + entityDetails.getContentLength());
+        QueryContext query = QueryContext.current();
+        if (query != null && !request.containsHeader(QueryContext.OPAQUE_ID_HEADER)) {
+          request.setHeader(QueryContext.OPAQUE_ID_HEADER, query.getId());
         }
-        System.out.println("=====================");
+      }
+    };
+  }
+
+  /** Records the size, latency and connection usage of every request, see {@link HttpMetrics}. */
+  private static HttpRequestInterceptor createMetricsInterceptor() {
+    return new HttpRequestInterceptor() {
+      @Override
+      public void process(HttpRequest request, EntityDetails entityDetails, HttpContext context) {
+        HttpMetrics.requestSent(request, entityDetails, context);
+      }
+    };
+  }
+
+  private static HttpResponseInterceptor createMetricsResponseInterceptor() {
+    return new HttpResponseInterceptor() {
+      @Override
+      public void process(HttpResponse response, EntityDetails entityDetails, HttpContext context) {
+        HttpMetrics.responseReceived(response, entityDetails, context);
       }
     };
   }
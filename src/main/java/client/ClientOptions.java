@@ -0,0 +1,98 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.util.List;
+import lombok.Builder;
+import lombok.Getter;
+
+/** Tunables for the OpenSearch REST client, read from the ClientSettings section of config.yaml. */
+@Getter
+@Builder(toBuilder = true)
+public class ClientOptions {
+
+  /** Number of worker threads behind {@link OpenSearchRestClientImpl#schedule(Runnable)}. */
+  @Builder.Default private final int schedulerPoolSize = 4;
+
+  /** Maximum number of scheduled tasks waiting for a free worker thread. */
+  @Builder.Default private final int schedulerQueueSize = 64;
+
+  /** Number of PIT/scroll pages requested ahead of the engine, 0 disables prefetching. */
+  @Builder.Default private final int prefetchDepth = 1;
+
+  /** Additional host[:port] nodes to balance requests across, besides the primary endpoint. */
+  @Builder.Default private final List<String> endpoints = List.of();
+
+  /** Discover the cluster's HTTP nodes through _nodes/http. */
+  @Builder.Default private final boolean sniffNodes = false;
+
+  /** Interval between two rounds of node sniffing. */
+  @Builder.Default private final int sniffIntervalSeconds = 300;
+
+  /** Send requests only to coordinating-only nodes when any are known. */
+  @Builder.Default private final boolean coordinatingOnly = false;
+
+  /** Maximum number of times a single call is retried, 0 disables retries. */
+  @Builder.Default private final int maxRetries = 3;
+
+  /** Backoff before the first retry, doubled on every following retry. */
+  @Builder.Default private final long retryInitialBackoffMillis = 200;
+
+  /** Upper bound of the backoff between two retries. */
+  @Builder.Default private final long retryMaxBackoffMillis = 5000;
+
+  /** Maximum number of retries shared by all calls of one query. */
+  @Builder.Default private final int retryBudget = 10;
+
+  /** Largest response buffered in memory, bigger search responses are fetched in smaller pages. */
+  @Builder.Default private final int responseBufferLimitMb = 100;
+
+  /** Ask for shard request caching of hit-less (size 0 or aggregation) searches. */
+  @Builder.Default private final boolean requestCache = true;
+
+  /** Search preference: "session" for a random per-session string, "none", or a custom value. */
+  @Builder.Default private final String preference = "session";
+
+  /** Time a released PIT stays open for the next query on the same indices, 0 disables reuse. */
+  @Builder.Default private final int pitReuseWindowSeconds = 30;
+
+  /** Hit counting of searches: "exact", "off" or the count up to which hits are exact. */
+  @Builder.Default private final String trackTotalHits = "10000";
+
+  /** Number of slices an export reads concurrently when none is given. */
+  @Builder.Default private final int exportSlices = 4;
+
+  /** Upper bound of the slices of one export. */
+  @Builder.Default private final int exportMaxSlices = 16;
+
+  /** Documents fetched per page and slice during an export. */
+  @Builder.Default private final int exportPageSize = 1000;
+
+  /** Coalesce searches sent at the same moment into one _msearch call. */
+  @Builder.Default private final boolean msearchEnabled = false;
+
+  /** Largest number of searches sent in one _msearch call. */
+  @Builder.Default private final int msearchMaxBatch = 16;
+
+  /** Time the first search of a batch waits for others to join it. */
+  @Builder.Default private final long msearchMaxWaitMillis = 5;
+
+  /** Time a query may run before it is abandoned and its cluster tasks cancelled, 0 for none. */
+  @Builder.Default private final int queryTimeoutSeconds = 0;
+
+  /** Requests per second sent to the cluster, 0 for no limit. */
+  @Builder.Default private final double maxRequestsPerSecond = 50;
+
+  /** Requests waiting for a response at the same time, 0 for no limit. */
+  @Builder.Default private final int maxInFlightRequests = 8;
+
+  /** Lower both limits when the cluster rejects requests, and raise them back as it recovers. */
+  @Builder.Default private final boolean adaptiveRateLimit = true;
+
+  public static ClientOptions defaults() {
+    return ClientOptions.builder().build();
+  }
+}
@@ -0,0 +1,151 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+import org.apache.hc.core5.http.EndpointDetails;
+import org.apache.hc.core5.http.EntityDetails;
+import org.apache.hc.core5.http.HttpRequest;
+import org.apache.hc.core5.http.HttpResponse;
+import org.apache.hc.core5.http.protocol.HttpContext;
+import org.apache.hc.core5.http.protocol.HttpCoreContext;
+
+/**
+ * Wire-level counters of HTTP requests: count, bytes, latency and connection usage.
+ *
+ * <p>The client's interceptors record every exchange twice, in the session totals and in the
+ * metrics of the query that sent it. Together they tell whether a slow query spent its time on
+ * many round trips, on large responses, on new TLS connections or waiting for the cluster. Bytes
+ * are taken from the Content-Length of the bodies, latency is the time until the response headers
+ * arrived.
+ */
+public class HttpMetrics {
+
+  private static final HttpMetrics SESSION = new HttpMetrics();
+
+  private static final String START_ATTRIBUTE = "opensearch-cli.request-start";
+  private static final String REQUEST_BYTES_ATTRIBUTE = "opensearch-cli.request-bytes";
+  private static final String QUERY_ATTRIBUTE = "opensearch-cli.query";
+
+  private final AtomicLong requests = new AtomicLong();
+  private final AtomicLong requestBytes = new AtomicLong();
+  private final AtomicLong responseBytes = new AtomicLong();
+  private final AtomicLong latencyNanos = new AtomicLong();
+  private final AtomicLong maxLatencyNanos = new AtomicLong();
+  private final AtomicLong newConnections = new AtomicLong();
+  private final AtomicLong tlsHandshakes = new AtomicLong();
+  private final AtomicLong reusedConnections = new AtomicLong();
+
+  /**
+   * @return the totals of every request sent since the SQL library started
+   */
+  public static HttpMetrics session() {
+    return SESSION;
+  }
+
+  /** Remember when and for which query a request is sent. Called by the request interceptor. */
+  static void requestSent(HttpRequest request, EntityDetails entity, HttpContext context) {
+    context.setAttribute(START_ATTRIBUTE, System.nanoTime());
+    context.setAttribute(
+        REQUEST_BYTES_ATTRIBUTE, entity == null ? 0L : Math.max(0L, entity.getContentLength()));
+    QueryContext query = QueryContext.current();
+    if (query != null) {
+      context.setAttribute(QUERY_ATTRIBUTE, query);
+    }
+  }
+
+  /** Record the exchange once the response headers arrived. Called by the response interceptor. */
+  static void responseReceived(HttpResponse response, EntityDetails entity, HttpContext context) {
+    Object start = context.getAttribute(START_ATTRIBUTE);
+    if (!(start instanceof Long)) {
+      return;
+    }
+    long latency = System.nanoTime() - (Long) start;
+    Object sent = context.getAttribute(REQUEST_BYTES_ATTRIBUTE);
+    long sentBytes = sent instanceof Long ? (Long) sent : 0;
+    long receivedBytes = entity == null ? 0 : Math.max(0, entity.getContentLength());
+
+    // The first exchange of a connection opened it, and for HTTPS went through a TLS handshake
+    HttpCoreContext coreContext = HttpCoreContext.adapt(context);
+    EndpointDetails endpoint = coreContext.getEndpointDetails();
+    boolean newConnection = endpoint == null || endpoint.getRequestCount() <= 1;
+    boolean tlsHandshake = newConnection && coreContext.getSSLSession() != null;
+
+    SESSION.record(sentBytes, receivedBytes, latency, newConnection, tlsHandshake);
+    Object query = context.getAttribute(QUERY_ATTRIBUTE);
+    if (query instanceof QueryContext) {
+      ((QueryContext) query)
+          .getHttpMetrics()
+          .record(sentBytes, receivedBytes, latency, newConnection, tlsHandshake);
+    }
+    System.out.println(
+        "HTTP "
+            + response.getCode()
+            + " in "
+            + TimeUnit.NANOSECONDS.toMillis(latency)
+            + "ms, sent "
+            + sentBytes
+            + " bytes, received "
+            + receivedBytes
+            + " bytes"
+            + (newConnection ? ", new connection" : ", reused connection"));
+  }
+
+  void record(
+      long sentBytes,
+      long receivedBytes,
+      long latency,
+      boolean newConnection,
+      boolean tlsHandshake) {
+    requests.incrementAndGet();
+    requestBytes.addAndGet(sentBytes);
+    responseBytes.addAndGet(receivedBytes);
+    latencyNanos.addAndGet(latency);
+    maxLatencyNanos.accumulateAndGet(latency, Math::max);
+    if (newConnection) {
+      newConnections.incrementAndGet();
+    } else {
+      reusedConnections.incrementAndGet();
+    }
+    if (tlsHandshake) {
+      tlsHandshakes.incrementAndGet();
+    }
+  }
+
+  public long getRequests() {
+    return requests.get();
+  }
+
+  public long getRequestBytes() {
+    return requestBytes.get();
+  }
+
+  public long getResponseBytes() {
+    return responseBytes.get();
+  }
+
+  /** Sum of the latencies of all requests, in milliseconds. */
+  public double getTotalLatencyMillis() {
+    return latencyNanos.get() / 1e6;
+  }
+
+  public double getMaxLatencyMillis() {
+    return maxLatencyNanos.get() / 1e6;
+  }
+
+  public long getNewConnections() {
+    return newConnections.get();
+  }
+
+  public long getTlsHandshakes() {
+    return tlsHandshakes.get();
+  }
+
+  public long getReusedConnections() {
+    return reusedConnections.get();
+  }
+}
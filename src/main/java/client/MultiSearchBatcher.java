@@ -0,0 +1,220 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import com.google.common.util.concurrent.ThreadFactoryBuilder;
+import java.io.Closeable;
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.ScheduledFuture;
+import java.util.concurrent.TimeUnit;
+import org.opensearch.OpenSearchStatusException;
+import org.opensearch.action.search.MultiSearchRequest;
+import org.opensearch.action.search.MultiSearchResponse;
+import org.opensearch.action.search.SearchRequest;
+import org.opensearch.action.search.SearchResponse;
+import org.opensearch.client.RequestOptions;
+import org.opensearch.client.RestHighLevelClient;
+import org.opensearch.core.rest.RestStatus;
+
+/**
+ * Coalesces searches sent at the same moment into one {@code _msearch} call.
+ *
+ * <p>A search sent while no other search is in flight goes out at once, so a lone query pays no
+ * delay. Searches arriving while another is in flight are gathered: the first waits up to {@code
+ * maxWaitMillis} for others to join it, and the batch is sent as soon as it holds {@code
+ * maxBatchSize} searches, the wait is over or the searches in flight are answered. Each caller gets
+ * its own response or failure back. Only plain searches are batched: PIT and scroll pages are
+ * sequential by nature and gain nothing from waiting.
+ */
+class MultiSearchBatcher implements Closeable {
+
+  /** A search waiting for its batch to be sent. */
+  private static class Pending {
+    final SearchRequest request;
+    final CompletableFuture<SearchResponse> response = new CompletableFuture<>();
+
+    Pending(SearchRequest request) {
+      this.request = request;
+    }
+  }
+
+  private final RestHighLevelClient client;
+  private final RequestOptions options;
+  private final int maxBatchSize;
+  private final long maxWaitMillis;
+  private final ScheduledExecutorService timer;
+
+  /** Searches of the batch being gathered. Guarded by {@code this}. */
+  private List<Pending> batch = new ArrayList<>();
+
+  /** Sends the current batch once its wait is over. Guarded by {@code this}. */
+  private ScheduledFuture<?> flushTask;
+
+  /** Batches sent and not answered yet. Guarded by {@code this}. */
+  private int inFlight;
+
+  MultiSearchBatcher(
+      RestHighLevelClient client, RequestOptions options, int maxBatchSize, long maxWaitMillis) {
+    this.client = client;
+    this.options = options;
+    this.maxBatchSize = Math.max(1, maxBatchSize);
+    this.maxWaitMillis = Math.max(0, maxWaitMillis);
+    this.timer =
+        Executors.newSingleThreadScheduledExecutor(
+            new ThreadFactoryBuilder()
+                .setNameFormat("opensearch-cli-msearch-%d")
+                .setDaemon(true)
+                .build());
+  }
+
+  static boolean isBatchable(SearchRequest request) {
+    return request.scroll() == null
+        && (request.source() == null || request.source().pointInTimeBuilder() == null);
+  }
+
+  /** Search as part of the next batch, waiting for the batch to be answered. */
+  SearchResponse search(SearchRequest request) throws IOException {
+    Pending pending = new Pending(request);
+    List<Pending> ready = null;
+    synchronized (this) {
+      batch.add(pending);
+      if (batch.size() >= maxBatchSize || (batch.size() == 1 && inFlight == 0)) {
+        // Nothing to wait for, or the batch is complete: send it from the caller's thread
+        ready = takeBatch();
+        inFlight++;
+      } else if (batch.size() == 1) {
+        flushTask = timer.schedule(this::flush, maxWaitMillis, TimeUnit.MILLISECONDS);
+      }
+    }
+    if (ready != null) {
+      send(ready);
+    }
+    return await(pending);
+  }
+
+  /** Fail the searches still waiting for their batch. */
+  @Override
+  public void close() {
+    List<Pending> remaining;
+    synchronized (this) {
+      remaining = takeBatch();
+    }
+    timer.shutdownNow();
+    IOException closed = new IOException("Client closed before the search was sent");
+    remaining.forEach(pending -> pending.response.completeExceptionally(closed));
+  }
+
+  private void flush() {
+    List<Pending> pending;
+    synchronized (this) {
+      pending = takeBatch();
+      if (pending.isEmpty()) {
+        return;
+      }
+      inFlight++;
+    }
+    send(pending);
+  }
+
+  /** Count a batch as answered, sending the gathered batch once nothing is in flight. */
+  private synchronized void answered() {
+    inFlight--;
+    if (inFlight == 0 && !batch.isEmpty() && !timer.isShutdown()) {
+      if (flushTask != null) {
+        flushTask.cancel(false);
+      }
+      flushTask = timer.schedule(this::flush, 0, TimeUnit.MILLISECONDS);
+    }
+  }
+
+  /** Detach the current batch. Caller must hold the lock. */
+  private List<Pending> takeBatch() {
+    if (flushTask != null) {
+      flushTask.cancel(false);
+      flushTask = null;
+    }
+    List<Pending> taken = batch;
+    batch = new ArrayList<>();
+    return taken;
+  }
+
+  private void send(List<Pending> pending) {
+    try {
+      sendNow(pending);
+    } finally {
+      answered();
+    }
+  }
+
+  private void sendNow(List<Pending> pending) {
+    if (pending.size() == 1) {
+      Pending single = pending.get(0);
+      try {
+        single.response.complete(client.search(single.request, options));
+      } catch (IOException | RuntimeException e) {
+        single.response.completeExceptionally(e);
+      }
+      return;
+    }
+
+    MultiSearchRequest multiSearch = new MultiSearchRequest();
+    pending.forEach(p -> multiSearch.add(p.request));
+    try {
+      MultiSearchResponse.Item[] items = client.msearch(multiSearch, options).getResponses();
+      System.out.println("Sent " + pending.size() + " searches in one _msearch call");
+      for (int i = 0; i < items.length; i++) {
+        if (items[i].isFailure()) {
+          pending.get(i).response.completeExceptionally(itemFailure(items[i].getFailure()));
+        } else {
+          pending.get(i).response.complete(items[i].getResponse());
+        }
+      }
+    } catch (IOException | RuntimeException e) {
+      pending.forEach(p -> p.response.completeExceptionally(e));
+    }
+  }
+
+  /**
+   * The HTTP status of a failed item is lost when the response is parsed. Restore it for rejected
+   * searches so that the retry policy treats them like a rejected single search.
+   */
+  static Exception itemFailure(Exception failure) {
+    for (Throwable cause = failure; cause != null; cause = cause.getCause()) {
+      String message = String.valueOf(cause.getMessage());
+      if (message.contains("type=rejected_execution_exception")
+          || message.contains("type=opensearch_rejected_execution_exception")
+          || message.contains("type=es_rejected_execution_exception")) {
+        return new OpenSearchStatusException(
+            String.valueOf(failure.getMessage()), RestStatus.TOO_MANY_REQUESTS, failure);
+      }
+    }
+    return failure;
+  }
+
+  private static SearchResponse await(Pending pending) throws IOException {
+    try {
+      return pending.response.get();
+    } catch (InterruptedException e) {
+      Thread.currentThread().interrupt();
+      throw new IOException("Interrupted while waiting for a batched search", e);
+    } catch (ExecutionException e) {
+      Throwable cause = e.getCause();
+      if (cause instanceof IOException) {
+        throw (IOException) cause;
+      }
+      if (cause instanceof RuntimeException) {
+        throw (RuntimeException) cause;
+      }
+      throw new IOException(cause);
+    }
+  }
+}
@@ -7,22 +7,39 @@ package client;
 
 import com.google.common.collect.ImmutableList;
 import com.google.common.collect.ImmutableMap;
+import com.google.common.util.concurrent.ThreadFactoryBuilder;
+import java.io.Closeable;
 import java.io.File;
 import java.io.FileWriter;
 import java.io.IOException;
+import java.io.InputStream;
+import java.nio.file.Path;
 import java.util.Arrays;
 import java.util.Collection;
 import java.util.HashMap;
 import java.util.List;
 import java.util.Map;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.ThreadPoolExecutor;
+import java.util.concurrent.TimeUnit;
 import java.util.stream.Collectors;
 import java.util.stream.Stream;
-import lombok.RequiredArgsConstructor;
+import lombok.Getter;
+import org.json.JSONArray;
+import org.json.JSONObject;
+import org.json.JSONTokener;
 import org.opensearch.action.admin.cluster.settings.ClusterGetSettingsRequest;
 import org.opensearch.action.admin.indices.settings.get.GetSettingsRequest;
 import org.opensearch.action.admin.indices.settings.get.GetSettingsResponse;
 import org.opensearch.action.search.*;
+import org.opensearch.client.HttpAsyncResponseConsumerFactory;
+import org.opensearch.client.Request;
 import org.opensearch.client.RequestOptions;
+import org.opensearch.client.Response;
+import org.opensearch.client.ResponseException;
+import org.opensearch.client.RestClient;
 import org.opensearch.client.RestHighLevelClient;
 import org.opensearch.client.indices.CreateIndexRequest;
 import org.opensearch.client.indices.GetIndexRequest;
@@ -50,17 +67,121 @@ import org.opensearch.transport.client.node.NodeClient;
  *
  * <p>TODO: Support for authN and authZ with AWS Sigv4 or security plugin.
  */
-@RequiredArgsConstructor
-public class OpenSearchRestClientImpl implements OpenSearchClient {
+public class OpenSearchRestClientImpl implements OpenSearchClient, Closeable {
 
   /** OpenSearch high level REST client. */
   private final RestHighLevelClient client;
 
+  /** Bounded worker pool running the engine's scheduled work off the caller thread. */
+  private final ExecutorService scheduler;
+
+  /** Requests the next PIT/scroll pages while the engine processes the current one. */
+  private final PagePrefetcher prefetcher;
+
+  /** Resources tied to this client's lifetime, such as the node sniffer. */
+  private final List<Closeable> resources = new CopyOnWriteArrayList<>();
+
+  /** Limits the requests per second and in flight, backing off when the cluster rejects them. */
+  @Getter private final RateLimiter rateLimiter;
+
+  /** Retries calls rejected under load or broken by a connection reset. */
+  @Getter private final RetryPolicy retryPolicy;
+
+  /** Options of every request, with the configured response buffer limit. */
+  private final RequestOptions requestOptions;
+
+  /** Splits searches whose response does not fit in the response buffer. */
+  private final ResponsePager pager;
+
+  /** Request cache and preference settings of the session. */
+  @Getter private final SessionSettings sessionSettings;
+
+  /** Coalesces concurrent plain searches into _msearch calls, null when disabled. */
+  private final MultiSearchBatcher batcher;
+
+  /** PITs kept open briefly for the next query on the same indices. */
+  private final PitPool pitPool;
+
+  private final int exportSlices;
+  private final int exportMaxSlices;
+  private final int exportPageSize;
+
+  /** Last export started on this client, null if none. */
+  @Getter private volatile SlicedExport export;
+
+  public OpenSearchRestClientImpl(RestHighLevelClient client, ClientOptions options) {
+    this.client = client;
+    this.rateLimiter = new RateLimiter(options);
+    this.retryPolicy = new RetryPolicy(options, rateLimiter);
+    this.sessionSettings = new SessionSettings(options);
+    this.pitPool =
+        new PitPool(
+            TimeUnit.SECONDS.toMillis(options.getPitReuseWindowSeconds()),
+            pitId -> deletePitNow(new DeletePitRequest(pitId)));
+    int bufferLimitMb = responseBufferLimitMb(options);
+    this.requestOptions =
+        RequestOptions.DEFAULT.toBuilder()
+            .setHttpAsyncResponseConsumerFactory(
+                new HttpAsyncResponseConsumerFactory.HeapBufferedResponseConsumerFactory(
+                    bufferLimitMb * 1024 * 1024))
+            .build();
+    this.pager =
+        new ResponsePager(
+            bufferLimitMb,
+            page -> {
+              // The AWS interceptor signs the body of the page, not the original request
+              writeForAwsBody(page.source().toString());
+              return retryPolicy.execute(
+                  "search page", true, () -> client.search(page, requestOptions));
+            });
+    this.exportSlices = options.getExportSlices();
+    this.exportMaxSlices = Math.max(1, options.getExportMaxSlices());
+    this.exportPageSize = Math.max(1, options.getExportPageSize());
+    this.scheduler = createScheduler(options);
+    this.prefetcher = new PagePrefetcher(client, options.getPrefetchDepth(), rateLimiter);
+    this.batcher =
+        options.isMsearchEnabled()
+            ? new MultiSearchBatcher(
+                client,
+                requestOptions,
+                options.getMsearchMaxBatch(),
+                options.getMsearchMaxWaitMillis())
+            : null;
+  }
+
+  /** Response buffer limit in MB, capped so that it still fits in an int of bytes. */
+  private static int responseBufferLimitMb(ClientOptions options) {
+    return Math.max(1, Math.min(options.getResponseBufferLimitMb(), Integer.MAX_VALUE >> 20));
+  }
+
+  private static ExecutorService createScheduler(ClientOptions options) {
+    int poolSize = Math.max(1, options.getSchedulerPoolSize());
+    ThreadPoolExecutor executor =
+        new ThreadPoolExecutor(
+            poolSize,
+            poolSize,
+            60L,
+            TimeUnit.SECONDS,
+            new ArrayBlockingQueue<>(Math.max(1, options.getSchedulerQueueSize())),
+            new ThreadFactoryBuilder()
+                .setNameFormat("opensearch-cli-scheduler-%d")
+                .setDaemon(true)
+                .build(),
+            // Once the queue is full, fall back to running the task inline
+            new ThreadPoolExecutor.CallerRunsPolicy());
+    executor.allowCoreThreadTimeOut(true);
+    return executor;
+  }
+
   @Override
   public boolean exists(String indexName) {
     System.out.println("OpenSearchRestClientImpl.exists()");
     try {
-      return client.indices().exists(new GetIndexRequest(indexName), RequestOptions.DEFAULT);
+      return retryPolicy.execute(
+          "exists",
+          true,
+          () ->
+              client.indices().exists(new GetIndexRequest(indexName), requestOptions));
     } catch (IOException e) {
       throw new IllegalStateException("Failed to check if index [" + indexName + "] exist", e);
     }
@@ -70,9 +191,14 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
   public void createIndex(String indexName, Map<String, Object> mappings) {
     System.out.println("OpenSearchRestClientImpl.createIndex()");
     try {
-      client
-          .indices()
-          .create(new CreateIndexRequest(indexName).mapping(mappings), RequestOptions.DEFAULT);
+      retryPolicy.execute(
+          "createIndex",
+          false,
+          () ->
+              client
+                  .indices()
+                  .create(
+                      new CreateIndexRequest(indexName).mapping(mappings), requestOptions));
     } catch (IOException e) {
       throw new IllegalStateException("Failed to create index [" + indexName + "]", e);
     }
@@ -83,7 +209,11 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
     System.out.println("OpenSearchRestClientImpl.getIndexMappings()");
     GetMappingsRequest request = new GetMappingsRequest().indices(indexExpression);
     try {
-      GetMappingsResponse response = client.indices().getMapping(request, RequestOptions.DEFAULT);
+      GetMappingsResponse response =
+          retryPolicy.execute(
+              "getMapping",
+              true,
+              () -> client.indices().getMapping(request, requestOptions));
       return response.mappings().entrySet().stream()
           .collect(Collectors.toMap(Map.Entry::getKey, e -> new IndexMapping(e.getValue())));
     } catch (IOException e) {
@@ -97,7 +227,11 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
     GetSettingsRequest request =
         new GetSettingsRequest().indices(indexExpression).includeDefaults(true);
     try {
-      GetSettingsResponse response = client.indices().getSettings(request, RequestOptions.DEFAULT);
+      GetSettingsResponse response =
+          retryPolicy.execute(
+              "getSettings",
+              true,
+              () -> client.indices().getSettings(request, requestOptions));
       Map<String, Settings> settings = response.getIndexToSettings();
       Map<String, Settings> defaultSettings = response.getIndexToDefaultSettings();
       Map<String, Integer> result = new HashMap<>();
@@ -153,7 +287,9 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
         if (pitId != null) {
           System.out.println("Query request - PIT ID: " + pitId);
           // Configure PIT search request using the existing pitId
-          sourceBuilder.pointInTimeBuilder(new PointInTimeBuilder(pitId));
+          // Extend the keep-alive on every page, a pooled PIT may outlive this query
+          sourceBuilder.pointInTimeBuilder(
+              new PointInTimeBuilder(pitId).setKeepAlive(queryRequest.getCursorKeepAlive()));
           sourceBuilder.timeout(queryRequest.getCursorKeepAlive());
 
           // Check for search after
@@ -172,6 +308,8 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
           }
         }
 
+        sessionSettings.applyTrackTotalHits(sourceBuilder);
+
         // Convert the final source builder to a string
         dslQuery = sourceBuilder.toString();
         System.out.println("Query request - Source builder: " + dslQuery);
@@ -185,7 +323,13 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
     return request.search(
         req -> {
           try {
-            return client.search(req, RequestOptions.DEFAULT);
+            sessionSettings.apply(req);
+            SearchResponse response = searchInPagesIfTooLong(req);
+            QueryContext context = QueryContext.current();
+            if (context != null) {
+              context.recordTotalHits(response.getHits().getTotalHits());
+            }
+            return response;
           } catch (IOException e) {
             throw new IllegalStateException(
                 "Failed to perform search operation with request " + req, e);
@@ -193,14 +337,39 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
         },
         req -> {
           try {
-            return client.scroll(req, RequestOptions.DEFAULT);
+            return retryPolicy.execute(
+                "scroll", true, () -> prefetcher.scroll(req, requestOptions));
           } catch (IOException e) {
+            if (ResponsePager.isTooLong(e)) {
+              throw new IllegalStateException(
+                  pager.tooLong("a scroll page cannot be split", e).getMessage(), e);
+            }
             throw new IllegalStateException(
                 "Failed to perform scroll operation with request " + req, e);
           }
         });
   }
 
+  /** Search, falling back to smaller pages when the response exceeds the buffer limit. */
+  private SearchResponse searchInPagesIfTooLong(SearchRequest request) throws IOException {
+    try {
+      return retryPolicy.execute("search", true, () -> send(request));
+    } catch (IOException e) {
+      if (!ResponsePager.isTooLong(e)) {
+        throw e;
+      }
+      System.out.println("Response exceeds the buffer limit, fetching it in smaller pages");
+      return pager.search(request, e);
+    }
+  }
+
+  private SearchResponse send(SearchRequest request) throws IOException {
+    if (batcher != null && MultiSearchBatcher.isBatchable(request)) {
+      return batcher.search(request);
+    }
+    return prefetcher.search(request, requestOptions);
+  }
+
   /**
    * Get the combination of the indices and the alias.
    *
@@ -211,7 +380,10 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
     System.out.println("OpenSearchRestClientImpl.indices()");
     try {
       GetIndexResponse indexResponse =
-          client.indices().get(new GetIndexRequest(), RequestOptions.DEFAULT);
+          retryPolicy.execute(
+              "getIndex",
+              true,
+              () -> client.indices().get(new GetIndexRequest(), requestOptions));
       final Stream<String> aliasStream =
           ImmutableList.copyOf(indexResponse.getAliases().values()).stream()
               .flatMap(Collection::stream)
@@ -237,7 +409,12 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
       request.includeDefaults(true);
       request.local(true);
       final Settings defaultSettings =
-          client.cluster().getSettings(request, RequestOptions.DEFAULT).getDefaultSettings();
+          retryPolicy
+              .execute(
+                  "getClusterSettings",
+                  true,
+                  () -> client.cluster().getSettings(request, requestOptions))
+              .getDefaultSettings();
       builder.put(META_CLUSTER_NAME, defaultSettings.get("cluster.name", "opensearch"));
       builder.put(
           "plugins.sql.pagination.api", defaultSettings.get("plugins.sql.pagination.api", "true"));
@@ -253,10 +430,14 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
     if (request instanceof OpenSearchScrollRequest) {
       request.clean(
           scrollId -> {
+            prefetcher.discard(scrollId);
             try {
               ClearScrollRequest clearRequest = new ClearScrollRequest();
               clearRequest.addScrollId(scrollId);
-              client.clearScroll(clearRequest, RequestOptions.DEFAULT);
+              retryPolicy.execute(
+                  "clearScroll",
+                  true,
+                  () -> client.clearScroll(clearRequest, requestOptions));
             } catch (IOException e) {
               throw new IllegalStateException(
                   "Failed to clean up resources for search request " + request, e);
@@ -265,6 +446,7 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
     } else {
       request.clean(
           pitId -> {
+            prefetcher.discard(pitId);
             DeletePitRequest deletePitRequest = new DeletePitRequest(pitId);
             deletePit(deletePitRequest);
           });
@@ -274,7 +456,143 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
   @Override
   public void schedule(Runnable task) {
     System.out.println("OpenSearchRestClientImpl.schedule()");
-    task.run();
+    QueryContext context = QueryContext.current();
+    scheduler.execute(
+        () -> {
+          try {
+            task.run();
+          } catch (Exception e) {
+            System.err.println("Scheduled task failed: " + e.getMessage());
+            e.printStackTrace();
+            // Fail the query instead of leaving it waiting for a response that never comes
+            if (context != null) {
+              context.taskFailed(e);
+            }
+          }
+        });
+  }
+
+  /**
+   * Start exporting every document of {@code index} to {@code output} in the background.
+   *
+   * @param slices number of slices read concurrently, 0 for the configured default
+   * @throws IllegalStateException if another export is still running
+   */
+  public synchronized SlicedExport startExport(String index, Path output, int slices)
+      throws IOException {
+    if (export != null && export.getState() == SlicedExport.State.RUNNING) {
+      throw new IllegalStateException("An export of " + export.getIndex() + " is still running");
+    }
+
+    int requested = slices > 0 ? slices : exportSlices;
+    SlicedExport started =
+        new SlicedExport(
+            index,
+            output,
+            Math.max(1, Math.min(requested, exportMaxSlices)),
+            exportPageSize,
+            new SlicedExport.Backend() {
+              @Override
+              public String createPit(CreatePitRequest request) throws IOException {
+                return createPitNow(request);
+              }
+
+              @Override
+              public SearchResponse search(SearchRequest request) throws IOException {
+                writeForAwsBody(request.source().toString());
+                return retryPolicy.execute(
+                    "export", true, () -> client.search(request, requestOptions));
+              }
+
+              @Override
+              public void deletePit(String pitId) throws IOException {
+                deletePitNow(new DeletePitRequest(pitId));
+              }
+            });
+    export = started;
+    started.start();
+    return started;
+  }
+
+  /** Close {@code resource} before the REST client when this client is closed. */
+  void closeWith(Closeable resource) {
+    resources.add(resource);
+  }
+
+  /** Stop the scheduler, waiting briefly for running tasks, then close the REST client. */
+  @Override
+  public void close() throws IOException {
+    System.out.println("OpenSearchRestClientImpl.close()");
+    for (Closeable resource : resources) {
+      resource.close();
+    }
+    SlicedExport running = export;
+    if (running != null) {
+      running.cancel();
+    }
+    pitPool.close();
+    if (batcher != null) {
+      batcher.close();
+    }
+    prefetcher.clear();
+    scheduler.shutdown();
+    try {
+      if (!scheduler.awaitTermination(2, TimeUnit.SECONDS)) {
+        scheduler.shutdownNow();
+      }
+    } catch (InterruptedException e) {
+      scheduler.shutdownNow();
+      Thread.currentThread().interrupt();
+    }
+    client.close();
+  }
+
+  /**
+   * Cancel the cluster tasks of a query, found through the opaque ID its requests were tagged with.
+   * Only top-level tasks are cancelled, the cluster cancels their child tasks with them.
+   *
+   * @return the number of tasks cancelled
+   */
+  public int cancelTasks(String opaqueId) throws IOException {
+    RestClient lowLevelClient = client.getLowLevelClient();
+    Request list = new Request("GET", "/_tasks");
+    list.addParameter("actions", "indices:data/read/*");
+    list.addParameter("group_by", "none");
+    JSONArray tasks;
+    // The query may hold every in-flight slot, so cancelling it must not wait for one
+    Response listed = rateLimiter.runUrgent(() -> lowLevelClient.performRequest(list));
+    try (InputStream content = listed.getEntity().getContent()) {
+      tasks = new JSONObject(new JSONTokener(content)).optJSONArray("tasks");
+    }
+    if (tasks == null) {
+      return 0;
+    }
+
+    int cancelled = 0;
+    for (int i = 0; i < tasks.length(); i++) {
+      JSONObject task = tasks.getJSONObject(i);
+      JSONObject headers = task.optJSONObject("headers");
+      if (headers == null
+          || !opaqueId.equals(headers.optString(QueryContext.OPAQUE_ID_HEADER))
+          || task.has("parent_task_id")
+          || !task.optBoolean("cancellable")) {
+        continue;
+      }
+
+      String taskId = task.getString("node") + ":" + task.getLong("id");
+      // The cancel request has no body for the AWS interceptor to sign
+      writeForAwsBody("");
+      try {
+        Request cancel = new Request("POST", "/_tasks/" + taskId + "/_cancel");
+        rateLimiter.runUrgent(() -> lowLevelClient.performRequest(cancel));
+        cancelled++;
+      } catch (ResponseException e) {
+        // The task ended between listing and cancelling it
+        System.err.println("Failed to cancel task " + taskId + ": " + e.getMessage());
+      }
+    }
+    System.out.println("Cancelled " + cancelled + " task(s) of query " + opaqueId);
+    return cancelled;
   }
 
   @Override
@@ -286,37 +604,57 @@ public class OpenSearchRestClientImpl implements OpenSearchClient {
   public String createPit(CreatePitRequest createPitRequest) {
     System.out.println("OpenSearchRestClientImpl.createPit()");
 
+    sessionSettings.apply(createPitRequest);
     try {
-      // For the AWS interceptor to use
-      String bodyContent = getBodyContent(createPitRequest);
-      writeForAwsBody(bodyContent);
-
-      CreatePitResponse createPitResponse =
-          client.createPit(createPitRequest, RequestOptions.DEFAULT);
-      String pitId = createPitResponse.getId();
-      System.out.println("PIT created successfully with ID: " + pitId);
-      return pitId;
+      return pitPool.acquire(createPitRequest, this::createPitNow);
     } catch (IOException e) {
       throw new RuntimeException("Error occurred while creating PIT for new engine SQL query", e);
     }
   }
 
+  private String createPitNow(CreatePitRequest createPitRequest) throws IOException {
+    // For the AWS interceptor to use
+    String bodyContent = getBodyContent(createPitRequest);
+    writeForAwsBody(bodyContent);
+
+    // Not idempotent: a PIT created before a connection reset would leak if created again
+    CreatePitResponse createPitResponse =
+        retryPolicy.execute(
+            "createPit", false, () -> client.createPit(createPitRequest, requestOptions));
+    String pitId = createPitResponse.getId();
+    System.out.println("PIT created successfully with ID: " + pitId);
+    return pitId;
+  }
+
   @Override
   public void deletePit(DeletePitRequest deletePitRequest) {
     System.out.println("OpenSearchRestClientImpl.deletePit()");
 
-    try {
-      // For the AWS interceptor to use
-      String bodyContent = getBodyContent(deletePitRequest);
-      writeForAwsBody(bodyContent);
+    // Pooled PITs are handed back to the pool, which deletes them in the background
+    List<String> unpooled =
+        deletePitRequest.getPitIds().stream()
+            .filter(pitId -> !pitPool.release(pitId))
+            .collect(Collectors.toList());
+    if (unpooled.isEmpty()) {
+      return;
+    }
 
-      DeletePitResponse deletePitResponse =
-          client.deletePit(deletePitRequest, RequestOptions.DEFAULT);
+    try {
+      deletePitNow(new DeletePitRequest(unpooled));
     } catch (IOException e) {
-      throw new RuntimeException("Error occurred while creating PIT for new engine SQL query", e);
+      throw new RuntimeException("Error occurred while deleting PIT for new engine SQL query", e);
     }
   }
 
+  private void deletePitNow(DeletePitRequest deletePitRequest) throws IOException {
+    // For the AWS interceptor to use
+    String bodyContent = getBodyContent(deletePitRequest);
+    writeForAwsBody(bodyContent);
+
+    retryPolicy.execute(
+        "deletePit", true, () -> client.deletePit(deletePitRequest, requestOptions));
+  }
+
   // Helper methods for AWS interceptor to sign its body
   private String getBodyContent(ToXContent request) throws IOException {
     XContentBuilder builder = XContentFactory.jsonBuilder();
@@ -0,0 +1,304 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.io.IOException;
+import java.util.ArrayDeque;
+import java.util.Arrays;
+import java.util.Deque;
+import java.util.Map;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutionException;
+import org.opensearch.action.search.SearchRequest;
+import org.opensearch.action.search.SearchResponse;
+import org.opensearch.action.search.SearchScrollRequest;
+import org.opensearch.client.RequestOptions;
+import org.opensearch.client.RestHighLevelClient;
+import org.opensearch.core.action.ActionListener;
+import org.opensearch.search.SearchHit;
+import org.opensearch.search.builder.PointInTimeBuilder;
+import org.opensearch.search.builder.SearchSourceBuilder;
+
+/**
+ * Fetches upcoming PIT/search_after and scroll pages ahead of the engine.
+ *
+ * <p>As soon as a page arrives, the request for the following page is known (the last hit's sort
+ * values, or the scroll ID), so it is sent with the asynchronous REST API while the engine is still
+ * processing the current page. Up to {@code depth} pages are buffered per pagination stream. When
+ * the engine asks for a page that is not at the head of a pipeline, the pipeline is dropped and the
+ * page is fetched with a blocking call as before.
+ *
+ * <p>Prefetches are sent outside of {@link RetryPolicy}: a prefetch that fails is not retried, its
+ * pipeline is dropped and the engine's own request is sent again through the retry path. The time
+ * a prefetch takes is still added to the {@link QueryContext} it was sent for.
+ */
+class PagePrefetcher {
+
+  private final RestHighLevelClient client;
+  private final int depth;
+  private final RateLimiter rateLimiter;
+
+  /** Pipelines indexed by the key of the request the engine is expected to send next. */
+  private final Map<String, Pipeline> pipelines = new ConcurrentHashMap<>();
+
+  PagePrefetcher(RestHighLevelClient client, int depth, RateLimiter rateLimiter) {
+    this.client = client;
+    this.depth = depth;
+    this.rateLimiter = rateLimiter;
+  }
+
+  /** A page requested ahead of the engine. */
+  private static class PendingPage {
+    final String key;
+    final CompletableFuture<SearchResponse> response = new CompletableFuture<>();
+
+    PendingPage(String key) {
+      this.key = key;
+    }
+  }
+
+  /** Pages buffered for one PIT or scroll stream, fetched strictly one after another. */
+  private static class Pipeline {
+    final Deque<PendingPage> pages = new ArrayDeque<>();
+    final RequestOptions options;
+    String owner;
+    Object tailRequest;
+    SearchResponse tailResponse;
+    boolean inFlight;
+    boolean closed;
+
+    Pipeline(
+        String owner, Object tailRequest, SearchResponse tailResponse, RequestOptions options) {
+      this.owner = owner;
+      this.tailRequest = tailRequest;
+      this.tailResponse = tailResponse;
+      this.options = options;
+    }
+  }
+
+  /** Search, serving the page from a pipeline when it was already requested. */
+  SearchResponse search(SearchRequest request, RequestOptions options) throws IOException {
+    String pitId = pitIdOf(request);
+    if (depth <= 0 || (request.scroll() == null && pitId == null)) {
+      return client.search(request, options);
+    }
+
+    String key = keyOf(request);
+    SearchResponse response = key == null ? null : take(key);
+    if (response == null) {
+      response = client.search(request, options);
+      String owner = request.scroll() != null ? response.getScrollId() : pitId;
+      advance(new Pipeline(owner, request, response, options));
+    }
+    return response;
+  }
+
+  /** Scroll, serving the page from a pipeline when it was already requested. */
+  SearchResponse scroll(SearchScrollRequest request, RequestOptions options) throws IOException {
+    if (depth <= 0) {
+      return client.scroll(request, options);
+    }
+
+    SearchResponse response = take(keyOf(request));
+    if (response == null) {
+      response = client.scroll(request, options);
+      advance(new Pipeline(response.getScrollId(), request, response, options));
+    }
+    return response;
+  }
+
+  /** Drop the pipelines of a PIT or scroll context that is being released. */
+  void discard(String pitOrScrollId) {
+    pipelines
+        .entrySet()
+        .removeIf(
+            entry -> {
+              Pipeline pipeline = entry.getValue();
+              synchronized (pipeline) {
+                if (pitOrScrollId.equals(pipeline.owner)) {
+                  pipeline.closed = true;
+                  return true;
+                }
+                return false;
+              }
+            });
+  }
+
+  void clear() {
+    pipelines.values().forEach(pipeline -> pipeline.closed = true);
+    pipelines.clear();
+  }
+
+  /**
+   * Take the head page of the pipeline expecting {@code key}.
+   *
+   * @return the page, or null if it was not prefetched or the prefetch failed
+   */
+  private SearchResponse take(String key) {
+    Pipeline pipeline = pipelines.remove(key);
+    if (pipeline == null) {
+      return null;
+    }
+
+    PendingPage head;
+    synchronized (pipeline) {
+      head = pipeline.pages.pollFirst();
+      register(pipeline);
+    }
+    if (head == null) {
+      return null;
+    }
+
+    try {
+      SearchResponse response = head.response.get();
+      System.out.println("Served prefetched page for " + key);
+      advance(pipeline);
+      return response;
+    } catch (InterruptedException e) {
+      Thread.currentThread().interrupt();
+    } catch (ExecutionException e) {
+      System.err.println("Prefetched page failed, fetching it again: " + e.getCause());
+    }
+    discard(pipeline.owner);
+    return null;
+  }
+
+  /** Request the page after the pipeline's tail unless the pipeline is full or exhausted. */
+  private void advance(Pipeline pipeline) {
+    synchronized (pipeline) {
+      if (pipeline.closed || pipeline.inFlight || pipeline.pages.size() >= depth) {
+        return;
+      }
+
+      Object next = nextRequest(pipeline.tailRequest, pipeline.tailResponse);
+      // A prefetch is only worth sending while the rate limiter has room for it
+      if (next == null || !rateLimiter.tryAcquire()) {
+        return;
+      }
+
+      PendingPage page = new PendingPage(keyOf(next));
+      pipeline.pages.addLast(page);
+      pipeline.inFlight = true;
+      register(pipeline);
+
+      QueryContext context = QueryContext.current();
+      long start = System.nanoTime();
+      ActionListener<SearchResponse> listener =
+          ActionListener.wrap(
+              response -> {
+                addOpenSearchTime(context, start);
+                rateLimiter.release();
+                rateLimiter.onSuccess();
+                synchronized (pipeline) {
+                  pipeline.inFlight = false;
+                  pipeline.tailRequest = next;
+                  pipeline.tailResponse = response;
+                  if (response.getScrollId() != null) {
+                    pipeline.owner = response.getScrollId();
+                  }
+                }
+                page.response.complete(response);
+                advance(pipeline);
+              },
+              e -> {
+                addOpenSearchTime(context, start);
+                rateLimiter.release();
+                if (RetryPolicy.isRejection(e)) {
+                  rateLimiter.onRejected();
+                }
+                synchronized (pipeline) {
+                  pipeline.inFlight = false;
+                  pipeline.closed = true;
+                }
+                page.response.completeExceptionally(e);
+              });
+
+      if (next instanceof SearchScrollRequest) {
+        client.scrollAsync((SearchScrollRequest) next, pipeline.options, listener);
+      } else {
+        client.searchAsync((SearchRequest) next, pipeline.options, listener);
+      }
+    }
+  }
+
+  private static void addOpenSearchTime(QueryContext context, long start) {
+    if (context != null) {
+      context.addOpenSearchTime(System.nanoTime() - start);
+    }
+  }
+
+  /** Index the pipeline under the key of its head page. Caller must hold the pipeline lock. */
+  private void register(Pipeline pipeline) {
+    PendingPage head = pipeline.pages.peekFirst();
+    if (head != null && !pipeline.closed) {
+      pipelines.put(head.key, pipeline);
+    }
+  }
+
+  /**
+   * Build the request for the page after {@code response}.
+   *
+   * @return the next request, or null if {@code response} was the last page
+   */
+  private static Object nextRequest(Object request, SearchResponse response) {
+    SearchHit[] hits = response.getHits().getHits();
+    if (hits.length == 0) {
+      return null;
+    }
+
+    if (response.getScrollId() != null) {
+      SearchScrollRequest next = new SearchScrollRequest(response.getScrollId());
+      if (request instanceof SearchRequest) {
+        next.scroll(((SearchRequest) request).scroll());
+      } else {
+        next.scroll(((SearchScrollRequest) request).scroll());
+      }
+      return next;
+    }
+
+    SearchRequest previous = (SearchRequest) request;
+    SearchSourceBuilder source = previous.source();
+    if (source.size() > 0 && hits.length < source.size()) {
+      return null;
+    }
+    Object[] sortValues = hits[hits.length - 1].getSortValues();
+    if (sortValues == null || sortValues.length == 0) {
+      return null;
+    }
+    return new SearchRequest(previous).source(source.shallowCopy().searchAfter(sortValues));
+  }
+
+  private static String keyOf(Object request) {
+    if (request instanceof SearchScrollRequest) {
+      return "scroll:" + ((SearchScrollRequest) request).scrollId();
+    }
+
+    SearchRequest searchRequest = (SearchRequest) request;
+    String pitId = pitIdOf(searchRequest);
+    if (searchRequest.scroll() != null || pitId == null) {
+      // Only continuations are prefetched, the first page of a stream is never known ahead
+      return null;
+    }
+    // A reused PIT may serve another query, so the key covers the whole request body
+    SearchSourceBuilder source = searchRequest.source();
+    return "pit:"
+        + pitId
+        + ":"
+        + Integer.toHexString(source.hashCode())
+        + ":"
+        + Arrays.toString(source.searchAfter());
+  }
+
+  private static String pitIdOf(SearchRequest request) {
+    SearchSourceBuilder source = request.source();
+    if (source == null) {
+      return null;
+    }
+    PointInTimeBuilder pit = source.pointInTimeBuilder();
+    return pit == null ? null : pit.getId();
+  }
+}
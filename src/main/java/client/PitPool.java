@@ -0,0 +1,199 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import com.google.common.util.concurrent.ThreadFactoryBuilder;
+import java.io.Closeable;
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.TimeUnit;
+import org.opensearch.action.search.CreatePitRequest;
+
+/**
+ * Shares point-in-time contexts between consecutive queries on the same indices.
+ *
+ * <p>A PIT released by a query stays open for a short reuse window. A query created within the
+ * window on the same index expression (and preference and routing) gets the same PIT back instead
+ * of creating one, and so reads the same snapshot. PITs that are not reused are deleted in the
+ * background once the window is over, off the query's critical path.
+ */
+class PitPool implements Closeable {
+
+  /** Creates a PIT on the cluster. */
+  @FunctionalInterface
+  interface Create {
+    String create(CreatePitRequest request) throws IOException;
+  }
+
+  /** Deletes a PIT on the cluster. */
+  @FunctionalInterface
+  interface Delete {
+    void delete(String pitId) throws IOException;
+  }
+
+  /** Idle PITs are not reused this close to the end of their keep-alive. */
+  private static final long KEEP_ALIVE_MARGIN_MILLIS = 5000;
+
+  private final long windowMillis;
+  private final Delete delete;
+
+  /** Runs window expirations and background deletions, null when reuse is disabled. */
+  private final ScheduledExecutorService reaper;
+
+  /** Reusable PIT per pool key. Guarded by {@code this}. */
+  private final Map<String, Entry> byKey = new HashMap<>();
+
+  /** Every PIT owned by the pool, reusable or not. Guarded by {@code this}. */
+  private final Map<String, Entry> byId = new HashMap<>();
+
+  private static class Entry {
+    final String key;
+    final String id;
+    final long keepAliveMillis;
+    int users;
+    long releasedAt;
+
+    Entry(String key, String id, long keepAliveMillis) {
+      this.key = key;
+      this.id = id;
+      this.keepAliveMillis = keepAliveMillis;
+    }
+  }
+
+  PitPool(long windowMillis, Delete delete) {
+    this.windowMillis = windowMillis;
+    this.delete = delete;
+    this.reaper =
+        windowMillis > 0
+            ? Executors.newSingleThreadScheduledExecutor(
+                new ThreadFactoryBuilder()
+                    .setNameFormat("opensearch-cli-pit-pool-%d")
+                    .setDaemon(true)
+                    .build())
+            : null;
+  }
+
+  /** Reuse an open PIT for the indices of {@code request}, or create one. */
+  String acquire(CreatePitRequest request, Create create) throws IOException {
+    if (reaper == null) {
+      return create.create(request);
+    }
+
+    String key = keyOf(request);
+    synchronized (this) {
+      Entry entry = byKey.get(key);
+      if (entry != null && (entry.users > 0 || isReusable(entry, System.currentTimeMillis()))) {
+        entry.users++;
+        System.out.println("Reusing PIT for " + key + ": " + entry.id);
+        return entry.id;
+      }
+    }
+
+    String id = create.create(request);
+    synchronized (this) {
+      Entry entry = new Entry(key, id, request.getKeepAlive().millis());
+      entry.users = 1;
+      byId.put(id, entry);
+      Entry previous = byKey.put(key, entry);
+      if (previous != null && previous.users == 0) {
+        evict(previous);
+      }
+    }
+    return id;
+  }
+
+  /**
+   * Give back a PIT obtained from {@link #acquire}.
+   *
+   * @return false if the PIT does not belong to the pool and must be deleted by the caller
+   */
+  boolean release(String pitId) {
+    if (reaper == null) {
+      return false;
+    }
+
+    Entry entry;
+    synchronized (this) {
+      entry = byId.get(pitId);
+      if (entry == null) {
+        return false;
+      }
+      if (--entry.users > 0) {
+        return true;
+      }
+
+      entry.releasedAt = System.currentTimeMillis();
+      if (byKey.get(entry.key) != entry) {
+        // A newer PIT replaced this one while it was in use
+        evict(entry);
+        return true;
+      }
+    }
+
+    reaper.schedule(() -> expire(entry), windowMillis, TimeUnit.MILLISECONDS);
+    return true;
+  }
+
+  /** Delete every PIT of the pool, waiting for the deletions. */
+  @Override
+  public void close() {
+    if (reaper == null) {
+      return;
+    }
+
+    List<String> ids;
+    synchronized (this) {
+      ids = new ArrayList<>(byId.keySet());
+      byId.clear();
+      byKey.clear();
+    }
+    reaper.shutdownNow();
+    ids.forEach(this::deleteQuietly);
+  }
+
+  private synchronized void expire(Entry entry) {
+    long now = System.currentTimeMillis();
+    if (entry.users == 0 && byId.get(entry.id) == entry && now - entry.releasedAt >= windowMillis) {
+      evict(entry);
+    }
+  }
+
+  /** Forget {@code entry} and delete its PIT in the background. Caller must hold the lock. */
+  private void evict(Entry entry) {
+    byId.remove(entry.id);
+    byKey.remove(entry.key, entry);
+    if (!reaper.isShutdown()) {
+      reaper.execute(() -> deleteQuietly(entry.id));
+    }
+  }
+
+  private void deleteQuietly(String pitId) {
+    try {
+      delete.delete(pitId);
+    } catch (Exception e) {
+      // The cluster frees the PIT anyway once its keep-alive expires
+      System.err.println("Failed to delete PIT " + pitId + ": " + e.getMessage());
+    }
+  }
+
+  private boolean isReusable(Entry entry, long now) {
+    long idle = now - entry.releasedAt;
+    return idle < windowMillis && idle < entry.keepAliveMillis - KEEP_ALIVE_MARGIN_MILLIS;
+  }
+
+  private static String keyOf(CreatePitRequest request) {
+    return String.join(",", request.indices())
+        + "|"
+        + request.getPreference()
+        + "|"
+        + request.getRouting();
+  }
+}
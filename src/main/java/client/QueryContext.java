@@ -0,0 +1,226 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Deque;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.UUID;
+import java.util.concurrent.atomic.AtomicBoolean;
+import java.util.concurrent.atomic.AtomicInteger;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.concurrent.atomic.AtomicReference;
+import java.util.function.Consumer;
+import lombok.Getter;
+import lombok.Setter;
+import org.apache.lucene.search.TotalHits;
+
+/**
+ * The logical query the CLI is currently executing.
+ *
+ * <p>The engine sends the requests of one query from several threads (the caller and the
+ * scheduler), so the context is a process-wide reference rather than a thread local. The CLI runs
+ * one query at a time, which makes this unambiguous.
+ */
+public class QueryContext {
+
+  /** Header tagging every HTTP request of a query with its ID, see the cluster's tasks API. */
+  public static final String OPAQUE_ID_HEADER = "X-Opaque-Id";
+
+  private static final AtomicReference<QueryContext> CURRENT = new AtomicReference<>();
+  private static final AtomicReference<QueryContext> LAST = new AtomicReference<>();
+
+  /** Phase from the start of the query until the engine submits its plan: parsing. */
+  public static final String PARSE = "parse";
+
+  /** Phase until the engine responds: analysis, planning and execution, OpenSearch included. */
+  public static final String EXECUTE = "execute";
+
+  /** Phase until the response is formatted for the CLI. */
+  public static final String FORMAT = "format";
+
+  /** Number of finished and running queries kept for the per-query statistics. */
+  private static final int RECENT_SIZE = 20;
+
+  private static final Deque<QueryContext> RECENT = new ArrayDeque<>();
+
+  @Getter private final String id;
+
+  /** Query text as entered by the user. */
+  @Getter private final String query;
+
+  /** HTTP requests sent on behalf of this query. */
+  @Getter private final HttpMetrics httpMetrics = new HttpMetrics();
+
+  private final AtomicInteger retries = new AtomicInteger();
+
+  /** Hit count reported for the query's first search, null if not counted. */
+  @Getter private volatile Long totalHits;
+
+  /** Whether {@link #totalHits} is a lower bound rather than the exact count. */
+  @Getter private volatile boolean totalHitsLowerBound;
+
+  private final AtomicBoolean totalHitsRecorded = new AtomicBoolean();
+
+  /** Number of rows the query returned, null until its results arrived. */
+  @Getter @Setter private volatile Integer rows;
+
+  private final long startNanos = System.nanoTime();
+
+  /** End of the last phase. Guarded by {@link #phaseNanos}. */
+  private long phaseEndNanos = startNanos;
+
+  /** Duration of each ended phase, in the order they ended. */
+  private final Map<String, Long> phaseNanos = new LinkedHashMap<>();
+
+  /** Time spent in calls to OpenSearch, summed over the threads that made them. */
+  private final AtomicLong openSearchNanos = new AtomicLong();
+
+  /** Called when a task scheduled for this query fails, null to only log the failure. */
+  @Setter private volatile Consumer<Exception> taskFailureHandler;
+
+  private QueryContext(String id, String query) {
+    this.id = id;
+    this.query = query;
+  }
+
+  /** Start a new query, replacing the current one. */
+  public static QueryContext begin(String query) {
+    QueryContext context = new QueryContext(UUID.randomUUID().toString(), query);
+    CURRENT.set(context);
+    LAST.set(context);
+    synchronized (RECENT) {
+      RECENT.addFirst(context);
+      if (RECENT.size() > RECENT_SIZE) {
+        RECENT.removeLast();
+      }
+    }
+    return context;
+  }
+
+  /** Finish {@code context} if it is still the current query. */
+  public static void end(QueryContext context) {
+    CURRENT.compareAndSet(context, null);
+  }
+
+  /**
+   * @return the query being executed, or null outside of a query
+   */
+  public static QueryContext current() {
+    return CURRENT.get();
+  }
+
+  /**
+   * @return the most recently started query, or null if none was run yet
+   */
+  public static QueryContext last() {
+    return LAST.get();
+  }
+
+  /**
+   * @return the most recent queries, newest first
+   */
+  public static List<QueryContext> recent() {
+    synchronized (RECENT) {
+      return new ArrayList<>(RECENT);
+    }
+  }
+
+  /** Number of requests retried on behalf of this query. */
+  public int getRetries() {
+    return retries.get();
+  }
+
+  /** Remember the hit count of the query's first search response, later pages are ignored. */
+  void recordTotalHits(TotalHits hits) {
+    if (!totalHitsRecorded.compareAndSet(false, true)) {
+      return;
+    }
+    // Without hit tracking the count is unknown, only the fetched rows are known to match
+    totalHitsLowerBound =
+        hits == null || hits.relation() == TotalHits.Relation.GREATER_THAN_OR_EQUAL_TO;
+    totalHits = hits == null ? null : hits.value();
+  }
+
+  /**
+   * @return whether a search response of this query reported its hit count
+   */
+  public boolean hasTotalHits() {
+    return totalHitsRecorded.get();
+  }
+
+  /** End the running phase, named {@code phase}, the next phase starts now. */
+  public void endPhase(String phase) {
+    synchronized (phaseNanos) {
+      long now = System.nanoTime();
+      phaseNanos.merge(phase, now - phaseEndNanos, Long::sum);
+      phaseEndNanos = now;
+    }
+  }
+
+  /** Report a scheduled task of this query that failed without notifying the engine's listener. */
+  void taskFailed(Exception e) {
+    Consumer<Exception> handler = taskFailureHandler;
+    if (handler != null) {
+      handler.accept(e);
+    }
+  }
+
+  /** Add the duration of a call to OpenSearch, retries and backoff included. */
+  void addOpenSearchTime(long nanos) {
+    openSearchNanos.addAndGet(nanos);
+  }
+
+  /**
+   * Durations of the query's phases in milliseconds, in the order they ended.
+   *
+   * <p>The OpenSearch calls made during {@link #EXECUTE} are reported as {@code opensearch}, and
+   * the rest of that phase as {@code engine}. Calls made concurrently are all counted, so {@code
+   * engine} is the execution time not covered by any call. {@code total} runs until the last phase
+   * ended.
+   */
+  public Map<String, Double> getTimings() {
+    Map<String, Double> timings = new LinkedHashMap<>();
+    long openSearch = openSearchNanos.get();
+    synchronized (phaseNanos) {
+      phaseNanos.forEach(
+          (phase, nanos) -> {
+            if (EXECUTE.equals(phase)) {
+              timings.put("engine", millis(Math.max(0, nanos - openSearch)));
+              timings.put("opensearch", millis(openSearch));
+            } else {
+              timings.put(phase, millis(nanos));
+            }
+          });
+      timings.put("total", millis(phaseEndNanos - startNanos));
+    }
+    return timings;
+  }
+
+  private static double millis(long nanos) {
+    return nanos / 1e6;
+  }
+
+  /**
+   * Take one retry from this query's budget.
+   *
+   * @return false if the query already used {@code budget} retries
+   */
+  boolean tryAcquireRetry(int budget) {
+    while (true) {
+      int used = retries.get();
+      if (used >= budget) {
+        return false;
+      }
+      if (retries.compareAndSet(used, used + 1)) {
+        return true;
+      }
+    }
+  }
+}
@@ -0,0 +1,241 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.io.IOException;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicLong;
+
+/**
+ * Caps how hard a session can hit the cluster: a token bucket for requests per second and a limit
+ * on the requests in flight.
+ *
+ * <p>When adaptive, both limits shrink by half whenever the cluster rejects requests (429/503), at
+ * most once per second, and grow back a little with every successful request. A session running a
+ * heavy job then settles below the point where the cluster starts rejecting, instead of retrying
+ * into it. Callers wait on their own thread, the HTTP client's I/O threads are never blocked.
+ *
+ * <p>The limits are therefore taken by the callers rather than by an interceptor of the HTTP
+ * client, which would run on its I/O threads. Calls go through {@link RetryPolicy}, or through
+ * {@link #run} for those that are not retried, such as node sniffing. Task cancellation goes
+ * through {@link #runUrgent}, which skips the in-flight cap the cancelled query may be holding.
+ * Prefetches, which are asynchronous, take a slot with {@link #tryAcquire} and release it in their
+ * listener.
+ */
+public class RateLimiter {
+
+  /** Lowest share of the configured limits the adaptive backoff goes down to. */
+  private static final double MIN_FACTOR = 0.1;
+
+  /** Share of the configured limits regained with every successful request. */
+  private static final double RECOVERY_STEP = 0.02;
+
+  /** Rejections within this interval of a backoff are answered by that same backoff. */
+  private static final long BACKOFF_INTERVAL_NANOS = TimeUnit.SECONDS.toNanos(1);
+
+  private final double maxRequestsPerSecond;
+  private final int maxInFlight;
+  private final boolean adaptive;
+
+  /** Share of the configured limits currently applied. Guarded by {@code this}. */
+  private double factor = 1;
+
+  /** Tokens of the bucket, negative when callers are waiting for them. Guarded by {@code this}. */
+  private double tokens;
+
+  private long refilledNanos = System.nanoTime();
+  private long backoffNanos = System.nanoTime() - BACKOFF_INTERVAL_NANOS;
+  private int inFlight;
+
+  private final AtomicLong throttled = new AtomicLong();
+  private final AtomicLong rejections = new AtomicLong();
+
+  public RateLimiter(ClientOptions options) {
+    this.maxRequestsPerSecond = Math.max(0, options.getMaxRequestsPerSecond());
+    this.maxInFlight = Math.max(0, options.getMaxInFlightRequests());
+    this.adaptive = options.isAdaptiveRateLimit();
+    this.tokens = capacity();
+  }
+
+  /** Wait until the request may be sent. Every acquired slot must be released. */
+  void acquire() throws InterruptedException {
+    boolean waited = false;
+    synchronized (this) {
+      while (maxInFlight > 0 && inFlight >= inFlightLimit()) {
+        waited = true;
+        wait();
+      }
+      inFlight++;
+    }
+
+    long delay = reserveToken();
+    if (delay > 0) {
+      waited = true;
+      try {
+        TimeUnit.NANOSECONDS.sleep(delay);
+      } catch (InterruptedException e) {
+        release();
+        throw e;
+      }
+    }
+    if (waited) {
+      throttled.incrementAndGet();
+    }
+  }
+
+  /** Send one call once the limiter lets it through. */
+  <T> T run(RetryPolicy.Call<T> call) throws IOException {
+    try {
+      acquire();
+    } catch (InterruptedException e) {
+      Thread.currentThread().interrupt();
+      throw new IOException("Interrupted while waiting for the rate limiter", e);
+    }
+    try {
+      return call.run();
+    } finally {
+      release();
+    }
+  }
+
+  /**
+   * Send one call that must not wait for the requests in flight, such as cancelling them. It only
+   * waits for a token of the rate limit and does not count as in flight.
+   */
+  <T> T runUrgent(RetryPolicy.Call<T> call) throws IOException {
+    long delay = reserveToken();
+    if (delay > 0) {
+      throttled.incrementAndGet();
+      try {
+        TimeUnit.NANOSECONDS.sleep(delay);
+      } catch (InterruptedException e) {
+        Thread.currentThread().interrupt();
+        throw new IOException("Interrupted while waiting for the rate limiter", e);
+      }
+    }
+    return call.run();
+  }
+
+  /**
+   * Take a slot only if the request can be sent right away, for speculative requests.
+   *
+   * @return false if the request should not be sent now
+   */
+  synchronized boolean tryAcquire() {
+    if (maxInFlight > 0 && inFlight >= inFlightLimit()) {
+      return false;
+    }
+    if (maxRequestsPerSecond > 0) {
+      refill();
+      if (tokens < 1) {
+        return false;
+      }
+      tokens -= 1;
+    }
+    inFlight++;
+    return true;
+  }
+
+  /** Free the slot of a request whose response arrived. */
+  synchronized void release() {
+    inFlight--;
+    notifyAll();
+  }
+
+  /** Grow the limits back after a request the cluster accepted. */
+  void onSuccess() {
+    if (!adaptive) {
+      return;
+    }
+    synchronized (this) {
+      if (factor < 1) {
+        refill();
+        factor = Math.min(1, factor + RECOVERY_STEP);
+        notifyAll();
+      }
+    }
+  }
+
+  /** Back off after a request the cluster rejected. */
+  void onRejected() {
+    rejections.incrementAndGet();
+    if (!adaptive) {
+      return;
+    }
+    synchronized (this) {
+      long now = System.nanoTime();
+      if (now - backoffNanos < BACKOFF_INTERVAL_NANOS || factor <= MIN_FACTOR) {
+        return;
+      }
+      refill();
+      factor = Math.max(MIN_FACTOR, factor / 2);
+      backoffNanos = now;
+      System.out.println(
+          "Cluster rejected requests, limiting to "
+              + (maxRequestsPerSecond > 0 ? String.format("%.1f req/s", rate()) : "no rate limit")
+              + (maxInFlight > 0 ? " and " + inFlightLimit() + " in flight" : ""));
+    }
+  }
+
+  /** Number of requests that waited for the limiter. */
+  public long getThrottled() {
+    return throttled.get();
+  }
+
+  /** Number of requests rejected by the cluster. */
+  public long getRejections() {
+    return rejections.get();
+  }
+
+  /**
+   * @return the requests per second currently allowed, 0 if unlimited
+   */
+  public synchronized double getRequestsPerSecond() {
+    return maxRequestsPerSecond > 0 ? rate() : 0;
+  }
+
+  /**
+   * @return the requests currently allowed in flight, 0 if unlimited
+   */
+  public synchronized int getInFlightLimit() {
+    return maxInFlight > 0 ? inFlightLimit() : 0;
+  }
+
+  /**
+   * Take a token, going into debt when the bucket is empty.
+   *
+   * @return the time to wait until the token is available, in nanoseconds
+   */
+  private synchronized long reserveToken() {
+    if (maxRequestsPerSecond <= 0) {
+      return 0;
+    }
+    refill();
+    tokens -= 1;
+    return tokens >= 0 ? 0 : (long) Math.ceil(-tokens / rate() * TimeUnit.SECONDS.toNanos(1));
+  }
+
+  /** Add the tokens earned since the last refill. Caller must hold the lock. */
+  private void refill() {
+    long now = System.nanoTime();
+    double earned = (now - refilledNanos) / (double) TimeUnit.SECONDS.toNanos(1) * rate();
+    tokens = Math.min(capacity(), tokens + earned);
+    refilledNanos = now;
+  }
+
+  private double rate() {
+    return maxRequestsPerSecond * factor;
+  }
+
+  /** One second of requests may be sent in a burst. */
+  private double capacity() {
+    return Math.max(1, rate());
+  }
+
+  private int inFlightLimit() {
+    return Math.max(1, (int) Math.round(maxInFlight * factor));
+  }
+}
@@ -0,0 +1,145 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+import org.apache.hc.core5.http.ContentTooLongException;
+import org.opensearch.action.search.SearchRequest;
+import org.opensearch.action.search.SearchResponse;
+import org.opensearch.search.SearchHit;
+import org.opensearch.search.SearchHits;
+import org.opensearch.search.builder.SearchSourceBuilder;
+import org.opensearch.search.internal.InternalSearchResponse;
+
+/**
+ * Splits a search whose response exceeds the client's response buffer limit into smaller pages.
+ *
+ * <p>The pages are fetched one after another, with {@code from} for plain searches and with {@code
+ * search_after} for PIT searches, halving the page size again whenever a page still does not fit.
+ * Their hits are merged back into a single response, so the engine sees the page it asked for.
+ * Scroll and aggregation responses cannot be split this way and fail with an explanation instead.
+ */
+class ResponsePager {
+
+  /** Sends one page of a split search. */
+  @FunctionalInterface
+  interface Fetch {
+    SearchResponse search(SearchRequest request) throws IOException;
+  }
+
+  /** Default page size of a search request without an explicit size. */
+  private static final int DEFAULT_SIZE = 10;
+
+  private final int bufferLimitMb;
+  private final Fetch fetch;
+
+  ResponsePager(int bufferLimitMb, Fetch fetch) {
+    this.bufferLimitMb = bufferLimitMb;
+    this.fetch = fetch;
+  }
+
+  /**
+   * @return true if {@code e} was caused by a response larger than the buffer limit
+   */
+  static boolean isTooLong(Throwable e) {
+    for (Throwable cause = e; cause != null; cause = cause.getCause()) {
+      if (cause instanceof ContentTooLongException) {
+        return true;
+      }
+    }
+    return false;
+  }
+
+  /**
+   * Fetch the hits of {@code request} in pages that fit in the response buffer.
+   *
+   * @param request search request whose response was too large
+   * @param cause failure of the original request
+   */
+  SearchResponse search(SearchRequest request, IOException cause) throws IOException {
+    SearchSourceBuilder source = request.source();
+    int size = source == null || source.size() < 0 ? DEFAULT_SIZE : source.size();
+    if (request.scroll() != null || source == null || source.aggregations() != null || size <= 1) {
+      throw tooLong("this response cannot be split into pages", cause);
+    }
+
+    boolean isPit = source.pointInTimeBuilder() != null;
+    int offset = Math.max(0, source.from());
+    Object[] searchAfter = source.searchAfter();
+    int pageSize = size / 2;
+
+    List<SearchHit> hits = new ArrayList<>(size);
+    SearchResponse first = null;
+    float maxScore = Float.NaN;
+    long took = 0;
+    boolean timedOut = false;
+
+    while (hits.size() < size) {
+      int requested = Math.min(pageSize, size - hits.size());
+      SearchSourceBuilder pageSource = source.shallowCopy().size(requested);
+      if (isPit) {
+        pageSource.searchAfter(searchAfter);
+      } else {
+        pageSource.from(offset + hits.size());
+      }
+
+      SearchResponse page;
+      try {
+        page = fetch.search(new SearchRequest(request).source(pageSource));
+      } catch (IOException e) {
+        if (!isTooLong(e) || requested <= 1) {
+          throw isTooLong(e) ? tooLong("a single document does not fit", e) : e;
+        }
+        pageSize = Math.max(1, requested / 2);
+        continue;
+      }
+      if (first == null) {
+        first = page;
+      }
+      took += page.getTook().millis();
+      timedOut |= page.isTimedOut();
+      float pageMaxScore = page.getHits().getMaxScore();
+      if (!Float.isNaN(pageMaxScore)) {
+        maxScore = Float.isNaN(maxScore) ? pageMaxScore : Math.max(maxScore, pageMaxScore);
+      }
+
+      SearchHit[] pageHits = page.getHits().getHits();
+      hits.addAll(List.of(pageHits));
+      System.out.println("Fetched " + hits.size() + " of " + size + " hits in pages");
+      if (pageHits.length < requested) {
+        break;
+      }
+      searchAfter = pageHits[pageHits.length - 1].getSortValues();
+    }
+
+    SearchHits merged =
+        new SearchHits(hits.toArray(new SearchHit[0]), first.getHits().getTotalHits(), maxScore);
+    InternalSearchResponse sections =
+        new InternalSearchResponse(merged, null, null, null, timedOut, null, 1);
+    return new SearchResponse(
+        sections,
+        null,
+        first.getTotalShards(),
+        first.getSuccessfulShards(),
+        first.getSkippedShards(),
+        took,
+        first.getShardFailures(),
+        first.getClusters());
+  }
+
+  /** Failure for a response that exceeds the buffer limit and cannot be paged. */
+  IOException tooLong(String reason, Throwable cause) {
+    return new IOException(
+        "Response exceeds the "
+            + bufferLimitMb
+            + "MB response buffer limit and "
+            + reason
+            + ". Raise ClientSettings.RESPONSE_BUFFER_LIMIT_MB or reduce the result size.",
+        cause);
+  }
+}
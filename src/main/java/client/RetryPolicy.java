@@ -0,0 +1,176 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.io.IOException;
+import java.net.SocketException;
+import java.util.concurrent.ThreadLocalRandom;
+import java.util.concurrent.atomic.AtomicLong;
+import org.apache.hc.core5.http.ConnectionClosedException;
+import org.apache.hc.core5.http.NoHttpResponseException;
+import org.opensearch.OpenSearchStatusException;
+import org.opensearch.client.ResponseException;
+import org.opensearch.core.rest.RestStatus;
+
+/**
+ * Retries OpenSearch calls that failed transiently, with exponential backoff and jitter.
+ *
+ * <p>Rejections (429) and unavailability (503) mean the cluster did not run the request, so every
+ * call is retried on them. A reset or closed connection may hide a request that was executed, so
+ * those are only retried for idempotent calls. Besides the per-call limit, all calls made for one
+ * {@link QueryContext} share a retry budget, so a struggling cluster fails a query quickly instead
+ * of multiplying its load.
+ */
+public class RetryPolicy {
+
+  /** A call to the REST client. */
+  @FunctionalInterface
+  interface Call<T> {
+    T run() throws IOException;
+  }
+
+  private final int maxRetries;
+  private final long initialBackoffMillis;
+  private final long maxBackoffMillis;
+  private final int retryBudget;
+  private final RateLimiter rateLimiter;
+
+  private final AtomicLong retries = new AtomicLong();
+  private final AtomicLong recovered = new AtomicLong();
+  private final AtomicLong exhausted = new AtomicLong();
+
+  public RetryPolicy(ClientOptions options, RateLimiter rateLimiter) {
+    this.maxRetries = Math.max(0, options.getMaxRetries());
+    this.initialBackoffMillis = Math.max(1, options.getRetryInitialBackoffMillis());
+    this.maxBackoffMillis = Math.max(initialBackoffMillis, options.getRetryMaxBackoffMillis());
+    this.retryBudget = Math.max(0, options.getRetryBudget());
+    this.rateLimiter = rateLimiter;
+  }
+
+  /**
+   * Run {@code call}, retrying it while it fails transiently.
+   *
+   * @param operation name of the call, for logging
+   * @param idempotent whether the call can safely be sent again after a connection failure
+   */
+  <T> T execute(String operation, boolean idempotent, Call<T> call) throws IOException {
+    QueryContext context = QueryContext.current();
+    long start = System.nanoTime();
+    try {
+      return executeWithRetries(operation, idempotent, call);
+    } finally {
+      if (context != null) {
+        context.addOpenSearchTime(System.nanoTime() - start);
+      }
+    }
+  }
+
+  private <T> T executeWithRetries(String operation, boolean idempotent, Call<T> call)
+      throws IOException {
+    int attempt = 0;
+    while (true) {
+      try {
+        T result = rateLimiter.run(call);
+        rateLimiter.onSuccess();
+        if (attempt > 0) {
+          recovered.incrementAndGet();
+        }
+        return result;
+      } catch (IOException | RuntimeException e) {
+        if (isRejection(e)) {
+          rateLimiter.onRejected();
+        }
+        if (!isRetryable(e, idempotent)) {
+          throw e;
+        }
+        if (attempt >= maxRetries || !acquireRetry()) {
+          exhausted.incrementAndGet();
+          throw e;
+        }
+
+        long delay = backoff(attempt++);
+        retries.incrementAndGet();
+        System.out.println(
+            "Retrying " + operation + " in " + delay + "ms (attempt " + attempt + "): " + e);
+        try {
+          Thread.sleep(delay);
+        } catch (InterruptedException interrupted) {
+          Thread.currentThread().interrupt();
+          throw e;
+        }
+      }
+    }
+  }
+
+  /** Total number of retries since the client was created. */
+  public long getRetries() {
+    return retries.get();
+  }
+
+  /** Number of calls that succeeded after at least one retry. */
+  public long getRecovered() {
+    return recovered.get();
+  }
+
+  /** Number of calls that still failed once their retries or the query budget ran out. */
+  public long getExhausted() {
+    return exhausted.get();
+  }
+
+  private boolean acquireRetry() {
+    QueryContext context = QueryContext.current();
+    // Outside of a query (e.g. while connecting) only the per-call limit applies
+    return context == null || context.tryAcquireRetry(retryBudget);
+  }
+
+  /** Equal jitter: half of the exponential delay, plus a random share of the other half. */
+  private long backoff(int attempt) {
+    long delay = initialBackoffMillis << Math.min(attempt, 30);
+    delay = Math.min(delay, maxBackoffMillis);
+    long half = delay / 2;
+    return half + ThreadLocalRandom.current().nextLong(delay - half + 1);
+  }
+
+  /**
+   * @return whether the cluster turned the request down under load (429/503)
+   */
+  static boolean isRejection(Throwable e) {
+    int status = statusOf(e);
+    return status == RestStatus.TOO_MANY_REQUESTS.getStatus()
+        || status == RestStatus.SERVICE_UNAVAILABLE.getStatus();
+  }
+
+  static boolean isRetryable(Throwable e, boolean idempotent) {
+    if (isRejection(e)) {
+      return true;
+    }
+    if (!idempotent || statusOf(e) != -1) {
+      return false;
+    }
+
+    for (Throwable cause = e; cause != null; cause = cause.getCause()) {
+      if (cause instanceof SocketException
+          || cause instanceof ConnectionClosedException
+          || cause instanceof NoHttpResponseException) {
+        return true;
+      }
+    }
+    return false;
+  }
+
+  /**
+   * @return the HTTP status of a failed response, or -1 if no response was received
+   */
+  private static int statusOf(Throwable e) {
+    if (e instanceof OpenSearchStatusException) {
+      return ((OpenSearchStatusException) e).status().getStatus();
+    }
+    if (e instanceof ResponseException) {
+      return ((ResponseException) e).getResponse().getStatusLine().getStatusCode();
+    }
+    return -1;
+  }
+}
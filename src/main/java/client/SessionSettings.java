@@ -0,0 +1,163 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import java.util.LinkedHashMap;
+import java.util.Locale;
+import java.util.Map;
+import java.util.UUID;
+import org.opensearch.action.search.CreatePitRequest;
+import org.opensearch.action.search.SearchRequest;
+import org.opensearch.search.builder.SearchSourceBuilder;
+import org.opensearch.search.internal.SearchContext;
+
+/**
+ * Search settings of the current CLI session.
+ *
+ * <p>They start from the ClientSettings section of config.yaml and can be changed from the shell
+ * with {@code -set <key> <value>} until the CLI reconnects.
+ */
+public class SessionSettings {
+
+  public static final String REQUEST_CACHE = "request_cache";
+  public static final String PREFERENCE = "preference";
+  public static final String TRACK_TOTAL_HITS = "track_total_hits";
+
+  /** Preference value that pins a random string for the whole session. */
+  private static final String SESSION_PREFERENCE = "session";
+
+  /** Preference value that lets the cluster pick shard copies. */
+  private static final String NO_PREFERENCE = "none";
+
+  private volatile boolean requestCache;
+  private volatile String preference;
+  private volatile int trackTotalHits;
+
+  /** Preference string sent when the setting is {@code session}. */
+  private final String sessionPreference = "opensearch-cli-" + UUID.randomUUID();
+
+  public SessionSettings(ClientOptions options) {
+    this.requestCache = options.isRequestCache();
+    set(PREFERENCE, options.getPreference());
+    set(TRACK_TOTAL_HITS, options.getTrackTotalHits());
+  }
+
+  /**
+   * Change a session setting.
+   *
+   * @throws IllegalArgumentException for an unknown key or an invalid value
+   */
+  public void set(String key, String value) {
+    String normalized = value == null ? "" : value.trim();
+    switch (key.toLowerCase(Locale.ROOT)) {
+      case REQUEST_CACHE:
+        requestCache = parseBoolean(key, normalized);
+        break;
+      case PREFERENCE:
+        preference = normalized.isEmpty() ? NO_PREFERENCE : normalized;
+        break;
+      case TRACK_TOTAL_HITS:
+        trackTotalHits = parseTrackTotalHits(key, normalized);
+        break;
+      default:
+        throw new IllegalArgumentException("Unknown session setting: " + key);
+    }
+  }
+
+  /** Current values, as shown by the shell. */
+  public Map<String, String> asMap() {
+    Map<String, String> settings = new LinkedHashMap<>();
+    settings.put(REQUEST_CACHE, String.valueOf(requestCache));
+    settings.put(PREFERENCE, preference);
+    settings.put(TRACK_TOTAL_HITS, formatTrackTotalHits(trackTotalHits));
+    return settings;
+  }
+
+  /** Apply the settings to a search request sent by the engine. */
+  void apply(SearchRequest request) {
+    SearchSourceBuilder source = request.source();
+    boolean isPit = source != null && source.pointInTimeBuilder() != null;
+
+    // The request cache only holds hit-less responses and is not available for scrolls
+    if (requestCache && request.scroll() == null && isAggregationOnly(source)) {
+      request.requestCache(true);
+    }
+
+    // A PIT search is routed by its PIT, set when the PIT was created
+    String resolved = resolvePreference();
+    if (resolved != null && !isPit && request.preference() == null) {
+      request.preference(resolved);
+    }
+  }
+
+  /**
+   * Apply the hit counting setting to the source of a non-scroll search.
+   *
+   * <p>Scrolls always count hits exactly, they reject a lower {@code track_total_hits}. A value
+   * set by the engine is kept: size-0 and aggregation pushdowns rely on the exact count.
+   */
+  void applyTrackTotalHits(SearchSourceBuilder source) {
+    if (source.trackTotalHitsUpTo() == null) {
+      source.trackTotalHitsUpTo(trackTotalHits);
+    }
+  }
+
+  /** Apply the settings to a PIT creation request. */
+  void apply(CreatePitRequest request) {
+    String resolved = resolvePreference();
+    if (resolved != null && request.getPreference() == null) {
+      request.setPreference(resolved);
+    }
+  }
+
+  private String resolvePreference() {
+    if (NO_PREFERENCE.equalsIgnoreCase(preference)) {
+      return null;
+    }
+    return SESSION_PREFERENCE.equalsIgnoreCase(preference) ? sessionPreference : preference;
+  }
+
+  private static boolean isAggregationOnly(SearchSourceBuilder source) {
+    return source != null && (source.size() == 0 || source.aggregations() != null);
+  }
+
+  /** Parse {@code exact}, {@code off} or a count threshold. */
+  private static int parseTrackTotalHits(String key, String value) {
+    if ("exact".equalsIgnoreCase(value) || "true".equalsIgnoreCase(value)) {
+      return SearchContext.TRACK_TOTAL_HITS_ACCURATE;
+    }
+    if ("off".equalsIgnoreCase(value) || "false".equalsIgnoreCase(value)) {
+      return SearchContext.TRACK_TOTAL_HITS_DISABLED;
+    }
+    try {
+      int threshold = Integer.parseInt(value);
+      if (threshold >= 0) {
+        return threshold;
+      }
+    } catch (NumberFormatException e) {
+      // Reported below
+    }
+    throw new IllegalArgumentException(
+        "Invalid value for " + key + ": " + value + ", expected exact, off or a count");
+  }
+
+  private static String formatTrackTotalHits(int value) {
+    if (value == SearchContext.TRACK_TOTAL_HITS_ACCURATE) {
+      return "exact";
+    }
+    return value == SearchContext.TRACK_TOTAL_HITS_DISABLED ? "off" : String.valueOf(value);
+  }
+
+  private static boolean parseBoolean(String key, String value) {
+    if ("true".equalsIgnoreCase(value) || "on".equalsIgnoreCase(value)) {
+      return true;
+    }
+    if ("false".equalsIgnoreCase(value) || "off".equalsIgnoreCase(value)) {
+      return false;
+    }
+    throw new IllegalArgumentException("Invalid value for " + key + ": " + value);
+  }
+}
@@ -0,0 +1,223 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import com.google.common.util.concurrent.ThreadFactoryBuilder;
+import java.io.BufferedWriter;
+import java.io.IOException;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicIntegerArray;
+import java.util.concurrent.atomic.AtomicLongArray;
+import lombok.Getter;
+import org.json.JSONObject;
+import org.opensearch.action.search.CreatePitRequest;
+import org.opensearch.action.search.SearchRequest;
+import org.opensearch.action.search.SearchResponse;
+import org.opensearch.common.unit.TimeValue;
+import org.opensearch.index.query.QueryBuilders;
+import org.opensearch.search.SearchHit;
+import org.opensearch.search.builder.PointInTimeBuilder;
+import org.opensearch.search.builder.SearchSourceBuilder;
+import org.opensearch.search.slice.SliceBuilder;
+import org.opensearch.search.sort.SortOrder;
+
+/**
+ * Exports every document of an index to a newline-delimited JSON file.
+ *
+ * <p>The documents are read through one PIT split into slices. Each slice is paged with
+ * search_after on its own worker thread, and the pages are appended to the file as they arrive, so
+ * the export scales with the number of slices until the cluster saturates. Documents are written
+ * in no particular order.
+ */
+public class SlicedExport {
+
+  public enum State {
+    RUNNING,
+    DONE,
+    FAILED,
+    CANCELLED
+  }
+
+  /** Calls to the cluster, provided by the client. */
+  interface Backend {
+    String createPit(CreatePitRequest request) throws IOException;
+
+    SearchResponse search(SearchRequest request) throws IOException;
+
+    void deletePit(String pitId) throws IOException;
+  }
+
+  /** Keep-alive of the export's PIT, extended by every page. */
+  private static final TimeValue KEEP_ALIVE = TimeValue.timeValueMinutes(5);
+
+  @Getter private final String index;
+  @Getter private final Path output;
+  @Getter private final int slices;
+  private final int pageSize;
+  private final Backend backend;
+
+  private final AtomicLongArray sliceDocs;
+  private final AtomicIntegerArray sliceDone;
+  private final ExecutorService workers;
+
+  @Getter private volatile State state = State.RUNNING;
+  @Getter private volatile String error;
+  private volatile boolean cancelled;
+  private final long startNanos = System.nanoTime();
+  private volatile long endNanos;
+
+  private String pitId;
+  private BufferedWriter writer;
+
+  SlicedExport(String index, Path output, int slices, int pageSize, Backend backend) {
+    this.index = index;
+    this.output = output;
+    this.slices = slices;
+    this.pageSize = pageSize;
+    this.backend = backend;
+    this.sliceDocs = new AtomicLongArray(slices);
+    this.sliceDone = new AtomicIntegerArray(slices);
+    this.workers =
+        Executors.newFixedThreadPool(
+            slices,
+            new ThreadFactoryBuilder()
+                .setNameFormat("opensearch-cli-export-%d")
+                .setDaemon(true)
+                .build());
+  }
+
+  /** Open the PIT and the output file, then start one worker per slice. */
+  void start() throws IOException {
+    try {
+      pitId = backend.createPit(new CreatePitRequest(KEEP_ALIVE, false, index));
+      writer = Files.newBufferedWriter(output, StandardCharsets.UTF_8);
+    } catch (IOException | RuntimeException e) {
+      finish(e);
+      throw e;
+    }
+
+    CompletableFuture<?>[] tasks = new CompletableFuture<?>[slices];
+    for (int slice = 0; slice < slices; slice++) {
+      int sliceId = slice;
+      tasks[slice] = CompletableFuture.runAsync(() -> exportSlice(sliceId), workers);
+    }
+    CompletableFuture.allOf(tasks).whenComplete((ignored, failure) -> finish(failure));
+  }
+
+  /** Stop fetching pages, the export ends once the pages in flight are written. */
+  public void cancel() {
+    cancelled = true;
+  }
+
+  /** Number of documents written for {@code slice}. */
+  public long getSliceDocs(int slice) {
+    return sliceDocs.get(slice);
+  }
+
+  /** Whether every document of {@code slice} was written. */
+  public boolean isSliceDone(int slice) {
+    return sliceDone.get(slice) == 1;
+  }
+
+  /** Number of documents written for all slices. */
+  public long getDocs() {
+    long docs = 0;
+    for (int slice = 0; slice < slices; slice++) {
+      docs += sliceDocs.get(slice);
+    }
+    return docs;
+  }
+
+  public long getElapsedMillis() {
+    long end = state == State.RUNNING ? System.nanoTime() : endNanos;
+    return TimeUnit.NANOSECONDS.toMillis(end - startNanos);
+  }
+
+  private void exportSlice(int slice) {
+    Object[] searchAfter = null;
+    while (!cancelled) {
+      SearchSourceBuilder source =
+          new SearchSourceBuilder()
+              .query(QueryBuilders.matchAllQuery())
+              .size(pageSize)
+              .pointInTimeBuilder(new PointInTimeBuilder(pitId).setKeepAlive(KEEP_ALIVE))
+              // Same tiebreaker as the engine's PIT pagination
+              .sort("_doc", SortOrder.ASC)
+              .sort("_id", SortOrder.ASC);
+      if (slices > 1) {
+        source.slice(new SliceBuilder(slice, slices));
+      }
+      if (searchAfter != null) {
+        source.searchAfter(searchAfter);
+      }
+
+      SearchHit[] hits;
+      try {
+        hits = backend.search(new SearchRequest().source(source)).getHits().getHits();
+        write(hits);
+      } catch (IOException | RuntimeException e) {
+        // Stop the other slices, the export failed anyway
+        cancelled = true;
+        throw new IllegalStateException("Failed to export slice " + slice + " of " + index, e);
+      }
+      sliceDocs.addAndGet(slice, hits.length);
+
+      if (hits.length < pageSize) {
+        sliceDone.set(slice, 1);
+        return;
+      }
+      searchAfter = hits[hits.length - 1].getSortValues();
+    }
+  }
+
+  /** Append one page to the output, pages of different slices are never interleaved. */
+  private void write(SearchHit[] hits) throws IOException {
+    StringBuilder lines = new StringBuilder();
+    for (SearchHit hit : hits) {
+      String source = hit.getSourceAsString();
+      lines
+          .append(source != null ? source : "{\"_id\":" + JSONObject.quote(hit.getId()) + "}")
+          .append('\n');
+    }
+    synchronized (this) {
+      writer.write(lines.toString());
+    }
+  }
+
+  private synchronized void finish(Throwable failure) {
+    try {
+      if (writer != null) {
+        writer.close();
+      }
+    } catch (IOException e) {
+      failure = failure == null ? e : failure;
+    }
+    if (pitId != null) {
+      try {
+        backend.deletePit(pitId);
+      } catch (Exception e) {
+        // The cluster frees the PIT anyway once its keep-alive expires
+        System.err.println("Failed to delete export PIT " + pitId + ": " + e.getMessage());
+      }
+    }
+    workers.shutdown();
+
+    if (failure != null) {
+      Throwable cause = failure.getCause() != null ? failure.getCause() : failure;
+      error = cause.getMessage();
+      cause.printStackTrace();
+    }
+    endNanos = System.nanoTime();
+    state = failure != null ? State.FAILED : cancelled ? State.CANCELLED : State.DONE;
+    System.out.println("Export of " + index + " to " + output + " ended: " + state);
+  }
+}
@@ -5,6 +5,7 @@
 
 package query;
 
+import client.QueryContext;
 import java.util.concurrent.ExecutorService;
 import java.util.concurrent.Executors;
 import org.opensearch.sql.executor.QueryId;
@@ -23,6 +24,11 @@ public class CustomQueryManager implements QueryManager {
 
   @Override
   public QueryId submit(AbstractPlan queryPlan) {
+    // The engine parses the query on the caller thread before submitting its plan
+    QueryContext context = QueryContext.current();
+    if (context != null) {
+      context.endPhase(QueryContext.PARSE);
+    }
     QueryId queryId = queryPlan.getQueryId();
     executor.submit(
         () -> {
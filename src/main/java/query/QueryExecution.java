@@ -5,10 +5,14 @@
 
 package query;
 
+import client.ClientOptions;
+import client.OpenSearchRestClientImpl;
+import client.QueryContext;
 import com.google.inject.Inject;
 import java.nio.file.*;
 import java.util.List;
 import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.TimeUnit;
 import java.util.concurrent.atomic.AtomicReference;
 import org.json.JSONObject;
 import org.opensearch.sql.common.response.ResponseListener;
@@ -32,11 +36,19 @@ public class QueryExecution {
 
   private final PPLService pplService;
   private final SQLService sqlService;
+  private final OpenSearchRestClientImpl restClient;
+  private final int queryTimeoutSeconds;
 
   @Inject
-  public QueryExecution(PPLService pplService, SQLService sqlService) {
+  public QueryExecution(
+      PPLService pplService,
+      SQLService sqlService,
+      OpenSearchRestClientImpl restClient,
+      ClientOptions options) {
     this.pplService = pplService;
     this.sqlService = sqlService;
+    this.restClient = restClient;
+    this.queryTimeoutSeconds = options.getQueryTimeoutSeconds();
   }
 
   public String execute(String query, boolean isPPL) {
@@ -47,6 +59,8 @@ public class QueryExecution {
     System.out.println("Received query: " + query);
     System.out.println("Query type: " + (isPPL ? "PPL" : "SQL"));
 
+    // Every request the engine sends for this query shares its context, e.g. its retry budget
+    QueryContext context = QueryContext.begin(query);
     try {
       CountDownLatch latch = new CountDownLatch(1);
       AtomicReference<QueryResponse> executeRef = new AtomicReference<>();
@@ -69,6 +83,16 @@ public class QueryExecution {
             }
           };
 
+      // A scheduled task that throws never reaches the listeners, so it fails the query here
+      context.setTaskFailureHandler(
+          e -> {
+            if (latch.getCount() > 0) {
+              System.out.println("queryExecution Scheduled Task Error: " + e);
+              errorRef.compareAndSet(null, e);
+              latch.countDown();
+            }
+          });
+
       ResponseListener<ExplainResponse> explainListener =
           new ResponseListener<>() {
             @Override
@@ -125,7 +149,12 @@ public class QueryExecution {
         }
       }
 
-      latch.await();
+      if (!await(latch)) {
+        // Stop the abandoned query's searches instead of letting them run on the cluster
+        cancelTasks(context);
+        return "queryExecution Error: query timed out after " + queryTimeoutSeconds + " seconds";
+      }
+      context.endPhase(QueryContext.EXECUTE);
 
       Files.deleteIfExists(Paths.get("src/main/java/client/aws/aws_body.json"));
 
@@ -137,7 +166,9 @@ public class QueryExecution {
       // Handle the response based on the query type
       if (isExplainQuery && explainRef.get() != null) {
         System.out.println("Explain raw: \n" + explainRef.get().toString());
-        return formatExplainResponse(explainRef.get(), format);
+        String formatted = formatExplainResponse(explainRef.get(), format);
+        context.endPhase(QueryContext.FORMAT);
+        return formatted;
         // return explainRef.get().toString();
       } else if (executeRef.get() != null && executeRef.get().getResults() != null) {
         // For regular queries, use the query response
@@ -146,6 +177,7 @@ public class QueryExecution {
         // Create a new QueryResult from the response
         Schema schema = response.getSchema();
         List<ExprValue> results = (List<ExprValue>) response.getResults();
+        context.setRows(results.size());
         QueryResult queryResult = new QueryResult(schema, results);
 
         // Format the result based on the requested format
@@ -176,7 +208,9 @@ public class QueryExecution {
               break;
           }
 
-          return formatter.format(queryResult);
+          String formatted = formatter.format(queryResult);
+          context.endPhase(QueryContext.FORMAT);
+          return formatted;
         } catch (Exception e) {
           e.printStackTrace();
           return "Error formatting results: " + e.getMessage() + "\nRaw response: " + response;
@@ -187,6 +221,35 @@ public class QueryExecution {
     } catch (Exception e) {
       e.printStackTrace();
       return "queryExecution Error: " + e;
+    } finally {
+      QueryContext.end(context);
+    }
+  }
+
+  /**
+   * Wait for the query to complete.
+   *
+   * @return false if the query timed out
+   */
+  private boolean await(CountDownLatch latch) throws InterruptedException {
+    if (queryTimeoutSeconds <= 0) {
+      latch.await();
+      return true;
+    }
+    return latch.await(queryTimeoutSeconds, TimeUnit.SECONDS);
+  }
+
+  /**
+   * Cancel the cluster tasks of a query.
+   *
+   * @return the number of tasks cancelled, 0 if they could not be cancelled
+   */
+  public int cancelTasks(QueryContext context) {
+    try {
+      return restClient.cancelTasks(context.getId());
+    } catch (Exception e) {
+      System.err.println("Failed to cancel tasks of query " + context.getId() + ": " + e);
+      return 0;
     }
   }
 
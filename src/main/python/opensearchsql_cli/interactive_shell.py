@@ -6,6 +6,7 @@ Handles interactive shell functionality for OpenSearch SQL CLI.
 
 import sys
 import os
+import re
 import traceback
 from typing import Optional
 from prompt_toolkit.completion import WordCompleter
@@ -18,7 +19,16 @@ from pygments.lexers.sql import SqlLexer
 from rich.console import Console
 from rich.markup import escape
 from .sql import sql_connection
-from .query import ExecuteQuery
+from .query import (
+    ExecuteQuery,
+    IndexExport,
+    QueryLog,
+    QueryResults,
+    ResultBrowser,
+    ResultCache,
+    ResultSet,
+    SessionStats,
+)
 from .literals import Literals
 from .config.config import config_manager
 from .sql.sql_version import sql_version
@@ -26,6 +36,15 @@ from .sql.sql_version import sql_version
 # Create a console instance for rich formatting
 console = Console()
 
+# -where <column> <operator> <value>, spaces around the operator are optional
+WHERE_PATTERN = re.compile(r"^(\S+?)\s*(!=|>=|<=|=|<|>|~)\s*(.+)$")
+
+REFINE_USAGE = {
+    "-sort": "-sort <column> \\[asc|desc]",
+    "-where": "-where <column> <=|!=|<|<=|>|>=|~> <value>",
+    "-cols": "-cols <column>,<column>,...",
+}
+
 
 class InteractiveShell:
     """
@@ -62,7 +81,15 @@ class InteractiveShell:
         self.is_ppl_mode = True
         self.format = "table"
         self.is_vertical = False
+        self.show_timing = False
+        self.highlight = False
+        self.output = None
+        self.query_log = None
+        self.result_cache = None
         self.latest_query = None
+        self.latest_result = None
+        self.latest_format = None
+        self.latest_view = None
 
     @staticmethod
     def display_help_shell():
@@ -73,10 +100,31 @@ class InteractiveShell:
                 -l <type>              - Change language: PPL, SQL
                 -f <type>              - Change format: JSON, Table, CSV
                 -v                     - Toggle vertical display mode
+                -o \\[file]              - Write JSON and CSV results to a file, or back to stdout
+                -t                     - Toggle the timing breakdown after each query
+                -top \\[n]               - Show the n logged queries that took the most time
+                -cache \\[on|off|clear]  - Show the result cache, turn it on or off, or empty it
+                -r                     - Display the latest result again in the current format,
+                                         without running its query
+                -sort <col> \\[asc|desc] - Sort the latest result by a column
+                -where <col> <op> <value>
+                                       - Keep the rows of the latest result where a column
+                                         compares to a value: = != < <= > >= ~ (contains)
+                -cols <col>,<col>      - Keep some columns of the latest result
+                -reset                 - Undo -sort, -where and -cols
+                -b \\[query]             - Browse the latest result, or the result of a query,
+                                         full screen
                 -s --save <name>       - Save the latest query result with a name
                 -s --load <name>       - Load and display a saved query result
                 -s --remove <name>     - Remove a saved query by name
                 -s --list              - List all saved query names
+                -export <index> <file> \\[slices]
+                                       - Export all documents of an index as JSON lines
+                -retries               - Show retry counters and rate limits of the session
+                -stats                 - Show HTTP metrics of the session and recent queries
+                -set                   - Show the session settings
+                -set <key> <value>     - Change a session setting: request_cache, preference,
+                                         track_total_hits (exact, off or a count)
                 -h/help                - Show this help
                 exit/quit/q            - Exit interactive mode
                 [/dim white]
@@ -111,7 +159,30 @@ class InteractiveShell:
             functions.append(function.upper())
 
         # Add shell commands to the completer
-        commands = ["-l", "-f", "-v", "-s", "help", "exit", "quit", "q"]
+        commands = [
+            "-l",
+            "-f",
+            "-v",
+            "-o",
+            "-t",
+            "-top",
+            "-cache",
+            "-r",
+            "-sort",
+            "-where",
+            "-cols",
+            "-reset",
+            "-b",
+            "-s",
+            "-export",
+            "-retries",
+            "-stats",
+            "-set",
+            "help",
+            "exit",
+            "quit",
+            "q",
+        ]
 
         # Add options for -s command
         options = ["--save", "--load", "--remove", "--list"]
@@ -121,12 +192,13 @@ class InteractiveShell:
             keywords + functions + commands + options, ignore_case=True
         )
 
-    def execute_query(self, query):
+    def execute_query(self, query, display=True):
         """
         Execute a query
 
         Args:
             query: Query string to execute
+            display: Whether to display the result, False to only keep it
 
         Returns:
             bool: True if successful, False otherwise
@@ -147,7 +219,14 @@ class InteractiveShell:
                 self.format,
                 self.is_vertical,
                 console.print,
+                show_timing=self.show_timing,
+                query_log=self.query_log,
+                result_cache=self.result_cache,
+                output=self.output,
+                highlight=self.highlight,
+                display=display,
             )
+            self.keep_result(query, success, formatted_result)
             return success
         except Exception as e:
             console.print(
@@ -156,6 +235,291 @@ class InteractiveShell:
             traceback.print_exc()
             return False
 
+    def keep_result(self, query, success, formatted_result):
+        """
+        Keep the latest result to display again or browse
+
+        Args:
+            query: Query of the result
+            success: Whether the query succeeded
+            formatted_result: ResultSet of a table result, the result string of
+                other formats, decoded only when needed
+        """
+        self.latest_format = self.format
+        self.latest_view = None
+        if success and not query.strip().lower().startswith("explain"):
+            self.latest_result = formatted_result
+        else:
+            self.latest_result = None
+
+    def latest_result_set(self):
+        """
+        Decode the latest result, whatever format it was fetched in
+
+        Returns:
+            ResultSet: Latest result, None if there is no tabular result
+        """
+        if self.latest_result is not None and not isinstance(
+            self.latest_result, ResultSet
+        ):
+            self.latest_result = ResultSet.parse(self.latest_result, self.latest_format)
+        return self.latest_result
+
+    def current_result(self):
+        """
+        The latest result as refined by -sort, -where and -cols
+
+        Returns:
+            ResultSet: Refined latest result, None if there is no tabular result
+        """
+        if self.latest_view is not None:
+            return self.latest_view
+        return self.latest_result_set()
+
+    def refine_result(self, user_input):
+        """
+        Sort, filter or project the latest result and display it, without running
+        its query. Each refinement applies to the previous one, -reset starts over
+        from the latest result, which is never modified
+
+        Args:
+            user_input: -sort, -where, -cols or -reset command with its arguments
+        """
+        command, _, args = user_input.strip().partition(" ")
+        command = command.lower()
+        args = args.strip()
+        if command == "-reset":
+            self.latest_view = None
+        result_set = self.current_result()
+        if result_set is None:
+            console.print("[red]\nNo result to refine, run a query first[/red]")
+            return
+
+        try:
+            if command == "-sort":
+                parts = args.split()
+                order = parts[1].lower() if len(parts) == 2 else "asc"
+                if not 1 <= len(parts) <= 2 or order not in ("asc", "desc"):
+                    console.print(f"[red]\nUse {REFINE_USAGE[command]}[/red]")
+                    return
+                result_set = result_set.sort(parts[0], order == "desc")
+            elif command == "-where":
+                match = WHERE_PATTERN.match(args)
+                if match is None:
+                    console.print(f"[red]\nUse {REFINE_USAGE[command]}[/red]")
+                    return
+                result_set = result_set.where(*match.groups())
+            elif command == "-cols":
+                names = [name for name in re.split(r"[,\s]+", args) if name]
+                if not names:
+                    console.print(f"[red]\nUse {REFINE_USAGE[command]}[/red]")
+                    return
+                result_set = result_set.select(names)
+        except ValueError as e:
+            console.print(f"[red]\n{escape(str(e))}\nUse {REFINE_USAGE[command]}[/red]")
+            return
+
+        if command != "-reset":
+            self.latest_view = result_set
+        console.print()
+        QueryResults.display_result(
+            result_set,
+            self.format,
+            self.is_vertical,
+            console.print,
+            output=self.output,
+            highlight=self.highlight,
+        )
+
+    def rerender_result(self):
+        """
+        Display the latest result again in the current format, without running its
+        query
+        """
+        result_set = self.current_result()
+        if result_set is None:
+            console.print("[red]\nNo result to display again, run a query first[/red]")
+            return
+        console.print(
+            f"\nLatest result of: [yellow]{escape(self.latest_query)}[/yellow]\n"
+        )
+        QueryResults.display_result(
+            result_set,
+            self.format,
+            self.is_vertical,
+            console.print,
+            output=self.output,
+            highlight=self.highlight,
+        )
+
+    def browse_result(self, user_input):
+        """
+        Browse a result full screen
+
+        Args:
+            user_input: -b command, optionally followed by a query to run without
+                printing its result
+        """
+        args = user_input.split(maxsplit=1)
+        if len(args) == 2:
+            # Run like any query, through the cache and the query log, and keep it
+            if not self.execute_query(args[1], display=False):
+                return
+        query = self.latest_query
+        result = self.current_result()
+
+        browser = ResultBrowser.from_result(result, query or "")
+        if browser is None:
+            console.print(
+                "[red]\nNo result to browse, run a query or use -b <query>[/red]"
+            )
+            return
+        browser.run()
+
+    def create_result_cache(self):
+        """
+        Create the result cache of the session from the Query settings of config.yaml
+
+        Returns:
+            ResultCache: Cache of the results of the connected cluster
+        """
+
+        def setting(key, default):
+            try:
+                return float(config_manager.get("Query", key, default))
+            except (TypeError, ValueError):
+                return default
+
+        disk_path = None
+        if config_manager.get_boolean("Query", "cache_disk", False):
+            disk_path = os.path.join(
+                os.path.dirname(os.path.abspath(__file__)), ".result_cache"
+            )
+        return ResultCache(
+            cluster=self.sql_connection.url,
+            version=sql_version.version,
+            memory_bytes=int(setting("cache_memory_mb", 64) * 1024 * 1024),
+            memory_ttl=setting("cache_ttl_seconds", 300),
+            disk_path=disk_path,
+            disk_bytes=int(setting("cache_disk_mb", 256) * 1024 * 1024),
+            disk_ttl=setting("cache_disk_ttl_seconds", 3600),
+        )
+
+    def cache_command(self, user_cmd):
+        """
+        Show the result cache, turn it on or off, or empty it
+
+        Args:
+            user_cmd: -cache command in lowercase, optionally followed by on, off
+                or clear
+        """
+        if self.result_cache is None:
+            self.result_cache = self.create_result_cache()
+        args = user_cmd.split()
+        if len(args) == 1:
+            self.result_cache.display_stats(console.print)
+        elif len(args) == 2 and args[1] in ("on", "off"):
+            self.result_cache.enabled = args[1] == "on"
+            console.print(
+                f"[green]\nResult cache:[/green] {'[green]ON[/green]' if self.result_cache.enabled else '[red]OFF[/red]'}"
+            )
+        elif len(args) == 2 and args[1] == "clear":
+            self.result_cache.clear()
+            console.print("[green]\nResult cache cleared[/green]")
+        else:
+            console.print("[red]\nUse -cache \\[on|off|clear][/red]")
+
+    def set_output(self, user_input):
+        """
+        Write the JSON and CSV results that follow to a file, or back to stdout
+
+        Args:
+            user_input: -o command, optionally followed by the path of the file,
+                which is emptied first
+        """
+        args = user_input.split(maxsplit=1)
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+        if len(args) == 1:
+            console.print("[green]\nOutput:[/green] [dim white]stdout[/dim white]")
+            return
+
+        path = os.path.expanduser(args[1].strip())
+        try:
+            self.output = open(path, "wb")
+        except OSError as e:
+            console.print(
+                f"[red]\nUnable to open {escape(path)}: {escape(str(e))}[/red]"
+            )
+            return
+        console.print(
+            f"[green]\nOutput:[/green] [dim white]JSON and CSV results are written to {escape(path)}[/dim white]"
+        )
+
+    def display_retry_stats(self):
+        """Display the retry counters of the OpenSearch client"""
+        stats = self.sql_connection.get_retry_stats()
+        if stats is None:
+            console.print("[red]\nRetry stats are not available.[/red]")
+            return
+
+        console.print(
+            f"[green]\nRetries:[/green] [dim white]{stats.get('retries', 0)}[/dim white]"
+        )
+        console.print(
+            f"[green]Recovered calls:[/green] [dim white]{stats.get('recovered', 0)}[/dim white]"
+        )
+        console.print(
+            f"[green]Failed after retries:[/green] [dim white]{stats.get('exhausted', 0)}[/dim white]"
+        )
+        console.print(
+            f"[green]Last query retries:[/green] [dim white]{stats.get('last_query_retries', 0)}[/dim white]"
+        )
+        if "rejections" in stats:
+            console.print(
+                f"[green]Rejected by the cluster:[/green] [dim white]{stats['rejections']}[/dim white]"
+            )
+            console.print(
+                f"[green]Throttled by the rate limiter:[/green] [dim white]{stats.get('throttled', 0)}[/dim white]"
+            )
+            rate = stats.get("requests_per_second_limit", 0)
+            in_flight = stats.get("in_flight_limit", 0)
+            console.print(
+                f"[green]Current limits:[/green] [dim white]"
+                f"{f'{rate:,.1f} req/s' if rate else 'no rate limit'}, "
+                f"{f'{in_flight} in flight' if in_flight else 'no in-flight limit'}[/dim white]"
+            )
+
+    def session_setting(self, user_input):
+        """
+        Show the session settings, or change one of them
+
+        Args:
+            user_input: -set command, optionally followed by a key and a value
+        """
+        args = user_input.split(maxsplit=2)
+        if len(args) == 1:
+            settings = self.sql_connection.get_session_settings()
+            if settings is None:
+                console.print("[red]\nSession settings are not available.[/red]")
+                return
+            console.print("[green]\nSession settings:[/green]")
+            for key, value in settings.items():
+                console.print(f"[green]{key}:[/green] [dim white]{value}[/dim white]")
+            return
+
+        if len(args) < 3:
+            console.print("[red]\nMissing value. Use -set <key> <value>[/red]")
+            return
+
+        key, value = args[1], args[2]
+        success, error = self.sql_connection.set_session_setting(key, value)
+        if success:
+            console.print(f"[green]\n{key} set to {value}[/green]")
+        else:
+            console.print(f"[red]\n{escape(error)}[/red]")
+
     def start(self, language=None, format=None):
         """
         Start interactive query mode
@@ -192,6 +556,21 @@ class InteractiveShell:
         # Track vertical display mode
         self.is_vertical = config_manager.get_boolean("Query", "vertical", False)
 
+        # JSON and CSV are written as is unless highlighting is asked for
+        self.highlight = config_manager.get_boolean("Query", "highlight", False)
+
+        # Log queries across sessions for -top, off unless enabled in config.yaml
+        if config_manager.get_boolean("Query", "query_log", False):
+            try:
+                size_mb = float(config_manager.get("Query", "query_log_size_mb", 5))
+            except (TypeError, ValueError):
+                size_mb = 5
+            self.query_log = QueryLog(max_bytes=int(size_mb * 1024 * 1024))
+
+        # Cache results of repeated queries, off unless enabled in config.yaml
+        self.result_cache = self.create_result_cache()
+        self.result_cache.enabled = config_manager.get_boolean("Query", "cache", False)
+
         # Create a PromptSession with auto-completion and syntax highlighting
         session = PromptSession(
             lexer=PygmentsLexer(SqlLexer),
@@ -278,6 +657,82 @@ class InteractiveShell:
                     )
                     continue
 
+                # Output file of JSON and CSV results
+                if user_cmd == "-o" or user_cmd.startswith("-o "):
+                    self.set_output(user_input)
+                    continue
+
+                # Toggle the timing breakdown
+                if user_cmd == "-t":
+                    self.show_timing = not self.show_timing
+                    console.print(
+                        f"[green]\nTiming:[/green] {'[green]ON[/green]' if self.show_timing else '[red]OFF[/red]'}"
+                    )
+                    continue
+
+                # Logged queries by total time
+                if user_cmd == "-top" or user_cmd.startswith("-top "):
+                    args = user_input.split()
+                    if self.query_log is None:
+                        console.print(
+                            "[red]\nThe query log is disabled in config.yaml[/red]"
+                        )
+                    elif len(args) == 1 or (len(args) == 2 and args[1].isdigit()):
+                        limit = int(args[1]) if len(args) == 2 else 10
+                        self.query_log.display_top(limit, console.print)
+                    else:
+                        console.print("[red]\nUse -top \\[n][/red]")
+                    continue
+
+                # Result cache
+                if user_cmd == "-cache" or user_cmd.startswith("-cache "):
+                    self.cache_command(user_cmd)
+                    continue
+
+                # Latest result in the current format
+                if user_cmd == "-r":
+                    self.rerender_result()
+                    continue
+
+                # Full-screen result browser
+                if user_cmd == "-b" or user_cmd.startswith("-b "):
+                    self.browse_result(user_input)
+                    continue
+
+                # Index export
+                if user_cmd == "-export" or user_cmd.startswith("-export "):
+                    args = user_input.split()
+                    if len(args) in (3, 4) and (len(args) == 3 or args[3].isdigit()):
+                        slices = int(args[3]) if len(args) == 4 else 0
+                        IndexExport.export_index(
+                            self.sql_connection, args[1], args[2], slices, console.print
+                        )
+                    else:
+                        console.print(
+                            "[red]\nUse -export <index> <file> \\[slices][/red]"
+                        )
+                    continue
+
+                # Retry counters
+                if user_cmd == "-retries":
+                    self.display_retry_stats()
+                    continue
+
+                # HTTP metrics, checked before -s which shares its prefix
+                if user_cmd == "-stats":
+                    SessionStats.display_stats(self.sql_connection, console.print)
+                    continue
+
+                # Session settings, checked before -s which shares its prefix
+                if user_cmd == "-set" or user_cmd.startswith("-set "):
+                    self.session_setting(user_input)
+                    continue
+
+                # Refinements of the latest result, checked before -s which shares its prefix
+                if user_cmd.split(" ")[0] in ("-sort", "-where", "-cols", "-reset"):
+                    self.refine_result(user_input)
+                    continue
+
                 # Saved query
                 if user_cmd.startswith("-s"):
                     # Parse saved queries commands
@@ -304,12 +759,16 @@ class InteractiveShell:
                                     self.sql_connection,
                                     self.format,
                                     self.is_vertical,
+                                    result_cache=self.result_cache,
+                                    output=self.output,
+                                    highlight=self.highlight,
                                 )
                             )
 
                             if success:
                                 # Store the latest query for saving
                                 self.latest_query = query
+                            self.keep_result(query, success, result)
                         elif args[1] == "--remove" and len(args) >= 3:
                             # Remove a saved query
                             name = args[2]
@@ -337,6 +796,11 @@ class InteractiveShell:
                 console.print("[bold green]\nDisconnected. Goodbye!!!\n[/bold green]")
                 break
 
+        # Complete the output file, if any
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
 
 # Create a global instance
 interactive_shell = None
@@ -239,6 +239,8 @@ def main():
             print("\nReceived interrupt signal. Shutting down...")
             # Stop the SQL Library server
             if sql_library_manager.started:
+                # Don't leave an interrupted query running on the cluster
+                sql_connection.cancel_query()
                 sql_library_manager.stop()
             sys.exit(0)
 
@@ -8,3 +8,9 @@ from .execute_query import ExecuteQuery
 from .query_results import QueryResults
 from .saved_queries import SavedQueries
 from .explain_results import ExplainResults
+from .index_export import IndexExport
+from .session_stats import SessionStats
+from .query_log import QueryLog
+from .result_browser import ResultBrowser
+from .result_set import ResultSet
+from .result_cache import ResultCache
@@ -0,0 +1,139 @@
+"""
+Result Decoding
+
+This module decodes the JSON results of the SQL library. It uses orjson or msgspec
+when one of them is installed, both parse several times faster than the standard
+library, and falls back to the json module otherwise. The datarows of a table result
+are then turned into columns guided by the types of the schema. The garbage collector
+is paused meanwhile: the millions of new objects of a large result would trigger
+collections that cost more than the parsing itself.
+"""
+
+import gc
+import sys
+import json
+from array import array
+from contextlib import contextmanager
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+# Field types stored as typed arrays when they hold no null
+INTEGER_TYPES = {"byte", "short", "integer", "long"}
+FLOAT_TYPES = {"float", "double", "half_float", "scaled_float"}
+
+# String columns with at most this share of distinct values share their strings
+LOW_CARDINALITY = 0.5
+CARDINALITY_SAMPLE = 1000
+
+
+@contextmanager
+def paused_gc():
+    """
+    Pause the garbage collector, restoring its previous state afterwards
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def loads(text, backend=None):
+    """
+    Parse a JSON document with the fastest backend available
+
+    Args:
+        text: JSON document
+        backend: orjson, msgspec or json (default: the fastest one installed)
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    backend = backend or BACKEND
+    if backend == "orjson":
+        # orjson.JSONDecodeError is a json.JSONDecodeError
+        return orjson.loads(text)
+    if backend == "msgspec":
+        try:
+            return msgspec.json.decode(text)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), str(text), 0) from e
+    return json.loads(text)
+
+
+def typed_column(values, field_type):
+    """
+    Store the values of a column in the most compact form its schema type allows
+
+    Args:
+        values: List of the values of the column
+        field_type: Field type reported by the SQL library
+
+    Returns:
+        array or list: Typed array for numbers without nulls, a list otherwise,
+        where repeated strings share one object
+    """
+    if field_type in INTEGER_TYPES:
+        try:
+            # Fails in C on the first null, float or out of range value
+            return array("q", values)
+        except (TypeError, OverflowError):
+            pass
+    elif field_type in FLOAT_TYPES and all(type(value) is float for value in values):
+        # Integers are left alone, an array would print them as floats
+        return array("d", values)
+
+    # The cardinality is estimated on an even sample of the strings
+    sample = values[:: max(1, len(values) // CARDINALITY_SAMPLE)]
+    strings = [value for value in sample if type(value) is str]
+    if strings and len(set(strings)) <= len(strings) * LOW_CARDINALITY:
+        return [sys.intern(value) if type(value) is str else value for value in values]
+    return values
+
+
+def decode_columns(schema, datarows):
+    """
+    Turn the rows of a table result into one column per field, emptying datarows
+
+    Args:
+        schema: Fields of the result, with their type
+        datarows: Rows of values, rows shorter than the schema are padded with nulls
+
+    Returns:
+        list: One typed array or list per field
+    """
+    width = len(schema)
+    if not datarows:
+        return [[] for _ in schema]
+    for row in datarows:
+        if len(row) < width:
+            row.extend([None] * (width - len(row)))
+
+    # Each column is gathered in C, straight from the rows
+    columns = []
+    for index, field in enumerate(schema):
+        values = list(map(itemgetter(index), datarows))
+        columns.append(typed_column(values, str(field.get("type", "")).lower()))
+    datarows.clear()
+    return columns
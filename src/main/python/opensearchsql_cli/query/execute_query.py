@@ -4,10 +4,12 @@ Query Execution
 This module provides functionality for executing queries and formatting results.
 """
 
+import time
 from rich.console import Console
 from rich.status import Status
 from rich.markup import escape
 from .query_results import QueryResults
+from .renderers import PlainTable
 from .explain_results import ExplainResults
 
 # Create a console instance for rich formatting
@@ -19,6 +21,9 @@ class ExecuteQuery:
     Class for executing queries and formatting results
     """
 
+    # Phases measured by the SQL library, in execution order
+    LIBRARY_PHASES = ("parse", "engine", "opensearch", "format")
+
     @staticmethod
     def execute_query(
         connection,
@@ -28,6 +33,12 @@ class ExecuteQuery:
         format,
         is_vertical=False,
         print_function=None,
+        show_timing=False,
+        query_log=None,
+        result_cache=None,
+        output=None,
+        highlight=False,
+        display=True,
     ):
         """
         Execute a query and format the result
@@ -40,23 +51,179 @@ class ExecuteQuery:
             format: Output format (json, table, csv)
             is_vertical: Whether to display results in vertical format
             print_function: Function to use for printing (default: console.print)
+            show_timing: Whether to print the time spent in each phase afterwards
+            query_log: Optional QueryLog to record the query and its timings in
+            result_cache: Optional ResultCache to serve the result from and store it in
+            output: Binary stream for JSON and CSV results (default: stdout)
+            highlight: Whether to highlight JSON and CSV results written to a terminal
+            display: Whether to display the result, False to only fetch it, errors
+                are displayed either way
 
         Returns:
-            tuple: (success, result, formatted_result)
+            tuple: (success, result, formatted_result), where formatted_result is
+            the decoded ResultSet for the table format
         """
         if print_function is None:
             print_function = console.print
 
+        timings = {}
+        details = {}
+        started = time.perf_counter()
+        outcome = ExecuteQuery._run_query(
+            connection,
+            query,
+            is_ppl_mode,
+            is_explain,
+            format,
+            is_vertical,
+            print_function,
+            timings,
+            details,
+            result_cache,
+            output,
+            highlight,
+            display,
+        )
+        timings["total"] = (time.perf_counter() - started) * 1000
+
+        # A cached result did not reach the library, its details are of another query
+        cached = "cache" in timings
+        if show_timing or (query_log is not None and not cached):
+            query_info = (
+                None if cached else ExecuteQuery.last_query_info(connection, details)
+            )
+            if show_timing:
+                print_function(ExecuteQuery.format_timings(timings, query_info))
+            if query_log is not None and not cached:
+                query_log.record(
+                    query,
+                    "PPL" if is_ppl_mode else "SQL",
+                    bool(outcome and outcome[0]),
+                    (query_info or {}).get("rows"),
+                    dict(
+                        ExecuteQuery.phase_timings(timings, query_info),
+                        total=timings["total"],
+                    ),
+                )
+        return outcome
+
+    @staticmethod
+    def last_query_info(connection, details):
+        """
+        Details of the last query from the SQL library, fetched once per query
+
+        Args:
+            connection: Connection object the query was executed on
+            details: Dictionary of the query keeping the details once fetched
+
+        Returns:
+            dict: Details of the last query, None if the library has none
+        """
+        if "query_info" not in details:
+            query_info = connection.get_last_query_info()
+            details["query_info"] = query_info if isinstance(query_info, dict) else None
+        return details["query_info"]
+
+    @staticmethod
+    def phase_timings(timings, query_info=None):
+        """
+        List the phases of a query in execution order
+
+        Args:
+            timings: Durations in milliseconds measured by the CLI: call (the
+                SQL library call) or cache (the cache lookup), decode, render
+                and total
+            query_info: Optional last query details from the SQL library, with the
+                timings of its own phases
+
+        Returns:
+            list: (phase, milliseconds) tuples, from parsing to rendering
+        """
+        library = (query_info or {}).get("timings") or {}
+        phases = [
+            (phase, library[phase])
+            for phase in ExecuteQuery.LIBRARY_PHASES
+            if phase in library
+        ]
+        if "call" in timings:
+            if library:
+                # What the library did not measure went to Py4J and the transfer
+                transfer = timings["call"] - library.get("total", 0)
+                phases.append(("transfer", max(transfer, 0)))
+            else:
+                phases.append(("call", timings["call"]))
+        for phase in ("cache", "decode", "render"):
+            if phase in timings:
+                phases.append((phase, timings[phase]))
+        return phases
+
+    @staticmethod
+    def format_timings(timings, query_info=None):
+        """
+        Format the phases of a query as a single line
+
+        Args:
+            timings: Durations in milliseconds measured by the CLI: call (the
+                SQL library call), decode, render and total
+            query_info: Optional last query details from the SQL library, with the
+                timings of its own phases
+
+        Returns:
+            str: Duration of each phase, from parsing to rendering
+        """
+        phases = ExecuteQuery.phase_timings(timings, query_info)
+        breakdown = " | ".join(f"{phase} {ms:,.1f} ms" for phase, ms in phases)
+        return (
+            f"[green]Timing:[/green] [dim white]{breakdown} | "
+            f"total {timings.get('total', 0):,.1f} ms[/dim white]"
+        )
+
+    @staticmethod
+    def _run_query(
+        connection,
+        query,
+        is_ppl_mode,
+        is_explain,
+        format,
+        is_vertical,
+        print_function,
+        timings,
+        details,
+        result_cache=None,
+        output=None,
+        highlight=False,
+        display=True,
+    ):
+        """
+        Execute a query and display its result, recording the duration of the
+        call or cache lookup, decode and render phases in timings and the details
+        of the query, once fetched from the library, in details
+        """
         console.print(f"\nExecuting: [yellow]{query}[/yellow]\n")
 
+        # Serve the result from the cache when it holds it
+        key = result = None
+        if result_cache is not None and result_cache.cacheable(query, is_ppl_mode):
+            started = time.perf_counter()
+            key = result_cache.key(query, is_ppl_mode, format)
+            result, age = result_cache.get(key)
+            if result is not None:
+                timings["cache"] = (time.perf_counter() - started) * 1000
+                print_function(f"[dim white]cached (age {age:.0f}s)[/dim white]")
+
         # Execute the query
-        with console.status("Executing the query...", spinner="dots"):
-            result = connection.query_executor(query, is_ppl_mode, format)
+        cached = result is not None
+        if not cached:
+            with console.status("Executing the query...", spinner="dots"):
+                started = time.perf_counter()
+                result = connection.query_executor(query, is_ppl_mode, format)
+                timings["call"] = (time.perf_counter() - started) * 1000
 
         # Errors handling
         # print_function(f"Before format: \n" + escape(result) + "\n")
-        if result.startswith("Invalid query") or result.startswith(
-            "queryExecution Error"
+        if not cached and (
+            result.startswith("Invalid query")
+            or result.startswith("queryExecution Error")
         ):
             if "index_not_found_exception" in result:
                 print_function("[bold red]Index does not exist[/bold red]")
@@ -76,40 +243,76 @@ class ExecuteQuery:
                 print_function(f"[bold red]Error:[/bold red] {escape(str(result))}")
             return False, result, result
 
-        print_function(f"Result:\n")
-        with console.status("Formatting results...", spinner="dots"):
+        if key is not None and not cached:
+            result_cache.put(key, result)
+
+        if display:
+            print_function(f"Result:\n")
+        with console.status("Formatting results...", spinner="dots") as status:
             # For explain query
             if is_explain:
-                if "calcite" in result:
-                    explain_result = ExplainResults.explain_calcite(result)
-                    print_function(explain_result)
-                    return True, result, result
-                elif "root" in result:
-                    explain_result = ExplainResults.explain_legacy(result)
-                    print_function(explain_result)
+                try:
+                    if format.lower() == "table" and (
+                        "calcite" in result or "root" in result
+                    ):
+                        # Operator trees, JSON and CSV keep the structured plan
+                        explain_result = ExplainResults.explain_tree(result)
+                    elif "calcite" in result:
+                        explain_result = ExplainResults.explain_calcite(result)
+                    elif "root" in result:
+                        explain_result = ExplainResults.explain_legacy(result)
+                    else:
+                        explain_result = None
+                except (ValueError, KeyError, TypeError):
+                    explain_result = None
+                if explain_result:
+                    print_function(escape(explain_result))
                     return True, result, result
-                else:
-                    print_function(f"{result}")
+                # Output that is not a plan is printed as the library returned it
+                print_function(escape(f"{result}"))
+                return True, result, result
             # For execute query
             else:
                 if format.lower() == "table":
-                    table_data = QueryResults.table_format(result, is_vertical)
+                    query_info = (
+                        None
+                        if cached
+                        else ExecuteQuery.last_query_info(connection, details)
+                    )
+                    started = time.perf_counter()
+                    table_data = QueryResults.table_format(
+                        result, is_vertical, query_info
+                    )
+                    timings["decode"] = (time.perf_counter() - started) * 1000
+                    if key is not None and table_data.get("result_set") is not None:
+                        # Later runs skip decoding, the disk tier keeps the string
+                        result_cache.put(key, table_data["result_set"], persist=False)
                     if "error" in table_data and table_data["error"]:
                         print_function(
                             f"[bold red]Error:[/bold red] {table_data['message']}"
                         )
                         return False, result, table_data["result"]
+                    elif not display:
+                        return True, result, table_data["result_set"]
                     else:
+                        # Stop the spinner, it would capture what is written to stdout
+                        if is_vertical or isinstance(
+                            table_data.get("table"), PlainTable
+                        ):
+                            status.stop()
                         # Display table
+                        started = time.perf_counter()
                         QueryResults.display_table_result(table_data, print_function)
-                        return True, result, str(table_data)
-                elif format.lower() == "csv":
-                    # return the result with white color
-                    # because Rich automatically pretty-printing
-                    print_function(f"[white]{escape(result)}[/white]")
+                        timings["render"] = (time.perf_counter() - started) * 1000
+                        return True, result, table_data["result_set"]
+                elif not display:
                     return True, result, result
                 else:
-                    # For other formats, use the result directly
-                    # Right now, only JSON
-                    print_function(f"{escape(result)}")
+                    # CSV and JSON are written as they come from the SQL library
+                    status.stop()
+                    started = time.perf_counter()
+                    QueryResults.display_raw_result(
+                        result, format, print_function, output, highlight
+                    )
+                    timings["render"] = (time.perf_counter() - started) * 1000
                     return True, result, result
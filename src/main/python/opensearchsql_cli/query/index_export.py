@@ -0,0 +1,131 @@
+"""
+Index Export
+
+This module exports every document of an index to a newline-delimited JSON file.
+The SQL library reads the index in parallel slices, this module starts the export
+and reports its progress until it ends. Ctrl+C cancels the export rather than
+shutting the CLI down.
+"""
+
+import os
+import signal
+import time
+from contextlib import contextmanager
+from rich.console import Console
+from rich.markup import escape
+
+# Create a console instance for rich formatting
+console = Console()
+
+
+@contextmanager
+def interruptible():
+    """
+    Raise KeyboardInterrupt on Ctrl+C within the block, instead of running the
+    SIGINT handler of main.py that shuts the CLI down
+    """
+    try:
+        previous = signal.signal(signal.SIGINT, signal.default_int_handler)
+    except ValueError:
+        # Signal handlers can only be set from the main thread
+        yield
+        return
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
+class IndexExport:
+    """
+    Class for running sliced index exports and reporting their progress
+    """
+
+    # Seconds between two progress updates
+    POLL_INTERVAL = 0.5
+
+    @staticmethod
+    def format_progress(progress):
+        """
+        Format the progress of an export as a single line
+
+        Args:
+            progress: Export progress dictionary from the SQL library
+
+        Returns:
+            str: Documents written, rows per second and documents per slice
+        """
+        slices = progress.get("slices", [])
+        per_slice = ", ".join(
+            f"{s['id']}: {s['docs']:,}{' ✓' if s.get('done') else ''}" for s in slices
+        )
+        return (
+            f"Exported {progress.get('docs', 0):,} documents "
+            f"({progress.get('rows_per_second', 0):,.0f} rows/s) "
+            f"[dim white]slices {per_slice}[/dim white]"
+        )
+
+    @staticmethod
+    def export_index(connection, index, path, slices=0, print_function=None):
+        """
+        Export an index and wait for the export to end
+
+        Args:
+            connection: Connection object to start and follow the export
+            index: Name of the index to export
+            path: Output file, one JSON document per line
+            slices: Number of slices read concurrently, 0 for the configured default
+            print_function: Function to use for printing (default: console.print)
+
+        Returns:
+            bool: True if every document was exported, False otherwise
+        """
+        if print_function is None:
+            print_function = console.print
+
+        path = os.path.abspath(os.path.expanduser(path))
+        success, error = connection.start_export(index, path, slices)
+        if not success:
+            print_function(
+                f"[bold red]ERROR:[/bold red] [red]{escape(str(error))}[/red]"
+            )
+            return False
+
+        progress = {}
+        try:
+            with interruptible(), console.status(
+                f"Exporting {index}...", spinner="dots"
+            ) as status:
+                while True:
+                    progress = connection.get_export_progress() or {}
+                    if progress.get("state") != "running":
+                        break
+                    status.update(IndexExport.format_progress(progress))
+                    time.sleep(IndexExport.POLL_INTERVAL)
+        except KeyboardInterrupt:
+            connection.cancel_export()
+            print_function("[yellow]\nExport cancelled.[/yellow]")
+            return False
+
+        state = progress.get("state")
+        if state is None:
+            print_function(
+                "[bold red]ERROR:[/bold red] [red]Unable to follow the export[/red]"
+            )
+            return False
+
+        print_function(IndexExport.format_progress(progress))
+        if state == "done":
+            print_function(
+                f"[green]Exported {progress.get('docs', 0):,} documents of {index} to {path} "
+                f"in {progress.get('elapsed_seconds', 0):.1f}s[/green]"
+            )
+            return True
+
+        if state == "failed":
+            print_function(
+                f"[bold red]ERROR:[/bold red] [red]Export failed: {escape(str(progress.get('error')))}[/red]"
+            )
+        else:
+            print_function(f"[yellow]Export {state}.[/yellow]")
+        return False
@@ -0,0 +1,425 @@
+"""
+Plan Tree
+
+This module parses the explain output of the SQL library into a tree of operators.
+Calcite plans are text, one operator per line indented under its input, with its
+attributes in brackets and, when costs are explained, its row count and cumulative
+cost after a colon. Legacy plans are JSON with a name, a description and children.
+Attribute values are parsed recursively, whatever brackets, quotes or JSON they hold,
+so filters, aggregates, sorts, joins and push down contexts come out intact.
+"""
+
+import re
+import json
+
+OPENING = "([{"
+CLOSING = ")]}"
+
+# Operator kinds, by a part of the operator name, first match wins
+KINDS = (
+    ("scan", ("Scan",)),
+    ("join", ("Join", "Correlate")),
+    ("aggregate", ("Aggregat",)),
+    ("filter", ("Filter",)),
+    ("sort", ("Sort",)),
+    ("limit", ("Limit", "Head")),
+    ("project", ("Project", "Calc")),
+    ("window", ("Window",)),
+    ("union", ("Union", "Intersect", "Minus")),
+    ("values", ("Values",)),
+)
+
+OPERATOR_PATTERN = re.compile(r"^(\s*)([\w$.]+)(.*)$", re.DOTALL)
+CALL_PATTERN = re.compile(r"^([A-Z][\w$.]*)\((.*)\)$", re.DOTALL)
+PUSH_DOWN_PATTERN = re.compile(r"^([A-Z_]+)->(.*)$", re.DOTALL)
+KEY_PATTERN = re.compile(r"^[^\s=]+$")
+
+
+def top_level(text):
+    """
+    Generate the characters of a text that are outside brackets and quotes,
+    brackets included
+
+    Yields:
+        tuple: (index, character)
+    """
+    depth = 0
+    quote = None
+    escaped = False
+    for index, char in enumerate(text):
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+            continue
+        if char in "\"'":
+            quote = char
+        elif char in OPENING:
+            if depth == 0:
+                yield index, char
+            depth += 1
+        elif char in CLOSING:
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                yield index, char
+        elif depth == 0:
+            yield index, char
+
+
+def closing_index(text, start=0):
+    """
+    Index of the bracket closing the one at start, -1 if it is not closed
+    """
+    positions = top_level(text[start:])
+    next(positions, None)
+    for index, char in positions:
+        return start + index if char in CLOSING else -1
+    return -1
+
+
+def split_top_level(text, separator=","):
+    """
+    Split a text on a separator outside brackets and quotes, dropping empty parts
+    """
+    parts = []
+    last = 0
+    for index, char in top_level(text):
+        if char == separator:
+            parts.append(text[last:index].strip())
+            last = index + 1
+    parts.append(text[last:].strip())
+    return [part for part in parts if part]
+
+
+def number(text):
+    """
+    Convert a number of a cost to a float, leaving other text as it is
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_value(text):
+    """
+    Parse an attribute value into lists, objects and strings
+
+    Args:
+        text: Value as printed in the plan
+
+    Returns:
+        A list for bracketed or comma separated values, a dict for JSON, push down
+        operations (PROJECT->...) and objects (Name(key=value, ...)), the text
+        otherwise
+    """
+    text = text.strip()
+    parts = split_top_level(text)
+    if len(parts) > 1:
+        return [parse_value(part) for part in parts]
+    if text.startswith("[") and closing_index(text) == len(text) - 1:
+        return [parse_value(part) for part in split_top_level(text[1:-1])]
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    push_down = PUSH_DOWN_PATTERN.match(text)
+    if push_down:
+        return {push_down.group(1): parse_value(push_down.group(2))}
+
+    # Objects have only key=value arguments, expressions such as AND(...) do not
+    call = CALL_PATTERN.match(text)
+    if call and closing_index(text, len(call.group(1))) == len(text) - 1:
+        attributes = parse_attributes(call.group(2))
+        if attributes:
+            return {call.group(1): attributes}
+    return text
+
+
+def parse_attributes(text, wrapped=False):
+    """
+    Parse the key=value attributes of an operator or an object
+
+    Args:
+        text: Attributes, separated by commas
+        wrapped: Whether each value is wrapped in brackets, as Calcite prints the
+            attributes of its operators
+
+    Returns:
+        dict: Parsed value of each key, None if an attribute is not key=value
+    """
+    attributes = {}
+    for part in split_top_level(text):
+        equals = next((index for index, char in top_level(part) if char == "="), -1)
+        key = part[:equals].strip()
+        if equals < 1 or not KEY_PATTERN.match(key):
+            return None
+        value = part[equals + 1 :].strip()
+        if wrapped and value.startswith("[") and closing_index(value) == len(value) - 1:
+            value = value[1:-1]
+        attributes[key] = parse_value(value)
+    return attributes
+
+
+def parse_cost(text):
+    """
+    Parse the cost estimates printed after an operator
+
+    Args:
+        text: Estimates such as rowcount = 10.0, cumulative cost = {20.0 rows, 11.0
+            cpu, 0.0 io}, id = 5
+
+    Returns:
+        dict: rows, cumulative (with rows, cpu and io) and any other estimate
+    """
+    cost = {}
+    for part in split_top_level(text):
+        key, _, value = part.partition("=")
+        key = key.strip()
+        value = value.strip()
+        if key == "rowcount":
+            cost["rows"] = number(value)
+        elif key == "cumulative cost" and value.startswith("{"):
+            cumulative = {}
+            for item in split_top_level(value[1:-1]):
+                amount, _, unit = item.partition(" ")
+                cumulative[unit.strip() or "total"] = number(amount)
+            cost["cumulative"] = cumulative
+        elif key:
+            cost[key] = number(value) if value else value
+    return cost
+
+
+class PlanNode:
+    """
+    Class for one operator of a query plan and its inputs
+    """
+
+    def __init__(self, name, attributes=None, children=None, cost=None):
+        """
+        Initialize PlanNode instance
+
+        Args:
+            name: Operator name, such as LogicalFilter or CalciteEnumerableIndexScan
+            attributes: Parsed attributes of the operator
+            children: Input operators
+            cost: Optional cost estimates of the operator
+        """
+        self.name = name
+        self.attributes = attributes if attributes is not None else {}
+        self.children = children if children is not None else []
+        self.cost = cost
+
+    @property
+    def kind(self):
+        """
+        Kind of operator: scan, join, aggregate, filter, sort, limit, project,
+        window, union, values or other
+        """
+        for kind, parts in KINDS:
+            if any(part in self.name for part in parts):
+                return kind
+        return "other"
+
+    def walk(self):
+        """
+        Generate this operator and the operators below it, depth first
+
+        Yields:
+            PlanNode: Each operator of the tree
+        """
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self):
+        """
+        Convert the tree to plain data for JSON
+
+        Returns:
+            dict: name, kind, attributes, cost when estimated and children
+        """
+        data = {"name": self.name, "kind": self.kind, "attributes": self.attributes}
+        if self.cost:
+            data["cost"] = self.cost
+        data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+    def lines(self, prefix="", last=True, root=True):
+        """
+        Render the tree with one line per operator and one per attribute
+
+        Returns:
+            list: Lines of the tree, without line breaks
+        """
+        head = self.name
+        if self.cost:
+            head += f"  ({format_cost(self.cost)})"
+        if root:
+            lines = [head]
+            child_prefix = ""
+        else:
+            lines = [prefix + ("└── " if last else "├── ") + head]
+            child_prefix = prefix + ("    " if last else "│   ")
+
+        attribute_prefix = child_prefix + ("│   " if self.children else "    ")
+        for key, value in self.attributes.items():
+            lines.append(f"{attribute_prefix}{key}: {format_value(value)}")
+        for index, child in enumerate(self.children):
+            lines.extend(
+                child.lines(child_prefix, index == len(self.children) - 1, False)
+            )
+        return lines
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+    @staticmethod
+    def from_calcite(plan):
+        """
+        Parse a Calcite plan, one operator per line indented under its input
+
+        Args:
+            plan: Plan text
+
+        Returns:
+            PlanNode: Root operator, None if the plan is empty. Several top level
+            operators are gathered under a Plan node
+        """
+        roots = []
+        # (indentation, node) of the operators the next line may be an input of
+        stack = []
+        for line in plan.splitlines():
+            if not line.strip():
+                continue
+            node, indent = PlanNode.parse_line(line)
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            if stack:
+                stack[-1][1].children.append(node)
+            else:
+                roots.append(node)
+            stack.append((indent, node))
+
+        if not roots:
+            return None
+        return roots[0] if len(roots) == 1 else PlanNode("Plan", children=roots)
+
+    @staticmethod
+    def parse_line(line):
+        """
+        Parse one operator of a Calcite plan
+
+        Returns:
+            tuple: (PlanNode, indentation), lines that are not operators become a
+            node named after the whole line
+        """
+        match = OPERATOR_PATTERN.match(line.rstrip())
+        if match is None:
+            return PlanNode(line.strip()), len(line) - len(line.lstrip())
+        indent, name, rest = match.groups()
+        if rest.strip() and rest.strip()[0] not in "(:":
+            return PlanNode(line.strip()), len(indent)
+
+        attributes = {}
+        if rest.startswith("("):
+            close = closing_index(rest)
+            if close == -1:
+                return PlanNode(line.strip()), len(indent)
+            attributes = parse_attributes(rest[1:close], wrapped=True)
+            if attributes is None:
+                # Positional arguments are kept as they are printed
+                attributes = {"arguments": rest[1:close]}
+            rest = rest[close + 1 :]
+
+        cost = None
+        if rest.strip().startswith(":"):
+            cost = parse_cost(rest.strip()[1:])
+        return PlanNode(name, attributes, cost=cost), len(indent)
+
+    @staticmethod
+    def from_legacy(node):
+        """
+        Parse a legacy plan, JSON objects with a name, a description and children
+
+        Args:
+            node: Decoded JSON object of the operator
+
+        Returns:
+            PlanNode: Operator with its inputs
+        """
+        attributes = {}
+        for key, value in (node.get("description") or {}).items():
+            attributes[key] = parse_value(value) if isinstance(value, str) else value
+        children = [PlanNode.from_legacy(child) for child in node.get("children", [])]
+        return PlanNode(str(node.get("name", "")), attributes, children)
+
+    @staticmethod
+    def from_explain(result):
+        """
+        Parse the explain output of the SQL library
+
+        Args:
+            result: Explain JSON, with a calcite object of logical and physical plans
+                or a legacy root operator
+
+        Returns:
+            dict: Root operator of each plan by its name (logical, physical or root),
+            empty if the output holds no plan
+
+        Raises:
+            json.JSONDecodeError: If the result is not valid JSON
+        """
+        data = json.loads(result)
+        plans = {}
+        if not isinstance(data, dict):
+            return plans
+        if isinstance(data.get("calcite"), dict):
+            for name in ("logical", "physical"):
+                plan = data["calcite"].get(name)
+                if isinstance(plan, str):
+                    node = PlanNode.from_calcite(plan)
+                    if node is not None:
+                        plans[name] = node
+        elif isinstance(data.get("root"), dict):
+            plans["root"] = PlanNode.from_legacy(data["root"])
+        return plans
+
+
+def format_value(value):
+    """
+    Format a parsed attribute value on one line
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "[" + ", ".join(format_value(item) for item in value) + "]"
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def format_cost(cost):
+    """
+    Format the cost estimates of an operator on one line
+    """
+    parts = []
+    for key, value in cost.items():
+        if key == "cumulative" and isinstance(value, dict):
+            total = ", ".join(
+                f"{format_amount(amount)} {unit}" for unit, amount in value.items()
+            )
+            parts.append(f"cumulative {total}")
+        else:
+            parts.append(f"{key} {format_amount(value)}")
+    return ", ".join(parts)
+
+
+def format_amount(amount):
+    """
+    Format an estimate without trailing zeros
+    """
+    return f"{amount:g}" if isinstance(amount, float) else str(amount)
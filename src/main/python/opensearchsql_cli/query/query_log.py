@@ -0,0 +1,221 @@
+"""
+Query Log
+
+This module appends every executed query to a local JSON lines log, with a
+fingerprint of its text, its language, the SQL plugin version, the rows returned
+and the time spent in each phase. The log outlives the session, so queries can be
+aggregated by fingerprint to find the recurring patterns that cost the most time.
+"""
+
+import os
+import re
+import json
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.box import HEAVY_HEAD
+from rich.markup import escape
+from ..sql.sql_version import sql_version
+
+# Create a console instance for rich formatting
+console = Console()
+
+# Literals replaced by a placeholder in fingerprints
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+# Digits after a word and a dash are part of a name, such as the index logs-2024
+NUMBER_LITERAL = re.compile(
+    r"(?<![\w.])(?<!\w-)\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.])"
+)
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+class QueryLog:
+    """
+    Class for recording queries and aggregating them by fingerprint
+    """
+
+    # Size the log may reach before it is rotated, the previous log is kept
+    DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+    # Longest fingerprint shown by -top
+    FINGERPRINT_WIDTH = 60
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize QueryLog instance
+
+        Args:
+            path: Log file (default: .query_log.jsonl next to the shell history)
+            max_bytes: Size of the log file before it is rotated
+        """
+        if path is None:
+            package_dir = os.path.dirname(os.path.dirname(__file__))
+            path = os.path.join(package_dir, ".query_log.jsonl")
+        self.path = path
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def fingerprint(query):
+        """
+        Normalize a query so that runs differing only by literals match
+
+        Args:
+            query: Query text
+
+        Returns:
+            str: Lowercase query with literals replaced by ? and whitespace collapsed
+        """
+        text = STRING_LITERAL.sub("?", query)
+        text = NUMBER_LITERAL.sub("?", text)
+        text = PLACEHOLDER_LIST.sub("(?)", text)
+        return " ".join(text.split()).rstrip(";").strip().lower()
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        """
+        Nearest-rank percentile of sorted values, 0 if there are none
+        """
+        if not sorted_values:
+            return 0
+        rank = max(1, -(-len(sorted_values) * percent // 100))
+        return sorted_values[int(rank) - 1]
+
+    def record(self, query, language, success, rows, timings):
+        """
+        Append a query to the log, rotating the log once it is too large
+
+        Args:
+            query: Query text
+            language: PPL or SQL
+            success: Whether the query succeeded
+            rows: Number of rows returned, None if unknown
+            timings: Duration of each phase in milliseconds, with the total
+
+        Returns:
+            bool: True if the query was logged, False otherwise
+        """
+        entry = {
+            "timestamp": time.time(),
+            "query": query,
+            "fingerprint": QueryLog.fingerprint(query),
+            "language": language,
+            "version": sql_version.version,
+            "success": success,
+            "rows": rows,
+            "timings": timings,
+        }
+        try:
+            if (
+                os.path.exists(self.path)
+                and os.path.getsize(self.path) >= self.max_bytes
+            ):
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            return True
+        except OSError:
+            return False
+
+    def entries(self):
+        """
+        Read the logged queries, oldest first, skipping unreadable lines
+
+        Returns:
+            list: Logged query dictionaries
+        """
+        entries = []
+        for path in (self.path + ".1", self.path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except OSError:
+                continue
+        return entries
+
+    def top(self, limit=10):
+        """
+        Aggregate the successful logged queries by fingerprint, failures end
+        early and would skew the latencies
+
+        Args:
+            limit: Number of fingerprints to return
+
+        Returns:
+            list: Dictionaries with the fingerprint, language, count, p50, p95, p99
+            and total time in milliseconds, most total time first
+        """
+        groups = {}
+        for entry in self.entries():
+            fingerprint = entry.get("fingerprint")
+            total = (entry.get("timings") or {}).get("total")
+            if not fingerprint or not isinstance(total, (int, float)):
+                continue
+            if entry.get("success") is False:
+                continue
+            group = groups.setdefault(
+                (entry.get("language"), fingerprint),
+                {"language": entry.get("language"), "fingerprint": fingerprint},
+            )
+            group.setdefault("times", []).append(total)
+
+        results = []
+        for group in groups.values():
+            times = sorted(group.pop("times"))
+            group.update(
+                count=len(times),
+                p50=QueryLog.percentile(times, 50),
+                p95=QueryLog.percentile(times, 95),
+                p99=QueryLog.percentile(times, 99),
+                total=sum(times),
+            )
+            results.append(group)
+        results.sort(key=lambda group: group["total"], reverse=True)
+        return results[:limit]
+
+    def display_top(self, limit=10, print_function=None):
+        """
+        Display the fingerprints that took the most time across sessions
+
+        Args:
+            limit: Number of fingerprints to display
+            print_function: Function to use for printing (default: console.print)
+
+        Returns:
+            bool: True if the log had queries to display, False otherwise
+        """
+        if print_function is None:
+            print_function = console.print
+
+        groups = self.top(limit)
+        if not groups:
+            print_function("[yellow]\nNo queries logged yet.[/yellow]")
+            return False
+
+        table = Table(box=HEAVY_HEAD)
+        table.add_column("Fingerprint", style="dim white", no_wrap=True)
+        table.add_column("Lang")
+        table.add_column("Count", justify="right")
+        table.add_column("p50 ms", justify="right")
+        table.add_column("p95 ms", justify="right")
+        table.add_column("p99 ms", justify="right")
+        table.add_column("Total s", justify="right")
+        for group in groups:
+            fingerprint = group["fingerprint"]
+            if len(fingerprint) > QueryLog.FINGERPRINT_WIDTH:
+                fingerprint = fingerprint[: QueryLog.FINGERPRINT_WIDTH - 1] + "…"
+            table.add_row(
+                escape(fingerprint),
+                str(group["language"] or ""),
+                f"{group['count']:,}",
+                f"{group['p50']:,.1f}",
+                f"{group['p95']:,.1f}",
+                f"{group['p99']:,.1f}",
+                f"{group['total'] / 1000:,.2f}",
+            )
+        print_function(f"[green]\nTop queries by total time ({self.path}):[/green]")
+        print_function(table)
+        return True
@@ -2,13 +2,19 @@
 Query Result Handling
 
 This module provides table formatting for query results.
-Other formats are handled by the Java formatters in the SQL library.
+Other formats are handled by the Java formatters in the SQL library, a decoded result
+is only written as JSON or CSV here when it is displayed again without its query.
+JSON and CSV are written as bytes, Rich only highlights them when asked to.
 """
 
+import sys
 import json
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 from rich.box import HEAVY_HEAD
+from .renderers import PlainTable, VerticalRecords, write_raw
+from .result_set import ResultSet
 
 # Create a console instance for rich formatting
 console = Console()
@@ -19,6 +25,9 @@ class QueryResults:
     Class for formatting execute query results
     """
 
+    # Results with more rows are rendered as a plain table instead of a Rich one
+    PLAIN_TABLE_ROWS = 1000
+
     def display_table_result(table_data, print_function=None):
         """
         Display table result using the provided print function or console.print
@@ -45,11 +54,12 @@ class QueryResults:
         ):
             # For explain results, just print the raw result
             print_function(table_data["result"])
-        elif table_data.get("vertical", False) and "tables" in table_data:
-            # For vertical format, print each table
-            for table in table_data["tables"]:
-                print_function(table)
-                print_function("")  # Add a blank line between tables
+        elif table_data.get("vertical", False) and "records" in table_data:
+            # For vertical format, records are written to stdout as they are formatted
+            table_data["records"].write()
+        elif isinstance(table_data.get("table"), PlainTable):
+            # Large results bypass Rich and are written straight to stdout
+            table_data["table"].write()
         elif "table" in table_data:
             # For horizontal format, print the single table
             print_function(table_data["table"])
@@ -61,61 +71,125 @@ class QueryResults:
         if table_data.get("warning"):
             print_function(table_data["warning"])
 
-    def table_format(result: str, vertical: bool = False):
+    def display_result(
+        result_set,
+        format,
+        vertical=False,
+        print_function=None,
+        output=None,
+        highlight=False,
+    ):
+        """
+        Display a decoded result in any format, without going back to the cluster
+
+        Args:
+            result_set: ResultSet of the result
+            format: Output format (json, table, csv)
+            vertical: Whether to display the table in vertical format
+            print_function: Function to use for printing (default: console.print)
+            output: Binary stream for JSON and CSV (default: stdout)
+            highlight: Whether to highlight JSON and CSV written to a terminal
+        """
+        if print_function is None:
+            print_function = console.print
+
+        if format.lower() == "table":
+            table_data = QueryResults.table_format(result_set, vertical)
+            QueryResults.display_table_result(table_data, print_function)
+        elif format.lower() == "csv":
+            QueryResults.display_raw_result(
+                result_set.to_csv(), "csv", print_function, output, highlight
+            )
+        else:
+            QueryResults.display_raw_result(
+                result_set.to_json(), "json", print_function, output, highlight
+            )
+
+    def display_raw_result(
+        result, format, print_function=None, output=None, highlight=False
+    ):
+        """
+        Display a JSON or CSV result as it is
+
+        Rich would escape, parse and highlight every character of the result, which
+        takes longer than the query for a large one. The result is written as bytes
+        instead, unless highlighting is asked for and stdout is a terminal.
+
+        Args:
+            result: JSON or CSV result string
+            format: Format of the result (json, csv)
+            print_function: Function to use for printing (default: console.print)
+            output: Binary stream to write to (default: stdout)
+            highlight: Whether to highlight a result written to a terminal
+        """
+        if print_function is None:
+            print_function = console.print
+
+        if highlight and output is None and sys.stdout.isatty():
+            if format.lower() == "csv":
+                # White, Rich would highlight the numbers and strings otherwise
+                print_function(f"[white]{escape(result)}[/white]")
+            else:
+                print_function(escape(result))
+            return
+
+        write_raw(result, output)
+        if output is not None:
+            name = getattr(output, "name", "the output file")
+            print_function(f"[dim white]Written to {escape(str(name))}[/dim white]")
+
+    def table_format(result, vertical: bool = False, query_info=None):
         """
         Format the result as a table using Rich Table
 
         Args:
-            result: JSON result string from Java in JDBC format
+            result: JSON result string from Java in JDBC format, or its ResultSet
             vertical: Whether to force vertical output format (default: False)
+            query_info: Optional last query details from the SQL library, with the
+                total_hits and total_hits_relation reported by the cluster
 
         Returns:
-            dict: Dictionary containing message, table object, and warning
+            dict: Dictionary containing message, result set, table object, and warning
         """
         try:
-            data = json.loads(result)
+            if isinstance(result, ResultSet):
+                result_set = result
+            else:
+                result_set = ResultSet.from_json(result)
 
-            if isinstance(data, dict) and "schema" in data and "datarows" in data:
-                # Extract schema and data
-                schema = data["schema"]
-                datarows = data["datarows"]
-                total_hits = data["total"]
-                cur_size = data["size"]
+            if result_set is not None:
+                total_hits = result_set.total
+                cur_size = result_set.size
+
+                # The total of the engine is only a lower bound when it is the hit
+                # count of a search that stopped counting. Aggregations and joins
+                # have totals of their own, unrelated to the hits of the first search,
+                # and without hit tracking the cluster reports no count at all
+                if query_info and query_info.get("total_hits_relation") == "gte":
+                    cluster_hits = query_info.get("total_hits")
+                    if cluster_hits is not None and cluster_hits == total_hits:
+                        total_hits = f"≥ {total_hits}"
 
                 # Create message
                 message = f"Fetched {cur_size} rows with a total of {total_hits} hits"
 
                 if vertical:
-                    # Create a list to hold all record tables
-                    record_tables = []
-
-                    # Vertical format (one row per record)
-                    for row_idx, row in enumerate(datarows):
-                        record_table = Table(
-                            title=f"RECORD {row_idx + 1}",
-                            title_style="bold yellow",
-                            box=HEAVY_HEAD,
-                            show_header=False,
-                            header_style="bold green",
-                            show_lines=True,
-                            border_style="bright_black",
-                        )
-                        record_table.add_column("Field", style="bold green")
-                        record_table.add_column("Value", style="white")
-
-                        for field_idx, field in enumerate(schema):
-                            field_name = field.get("alias", field["name"])
-                            value = row[field_idx] if field_idx < len(row) else "<null>"
-                            value_str = str(value) if value is not None else "<null>"
-                            record_table.add_row(field_name, value_str)
-
-                        record_tables.append(record_table)
-
+                    # Vertical format (one line per field), streamed record by record
                     return {
                         "message": message,
-                        "tables": record_tables,
+                        "result_set": result_set,
+                        "records": VerticalRecords(result_set.names, result_set),
                         "vertical": True,
                     }
+                elif len(result_set) > QueryResults.PLAIN_TABLE_ROWS:
+                    # Horizontal format, too large for Rich to lay out quickly
+                    table = PlainTable(result_set.names, result_set)
+                    return {
+                        "message": message,
+                        "result_set": result_set,
+                        "table": table,
+                        "vertical": False,
+                    }
                 else:
                     # Horizontal format (traditional table)
                     table = Table(
@@ -127,19 +201,23 @@ class QueryResults:
                     )
 
                     # Add columns with styling
-                    for field in schema:
-                        field_name = field.get("alias", field["name"])
+                    for field_name in result_set.names:
                         table.add_column(field_name, style="bold green")
 
                     # Add data rows
-                    for row in datarows:
+                    for row in result_set:
                         # Convert all values to strings
                         str_row = [
                             str(val) if val is not None else "<null>" for val in row
                         ]
                         table.add_row(*str_row, style="white")
 
-                    return {"message": message, "table": table, "vertical": False}
+                    return {
+                        "message": message,
+                        "result_set": result_set,
+                        "table": table,
+                        "vertical": False,
+                    }
             else:
                 # If not in a recognized format, return as is
                 console.print("[bold red]Error formatting.[/bold red]")
@@ -0,0 +1,262 @@
+"""
+Result Renderers
+
+This module provides plain-text renderers for large results. Rich measures every cell
+and parses markup before laying out a table, which takes longer than the query once
+a result has a few thousand rows. The plain table sizes its columns from a sample of
+the rows and the vertical records are formatted one at a time, both are written as
+preformatted lines straight to stdout. Table cells are measured in terminal columns,
+so wide characters such as CJK keep the borders aligned, and values wider than their
+column end with an ellipsis. JSON and CSV results are already formatted by
+the SQL library and are written as bytes, without markup or highlighting.
+"""
+
+import sys
+from rich.cells import cell_len, set_cell_size
+
+# Lines written to the stream at once
+CHUNK_LINES = 1000
+
+NULL = "<null>"
+
+# Marks the end of a value cut to its column
+ELLIPSIS = "…"
+
+# Line breaks and tabs would break the rows of a table, they are shown escaped
+CONTROL_ESCAPES = str.maketrans({"\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def text_width(text):
+    """
+    Width of a text in terminal columns
+    """
+    return len(text) if text.isascii() else cell_len(text)
+
+
+def fit(text, width):
+    """
+    Pad a text to a width in terminal columns, or cut it and end it with an
+    ellipsis
+    """
+    if text.isascii():
+        if len(text) > width:
+            return text[: width - 1] + ELLIPSIS
+        return text.ljust(width)
+    if cell_len(text) > width:
+        return set_cell_size(text, width - 1) + ELLIPSIS
+    return set_cell_size(text, width)
+
+
+def write_lines(lines, stream=None):
+    """
+    Write lines to a stream in chunks, as they are generated
+
+    Args:
+        lines: Iterable of lines without line breaks
+        stream: Text stream to write to (default: sys.stdout)
+    """
+    if stream is None:
+        stream = sys.stdout
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= CHUNK_LINES:
+            stream.write("\n".join(chunk) + "\n")
+            stream.flush()
+            chunk = []
+    if chunk:
+        stream.write("\n".join(chunk) + "\n")
+    stream.flush()
+
+
+def write_raw(text, stream=None):
+    """
+    Write a preformatted result as UTF-8 bytes, followed by a line break
+
+    Args:
+        text: Result text
+        stream: Binary stream to write to (default: the buffer of sys.stdout, or
+            sys.stdout itself when it is a text stream without one)
+    """
+    if stream is None:
+        # Text already printed to sys.stdout must come out first
+        sys.stdout.flush()
+        stream = getattr(sys.stdout, "buffer", None)
+        if stream is None:
+            sys.stdout.write(text + "\n")
+            sys.stdout.flush()
+            return
+    stream.write(text.encode("utf-8"))
+    stream.write(b"\n")
+    stream.flush()
+
+
+class PlainTable:
+    """
+    Class for rendering a large result as a plain-text table
+    """
+
+    # Rows sampled, evenly across the result, to size the columns
+    SAMPLE_ROWS = 1000
+
+    # Widest a column may be, longer values are cut and end with an ellipsis
+    MAX_COLUMN_WIDTH = 60
+
+    def __init__(self, headers, rows):
+        """
+        Initialize PlainTable instance
+
+        Args:
+            headers: Column names
+            rows: Lists of values, one per column
+        """
+        self.headers = [str(header).translate(CONTROL_ESCAPES) for header in headers]
+        self.rows = rows
+        self.widths = self.column_widths()
+
+    def column_widths(self):
+        """
+        Size each column for its header and the longest value of the sample
+
+        Returns:
+            list: Width of each column in terminal columns
+        """
+        step = max(1, len(self.rows) // PlainTable.SAMPLE_ROWS)
+        sample = [self.cells(row) for row in self.rows[::step]]
+        widths = [text_width(header) for header in self.headers]
+        if sample:
+            # One pass per column over the transposed sample
+            for index, column in enumerate(zip(*sample)):
+                widths[index] = max(widths[index], max(map(text_width, column)))
+        return [min(max(width, 1), PlainTable.MAX_COLUMN_WIDTH) for width in widths]
+
+    def cells(self, row):
+        """
+        Convert the values of a row to strings on one line, one per column
+        """
+        cells = [
+            NULL if value is None else str(value).translate(CONTROL_ESCAPES)
+            for value in row
+        ]
+        if len(cells) < len(self.headers):
+            cells.extend([NULL] * (len(self.headers) - len(cells)))
+        return cells[: len(self.headers)]
+
+    def border(self, left, middle, right, fill):
+        """
+        Build a horizontal border line
+        """
+        return left + middle.join(fill * (width + 2) for width in self.widths) + right
+
+    def header_lines(self):
+        """
+        Build the top border, the column names and the line under them
+
+        Returns:
+            list: Lines of the header, without line breaks
+        """
+        return [
+            self.border("┏", "┳", "┓", "━"),
+            self.join(self.headers, "┃"),
+            self.border("┡", "╇", "┩", "━"),
+        ]
+
+    def line(self, row):
+        """
+        Format one row of the table, without a line break
+        """
+        return self.join(self.cells(row), "│")
+
+    def join(self, cells, separator):
+        """
+        Fit the cells to their columns and join them between separators
+        """
+        fitted = (fit(cell, width) for cell, width in zip(cells, self.widths))
+        return f"{separator} " + f" {separator} ".join(fitted) + f" {separator}"
+
+    def lines(self):
+        """
+        Generate the lines of the table, from the header to the bottom border
+
+        Yields:
+            str: One line of the table, without a line break
+        """
+        yield from self.header_lines()
+        for row in self.rows:
+            yield self.line(row)
+        yield self.border("└", "┴", "┘", "─")
+
+    def write(self, stream=None):
+        """
+        Write the table to a stream in chunks of lines
+
+        Args:
+            stream: Text stream to write to (default: sys.stdout)
+        """
+        write_lines(self.lines(), stream)
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+
+class VerticalRecords:
+    """
+    Class for rendering a result one record at a time, one line per field
+    """
+
+    def __init__(self, headers, rows):
+        """
+        Initialize VerticalRecords instance
+
+        Args:
+            headers: Field names
+            rows: Lists of values, one per field
+        """
+        self.headers = [str(header) for header in headers]
+        self.rows = rows
+        self.name_width = max((len(header) for header in self.headers), default=0)
+        # Continuation lines of multi-line values line up under the value
+        self.indent = " " * self.name_width + " │ "
+
+    def record_lines(self, index, row):
+        """
+        Format one record, from its title to its last field
+
+        Args:
+            index: Position of the record in the result, from 0
+            row: Values of the record, one per field
+
+        Returns:
+            list: Lines of the record, without line breaks
+        """
+        title = f"─[ RECORD {index + 1} ]"
+        lines = [title + "─" * max(0, self.name_width + 3 - len(title))]
+        for field_index, name in enumerate(self.headers):
+            value = row[field_index] if field_index < len(row) else None
+            text = NULL if value is None else str(value)
+            first, *rest = text.split("\n")
+            lines.append(f"{name:<{self.name_width}} │ {first}")
+            lines.extend(self.indent + line for line in rest)
+        return lines
+
+    def lines(self):
+        """
+        Generate the lines of every record, formatting one record at a time
+
+        Yields:
+            str: One line of a record, without a line break
+        """
+        for index, row in enumerate(self.rows):
+            yield from self.record_lines(index, row)
+
+    def write(self, stream=None):
+        """
+        Write the records to a stream as they are formatted
+
+        Args:
+            stream: Text stream to write to (default: sys.stdout)
+        """
+        write_lines(self.lines(), stream)
+
+    def __str__(self):
+        return "\n".join(self.lines())
@@ -0,0 +1,398 @@
+"""
+Result Browser
+
+This module provides a full-screen viewer for large results. The rows stay in the
+ResultSet decoded from the SQL library and only the lines on screen are formatted,
+so a result opens instantly whatever its size. The viewer scrolls across wide
+schemas, jumps to a row and searches incrementally.
+"""
+
+from prompt_toolkit.application import Application, get_app
+from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.layout import HSplit, Layout, Window
+from prompt_toolkit.layout.containers import ConditionalContainer
+from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+from prompt_toolkit.styles import Style
+from .renderers import PlainTable
+from .result_set import ResultSet
+
+# Lines of the screen used by the column names and the status bar
+HEADER_LINES = 3
+STATUS_LINES = 1
+
+BROWSER_STYLE = Style.from_dict(
+    {
+        "header": "bold ansigreen",
+        "cursor": "reverse",
+        "status": "bg:ansibrightblack ansiwhite",
+        "prompt": "bold ansiyellow",
+    }
+)
+
+HELP = "↑↓ PgUp PgDn g G rows | ←→ columns | :n jump | /text search, n N next | q quit"
+
+
+class ResultBrowser:
+    """
+    Class for browsing a result one screen at a time
+    """
+
+    def __init__(self, headers, rows, title=""):
+        """
+        Initialize ResultBrowser instance
+
+        Args:
+            headers: Column names
+            rows: Sequence of rows, such as a ResultSet
+            title: Text shown in the status bar, such as the query
+        """
+        self.table = PlainTable(headers, rows)
+        self.rows = rows
+        self.title = " ".join(str(title).split())
+
+        # Row under the cursor, first row and first character on screen
+        self.cursor = 0
+        self.top = 0
+        self.left = 0
+
+        # Input mode: None, "jump" or "search"
+        self.mode = None
+        self.search_text = ""
+        self.search_origin = 0
+        self.message = ""
+
+        # Lowered text of each row, built as rows are searched
+        self.row_texts = None
+
+        # Start of each column within a line, for horizontal scrolling
+        self.column_offsets = []
+        offset = 0
+        for width in self.table.widths:
+            self.column_offsets.append(offset)
+            offset += width + 3
+
+    @staticmethod
+    def from_result(result, title=""):
+        """
+        Create a browser for a result of the SQL library in table format
+
+        Args:
+            result: JSON result string from Java in JDBC format, or its ResultSet
+            title: Text shown in the status bar, such as the query
+
+        Returns:
+            ResultBrowser: Browser for the rows, None if the result is not a table
+        """
+        if not isinstance(result, ResultSet):
+            try:
+                result = ResultSet.from_json(result)
+            except (TypeError, ValueError):
+                return None
+        if result is None:
+            return None
+        return ResultBrowser(result.names, result, title)
+
+    def page_size(self, height=None):
+        """
+        Number of rows that fit on the screen
+
+        Args:
+            height: Height of the screen (default: height of the terminal)
+        """
+        if height is None:
+            height = get_app().output.get_size().rows
+        used = HEADER_LINES + STATUS_LINES + (1 if self.mode else 0)
+        return max(1, height - used)
+
+    def move_to(self, row, height=None):
+        """
+        Put the cursor on a row, scrolling just enough to keep it on screen
+
+        Args:
+            row: Index of the row, clamped to the result
+            height: Height of the screen (default: height of the terminal)
+        """
+        if not self.rows:
+            return
+        self.cursor = min(max(row, 0), len(self.rows) - 1)
+        page = self.page_size(height)
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + page:
+            self.top = self.cursor - page + 1
+
+    def scroll_columns(self, step):
+        """
+        Scroll horizontally to the start of the next or previous column
+
+        Args:
+            step: 1 to scroll right, -1 to scroll left
+        """
+        if step > 0:
+            following = [o for o in self.column_offsets if o > self.left]
+            if following:
+                self.left = following[0]
+        else:
+            preceding = [o for o in self.column_offsets if o < self.left]
+            self.left = preceding[-1] if preceding else 0
+
+    def jump(self, text, height=None):
+        """
+        Move the cursor to a row number typed by the user, counted from 1
+
+        Returns:
+            bool: True if the row number was valid, False otherwise
+        """
+        text = text.strip()
+        if not text.isdigit() or not self.rows:
+            self.message = f"Not a row number: {text}"
+            return False
+        self.move_to(int(text) - 1, height)
+        self.message = ""
+        return True
+
+    def row_matches(self, index, text):
+        """
+        Whether a value of the row contains the text, ignoring case
+        """
+        # Searching on every keystroke formats each row once, not once per search
+        if self.row_texts is None:
+            self.row_texts = [None] * len(self.rows)
+        row_text = self.row_texts[index]
+        if row_text is None:
+            row_text = "\t".join(self.table.cells(self.rows[index])).lower()
+            self.row_texts[index] = row_text
+        return text in row_text
+
+    def find(self, text, start, step=1):
+        """
+        Find the next row containing the text, wrapping around the result
+
+        Args:
+            text: Text to search for, ignoring case
+            start: Index of the first row to look at
+            step: 1 to search forward, -1 to search backward
+
+        Returns:
+            int: Index of the matching row, None if no row matches
+        """
+        text = text.lower()
+        count = len(self.rows)
+        if not text or not count:
+            return None
+        for distance in range(count):
+            index = (start + step * distance) % count
+            if self.row_matches(index, text):
+                return index
+        return None
+
+    def search(self, text, height=None):
+        """
+        Move to the first match of the text from where the search started, called
+        for every character typed
+        """
+        self.search_text = text
+        index = self.find(text, self.search_origin)
+        if index is None:
+            self.message = f"Not found: {text}" if text else ""
+            self.move_to(self.search_origin, height)
+        else:
+            self.message = ""
+            self.move_to(index, height)
+
+    def search_next(self, step, height=None):
+        """
+        Move to the next (1) or previous (-1) match of the last search
+        """
+        index = self.find(self.search_text, self.cursor + step, step)
+        if index is None:
+            self.message = f"Not found: {self.search_text}"
+        else:
+            self.message = ""
+            self.move_to(index, height)
+
+    def visible_lines(self, height=None, width=None):
+        """
+        Format the rows on screen, cut to the screen width
+
+        Args:
+            height: Height of the screen (default: height of the terminal)
+            width: Width of the screen (default: width of the terminal)
+
+        Returns:
+            list: (style, text) fragments for the body of the screen
+        """
+        if width is None:
+            width = get_app().output.get_size().columns
+        fragments = []
+        end = min(len(self.rows), self.top + self.page_size(height))
+        for index in range(self.top, end):
+            if fragments:
+                fragments.append(("", "\n"))
+            line = self.table.line(self.rows[index])[self.left : self.left + width]
+            fragments.append(("class:cursor" if index == self.cursor else "", line))
+        return fragments
+
+    def header_text(self):
+        """
+        Column names, scrolled like the rows
+        """
+        width = get_app().output.get_size().columns
+        lines = [
+            line[self.left : self.left + width] for line in self.table.header_lines()
+        ]
+        return [("class:header", "\n".join(lines))]
+
+    def status_text(self):
+        """
+        Position in the result, the last message and the keys
+        """
+        position = f" Row {self.cursor + 1 if self.rows else 0:,}/{len(self.rows):,}"
+        detail = self.message or HELP
+        title = f" | {self.title}" if self.title else ""
+        return [("class:status", f"{position} | {detail}{title}")]
+
+    def create_application(self):
+        """
+        Build the full-screen application
+
+        Returns:
+            Application: Viewer to run, returns when the user quits
+        """
+        navigating = Condition(lambda: self.mode is None)
+        typing = Condition(lambda: self.mode is not None)
+
+        input_buffer = Buffer(multiline=False)
+        input_buffer.on_text_changed += lambda buffer: (
+            self.search(buffer.text) if self.mode == "search" else None
+        )
+        body = Window(
+            FormattedTextControl(self.visible_lines, focusable=True),
+            wrap_lines=False,
+        )
+        prompt = Window(
+            BufferControl(input_buffer),
+            height=1,
+            get_line_prefix=lambda line, wrap: [
+                ("class:prompt", "/" if self.mode == "search" else ":")
+            ],
+        )
+        layout = Layout(
+            HSplit(
+                [
+                    Window(
+                        FormattedTextControl(self.header_text),
+                        height=HEADER_LINES,
+                        wrap_lines=False,
+                    ),
+                    body,
+                    ConditionalContainer(prompt, filter=typing),
+                    Window(
+                        FormattedTextControl(self.status_text),
+                        height=STATUS_LINES,
+                        style="class:status",
+                    ),
+                ]
+            ),
+            focused_element=body,
+        )
+
+        bindings = KeyBindings()
+
+        def handle(*keys, filter=navigating):
+            return bindings.add(*keys, filter=filter)
+
+        @handle("up")
+        @handle("k")
+        def _(event):
+            self.move_to(self.cursor - 1)
+
+        @handle("down")
+        @handle("j")
+        def _(event):
+            self.move_to(self.cursor + 1)
+
+        @handle("pageup")
+        def _(event):
+            self.top = max(0, self.top - self.page_size())
+            self.move_to(self.cursor - self.page_size())
+
+        @handle("pagedown")
+        @handle("space")
+        def _(event):
+            self.top = max(0, min(self.top + self.page_size(), len(self.rows) - 1))
+            self.move_to(self.cursor + self.page_size())
+
+        @handle("home")
+        @handle("g")
+        def _(event):
+            self.move_to(0)
+
+        @handle("end")
+        @handle("G")
+        def _(event):
+            self.move_to(len(self.rows) - 1)
+
+        @handle("left")
+        @handle("h")
+        def _(event):
+            self.scroll_columns(-1)
+
+        @handle("right")
+        @handle("l")
+        def _(event):
+            self.scroll_columns(1)
+
+        @handle(":")
+        @handle("/")
+        def _(event):
+            self.mode = "search" if event.data == "/" else "jump"
+            self.search_origin = self.cursor
+            self.message = ""
+            input_buffer.reset()
+            event.app.layout.focus(prompt)
+
+        @handle("n")
+        def _(event):
+            self.search_next(1)
+
+        @handle("N")
+        def _(event):
+            self.search_next(-1)
+
+        @handle("enter", filter=typing)
+        def _(event):
+            if self.mode == "jump":
+                self.jump(input_buffer.text)
+            self.mode = None
+            event.app.layout.focus(body)
+
+        @handle("escape", filter=typing)
+        def _(event):
+            if self.mode == "search":
+                self.move_to(self.search_origin)
+                self.search_text = ""
+            self.mode = None
+            self.message = ""
+            event.app.layout.focus(body)
+
+        @handle("q")
+        @handle("escape")
+        @bindings.add("c-c")
+        def _(event):
+            event.app.exit()
+
+        return Application(
+            layout=layout,
+            key_bindings=bindings,
+            style=BROWSER_STYLE,
+            full_screen=True,
+        )
+
+    def run(self):
+        """
+        Show the result until the user quits
+        """
+        self.create_application().run()
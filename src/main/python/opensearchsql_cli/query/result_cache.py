@@ -0,0 +1,341 @@
+"""
+Result Cache
+
+This module keeps the results of recent queries so that running a query again, or
+loading a saved query, does not go back to the cluster. Results are keyed by the
+normalized query text, language, format, SQL plugin version and cluster URL. The
+memory tier is a least recently used cache bounded in size, the optional disk tier
+keeps zlib-compressed results across sessions. Each tier has its own time to live.
+Only read-only statements are cached, so running a statement that writes always
+reaches the cluster.
+"""
+
+import os
+import re
+import sys
+import time
+import zlib
+import hashlib
+from collections import OrderedDict
+from rich.console import Console
+
+# Create a console instance for rich formatting
+console = Console()
+
+# Statements whose results can be served again, by language
+READ_ONLY = {
+    "SQL": re.compile(r"^\s*(select|show|describe|desc|explain)\b", re.IGNORECASE),
+    "PPL": re.compile(r"^\s*(source|search|describe|show|explain)\b", re.IGNORECASE),
+}
+
+
+class ResultCache:
+    """
+    Class for caching query results in memory and on disk
+    """
+
+    DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+    DEFAULT_MEMORY_TTL = 300
+    DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+    DEFAULT_DISK_TTL = 3600
+
+    def __init__(
+        self,
+        cluster="",
+        version="",
+        memory_bytes=DEFAULT_MEMORY_BYTES,
+        memory_ttl=DEFAULT_MEMORY_TTL,
+        disk_path=None,
+        disk_bytes=DEFAULT_DISK_BYTES,
+        disk_ttl=DEFAULT_DISK_TTL,
+    ):
+        """
+        Initialize ResultCache instance
+
+        Args:
+            cluster: URL of the cluster the results come from
+            version: SQL plugin version that produced the results
+            memory_bytes: Size of the results kept in memory
+            memory_ttl: Seconds a result is served from memory
+            disk_path: Directory of the disk tier, None to keep results in memory only
+            disk_bytes: Size of the compressed results kept on disk
+            disk_ttl: Seconds a result is served from disk
+        """
+        self.cluster = cluster or ""
+        self.version = version or ""
+        self.memory_bytes = memory_bytes
+        self.memory_ttl = memory_ttl
+        self.disk_path = disk_path
+        self.disk_bytes = disk_bytes
+        self.disk_ttl = disk_ttl
+        self.enabled = True
+
+        # key -> (created, value, cost), least recently used first
+        self.entries = OrderedDict()
+        self.size = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, query, is_ppl_mode, format):
+        """
+        Build the cache key of a query
+
+        Args:
+            query: Query text, whitespace and a trailing semicolon are ignored
+            is_ppl_mode: Whether the query is PPL (True) or SQL (False)
+            format: Output format
+
+        Returns:
+            tuple: Key identifying the result
+        """
+        normalized = " ".join(query.split()).rstrip(";").rstrip()
+        language = "PPL" if is_ppl_mode else "SQL"
+        return (normalized, language, format.lower(), self.version, self.cluster)
+
+    def cacheable(self, query, is_ppl_mode):
+        """
+        Whether the result of a query may be cached, only read-only statements
+        such as SELECT or a PPL source query are
+
+        Args:
+            query: Query text
+            is_ppl_mode: Whether the query is PPL (True) or SQL (False)
+
+        Returns:
+            bool: True if the query does not write
+        """
+        return bool(READ_ONLY["PPL" if is_ppl_mode else "SQL"].match(query))
+
+    def get(self, key):
+        """
+        Look up a result, first in memory, then on disk
+
+        Args:
+            key: Key from key()
+
+        Returns:
+            tuple: (value, age in seconds), or (None, None) on a miss
+        """
+        if not self.enabled:
+            return None, None
+        now = time.time()
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            created, value, cost = entry
+            if now - created <= self.memory_ttl:
+                self.entries.move_to_end(key)
+                self.memory_hits += 1
+                return value, now - created
+            self.evict(key)
+
+        result, created = self.read_disk(key, now)
+        if result is not None:
+            self.disk_hits += 1
+            self.store(key, result, created)
+            return result, now - created
+
+        self.misses += 1
+        return None, None
+
+    def put(self, key, value, persist=True):
+        """
+        Cache the result of a query
+
+        Args:
+            key: Key from key()
+            value: Result string from the SQL library, or its decoded ResultSet
+            persist: Whether to also write a result string to the disk tier
+        """
+        if not self.enabled:
+            return
+        existing = self.entries.get(key)
+        if isinstance(value, str):
+            self.store(key, value, time.time())
+            if persist:
+                self.write_disk(key, value)
+        elif existing is not None:
+            # A decoded result replaces its string, keeping its age
+            self.store(key, value, existing[0])
+
+    def cost(self, value):
+        """
+        Approximate memory size of a result string or decoded ResultSet in bytes
+        """
+        if isinstance(value, str):
+            return len(value)
+        return sum(
+            sys.getsizeof(column) + sum(sys.getsizeof(item) for item in column)
+            for column in value.columns
+        )
+
+    def store(self, key, value, created):
+        """
+        Add a result to the memory tier, evicting the least recently used
+        """
+        cost = self.cost(value)
+        if cost > self.memory_bytes:
+            return
+        self.evict(key)
+        self.entries[key] = (created, value, cost)
+        self.size += cost
+        while self.size > self.memory_bytes:
+            self.evict(next(iter(self.entries)))
+
+    def evict(self, key):
+        """
+        Remove a result from the memory tier
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def disk_file(self, key):
+        """
+        Path of the disk tier file of a key
+        """
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_path, f"{digest}.zz")
+
+    def read_disk(self, key, now):
+        """
+        Read a result from the disk tier, removing it once expired
+
+        Returns:
+            tuple: (result string, creation time), or (None, None)
+        """
+        if not self.disk_path:
+            return None, None
+        path = self.disk_file(key)
+        try:
+            created = os.path.getmtime(path)
+            if now - created > self.disk_ttl:
+                os.remove(path)
+                return None, None
+            with open(path, "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8"), created
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None, None
+
+    def write_disk(self, key, result):
+        """
+        Write a compressed result to the disk tier, removing the oldest files
+        beyond its size
+        """
+        if not self.disk_path:
+            return
+        try:
+            os.makedirs(self.disk_path, exist_ok=True)
+            data = zlib.compress(result.encode("utf-8"), 6)
+            if len(data) > self.disk_bytes:
+                return
+            path = self.disk_file(key)
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            self.trim_disk()
+        except OSError:
+            pass
+
+    def disk_files(self):
+        """
+        Files of the disk tier, oldest first
+
+        Returns:
+            list: (modification time, size, path) tuples
+        """
+        if not self.disk_path or not os.path.isdir(self.disk_path):
+            return []
+        files = []
+        for name in os.listdir(self.disk_path):
+            if name.endswith(".zz"):
+                path = os.path.join(self.disk_path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return sorted(files)
+
+    def trim_disk(self):
+        """
+        Remove the oldest files of the disk tier until it fits its size
+        """
+        files = self.disk_files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+    def clear(self):
+        """
+        Remove every cached result, in memory and on disk
+        """
+        self.entries.clear()
+        self.size = 0
+        for _, _, path in self.disk_files():
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+    def stats(self):
+        """
+        Hit and miss counters of the session and the size of each tier
+
+        Returns:
+            dict: Counters and sizes
+        """
+        files = self.disk_files()
+        return {
+            "enabled": self.enabled,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.entries),
+            "memory_bytes": self.size,
+            "disk_entries": len(files),
+            "disk_bytes": sum(size for _, size, _ in files),
+        }
+
+    def display_stats(self, print_function=None):
+        """
+        Display whether the cache is on, its hits and misses and its size
+        """
+        if print_function is None:
+            print_function = console.print
+
+        stats = self.stats()
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        rate = f" ({hits / lookups:.0%})" if lookups else ""
+        print_function(
+            f"[green]\nResult cache:[/green] "
+            f"{'[green]ON[/green]' if stats['enabled'] else '[red]OFF[/red]'}"
+        )
+        print_function(
+            f"[green]Hits:[/green] [dim white]{hits}{rate}, "
+            f"{stats['memory_hits']} from memory, {stats['disk_hits']} from disk"
+            f"[/dim white]"
+        )
+        print_function(
+            f"[green]Misses:[/green] [dim white]{stats['misses']}[/dim white]"
+        )
+        print_function(
+            f"[green]Memory:[/green] [dim white]{stats['memory_entries']} results, "
+            f"{stats['memory_bytes'] / 1024 / 1024:.1f} MiB, "
+            f"TTL {int(self.memory_ttl)}s[/dim white]"
+        )
+        if self.disk_path:
+            print_function(
+                f"[green]Disk:[/green] [dim white]{stats['disk_entries']} results, "
+                f"{stats['disk_bytes'] / 1024 / 1024:.1f} MiB compressed, "
+                f"TTL {int(self.disk_ttl)}s[/dim white]"
+            )
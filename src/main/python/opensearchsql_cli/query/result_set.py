@@ -0,0 +1,337 @@
+"""
+Result Set
+
+This module provides the decoded form of a table result, shared by the renderers and
+the result browser. The JDBC JSON of the SQL library is decoded once into one column
+per field: numeric columns go to typed arrays, repetitive string columns share their
+values, and the row lists are dropped once decoded. A result set does not depend on
+the format it was fetched in and can be written again as JSON or CSV.
+
+Sorting, filtering and projecting a result set work a column at a time and return a
+new result set, the original is left as it is for further refinements.
+"""
+
+import io
+import csv
+import json
+import operator
+from array import array
+from itertools import compress, repeat
+from .decoding import FLOAT_TYPES, INTEGER_TYPES, decode_columns, loads, paused_gc
+
+# Operators of where(), ~ keeps the values containing the text, ignoring case
+OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "~": lambda value, text: text in str(value).lower(),
+}
+
+
+class ResultSet:
+    """
+    Class for storing a table result column by column
+    """
+
+    __slots__ = ("names", "types", "columns", "total", "size")
+
+    def __init__(self, names, types, columns, total=None, size=None):
+        """
+        Initialize ResultSet instance
+
+        Args:
+            names: Field names, aliases first
+            types: Field types reported by the SQL library
+            columns: Values of each field, all of the same length
+            total: Total hits reported in the result
+            size: Rows fetched reported in the result
+        """
+        self.names = names
+        self.types = types
+        self.columns = columns
+        self.total = total
+        self.size = size
+
+    @staticmethod
+    def from_json(result):
+        """
+        Decode a result of the SQL library in JDBC format
+
+        Args:
+            result: JSON result string with schema and datarows
+
+        Returns:
+            ResultSet: Decoded result, None if the JSON is not a table result
+
+        Raises:
+            json.JSONDecodeError: If the result is not valid JSON
+        """
+        with paused_gc():
+            data = loads(result)
+            if not isinstance(data, dict) or "schema" not in data:
+                return None
+            if "datarows" not in data:
+                return None
+            schema = data["schema"]
+            datarows = data.pop("datarows")
+            size = data.get("size", len(datarows))
+            columns = decode_columns(schema, datarows)
+        names = [field.get("alias", field["name"]) for field in schema]
+        types = [str(field.get("type", "")).lower() for field in schema]
+        return ResultSet(names, types, columns, data.get("total"), size)
+
+    @staticmethod
+    def from_csv(result):
+        """
+        Decode a result of the SQL library in CSV format
+
+        CSV does not carry the field types, every value is read back as a string
+        and empty values as nulls.
+
+        Args:
+            result: CSV result string, field names on the first line
+
+        Returns:
+            ResultSet: Decoded result, None if the CSV has no header
+        """
+        reader = csv.reader(io.StringIO(result))
+        names = next(reader, None)
+        if not names:
+            return None
+        datarows = [[value if value != "" else None for value in row] for row in reader]
+        columns = decode_columns([{} for _ in names], datarows)
+        size = len(columns[0])
+        return ResultSet(names, ["string"] * len(names), columns, size, size)
+
+    @staticmethod
+    def parse(result, format):
+        """
+        Decode a result of the SQL library in the format it was fetched in
+
+        Args:
+            result: Result string in table (JDBC), JSON or CSV format
+            format: Format of the result
+
+        Returns:
+            ResultSet: Decoded result, None if the result is not tabular
+        """
+        try:
+            if format.lower() == "csv":
+                return ResultSet.from_csv(result)
+            return ResultSet.from_json(result)
+        except (TypeError, ValueError, csv.Error):
+            return None
+
+    def to_json(self):
+        """
+        Write the result like the JSON format of the SQL library
+
+        Returns:
+            str: Indented JSON with schema, datarows, total and size
+        """
+        data = {
+            "schema": [
+                {"name": name, "type": field_type}
+                for name, field_type in zip(self.names, self.types)
+            ],
+            "datarows": [list(row) for row in self],
+            "total": self.total if self.total is not None else len(self),
+            "size": self.size if self.size is not None else len(self),
+        }
+        return json.dumps(data, indent=2, ensure_ascii=False)
+
+    def to_csv(self):
+        """
+        Write the result like the CSV format of the SQL library
+
+        Returns:
+            str: Field names on the first line, then one line per row, nulls empty
+        """
+        stream = io.StringIO()
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(self.names)
+        for row in self:
+            writer.writerow("" if value is None else value for value in row)
+        return stream.getvalue().rstrip("\n")
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index):
+        """
+        Row at an index, or the rows of a slice, as lists of values
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return [column[index] for column in self.columns]
+
+    def __iter__(self):
+        """
+        Iterate over the rows as tuples of values
+        """
+        return zip(*self.columns)
+
+    def column_index(self, name):
+        """
+        Position of a column, matching its name exactly first, then ignoring case
+
+        Raises:
+            ValueError: If no column has this name
+        """
+        if name in self.names:
+            return self.names.index(name)
+        lowered = [column_name.lower() for column_name in self.names]
+        if name.lower() in lowered:
+            return lowered.index(name.lower())
+        raise ValueError(f"Unknown column: {name}")
+
+    def take(self, indices, total=None):
+        """
+        Build a result set of the rows at some indices
+
+        Args:
+            indices: Row indices, in the order of the new result set
+            total: Total hits of the new result set (default: its number of rows)
+
+        Returns:
+            ResultSet: New result set, typed arrays stay typed arrays
+        """
+        columns = []
+        for column in self.columns:
+            values = map(column.__getitem__, indices)
+            if isinstance(column, array):
+                columns.append(array(column.typecode, values))
+            else:
+                columns.append(list(values))
+        size = len(indices)
+        return ResultSet(
+            self.names, self.types, columns, size if total is None else total, size
+        )
+
+    def select(self, names):
+        """
+        Keep some columns, in the given order, sharing their values
+
+        Args:
+            names: Column names
+
+        Returns:
+            ResultSet: New result set with these columns only
+
+        Raises:
+            ValueError: If a column does not exist
+        """
+        indices = [self.column_index(name) for name in names]
+        return ResultSet(
+            [self.names[index] for index in indices],
+            [self.types[index] for index in indices],
+            [self.columns[index] for index in indices],
+            self.total,
+            self.size,
+        )
+
+    def sort(self, name, descending=False):
+        """
+        Sort the rows by a column, nulls last
+
+        Args:
+            name: Column name
+            descending: Whether to sort from the largest value
+
+        Returns:
+            ResultSet: New result set with the sorted rows
+
+        Raises:
+            ValueError: If the column does not exist
+        """
+        column = self.columns[self.column_index(name)]
+        present = rows = range(len(self))
+        nulls = []
+        if not isinstance(column, array):
+            nulls = list(compress(rows, map(operator.is_, column, repeat(None))))
+            if nulls:
+                present = list(
+                    compress(rows, map(operator.is_not, column, repeat(None)))
+                )
+        try:
+            order = sorted(present, key=column.__getitem__, reverse=descending)
+        except TypeError:
+            # Values of mixed types are sorted by their text
+            order = sorted(
+                present, key=lambda index: str(column[index]), reverse=descending
+            )
+        return self.take(order + nulls, self.total)
+
+    def where(self, name, op, value):
+        """
+        Keep the rows where a column compares to a value
+
+        Args:
+            name: Column name
+            op: One of =, !=, <, <=, >, >= and ~ (contains, ignoring case)
+            value: Value as typed by the user, converted to the type of the column,
+                null matches the nulls with = and !=
+
+        Returns:
+            ResultSet: New result set with the matching rows
+
+        Raises:
+            ValueError: If the column or the operator does not exist, or the value
+                does not convert to the type of the column
+        """
+        index = self.column_index(name)
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}, use {' '.join(OPERATORS)}")
+        column = self.columns[index]
+        compare = OPERATORS[op]
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+
+        if value.lower() == "null" and op in ("=", "!="):
+            mask = map(compare, column, repeat(None))
+        else:
+            value = self.convert(value, self.types[index], op)
+            if isinstance(column, array):
+                # Typed arrays have no null, the comparison runs in C
+                mask = map(compare, column, repeat(value))
+            else:
+                mask = (
+                    item is not None and self.matches(compare, item, value)
+                    for item in column
+                )
+        indices = list(compress(range(len(self)), mask))
+        return self.take(indices)
+
+    @staticmethod
+    def convert(value, field_type, op):
+        """
+        Convert a value typed by the user to the type of a column
+        """
+        if op == "~":
+            return value.lower()
+        try:
+            if field_type in INTEGER_TYPES and value.lstrip("+-").isdigit():
+                return int(value)
+            if field_type in INTEGER_TYPES or field_type in FLOAT_TYPES:
+                return float(value)
+        except ValueError:
+            raise ValueError(f"Not a number: {value}") from None
+        if field_type == "boolean":
+            if value.lower() not in ("true", "false"):
+                raise ValueError(f"Not a boolean: {value}, use true or false")
+            return value.lower() == "true"
+        return value
+
+    @staticmethod
+    def matches(compare, item, value):
+        """
+        Compare a value of a list column, by its text when the types differ
+        """
+        try:
+            return compare(item, value)
+        except TypeError:
+            return compare(str(item), str(value))
@@ -271,7 +271,16 @@ class SavedQueries:
             # Save new query
             return self.save_query(name, latest_query, language_mode)
 
-    def loading_query(self, name, connection, format="table", is_vertical=False):
+    def loading_query(
+        self,
+        name,
+        connection,
+        format="table",
+        is_vertical=False,
+        result_cache=None,
+        output=None,
+        highlight=False,
+    ):
         """
         Load and execute a saved query
 
@@ -280,6 +289,9 @@ class SavedQueries:
             connection: Connection object to execute the query
             format: Output format (json, table, csv)
             is_vertical: Whether to display results in vertical format
+            result_cache: Optional ResultCache to serve the result from
+            output: Binary stream for JSON and CSV results (default: stdout)
+            highlight: Whether to highlight JSON and CSV results written to a terminal
 
         Returns:
             bool: True if successful, False otherwise
@@ -305,6 +317,9 @@ class SavedQueries:
                 format,
                 is_vertical,
                 console.print,
+                result_cache=result_cache,
+                output=output,
+                highlight=highlight,
             )
             return success, query, formatted_result, language
 
@@ -0,0 +1,144 @@
+"""
+Session Statistics
+
+This module displays the HTTP metrics recorded by the SQL library: totals for the
+session and a breakdown of the most recent queries. They show whether a slow query
+spent its time on many round trips, large responses, new connections or the cluster.
+"""
+
+from rich.console import Console
+from rich.table import Table
+from rich.box import HEAVY_HEAD
+from rich.markup import escape
+
+# Create a console instance for rich formatting
+console = Console()
+
+
+class SessionStats:
+    """
+    Class for displaying the HTTP metrics of the session and its queries
+    """
+
+    # Longest query text shown in the per-query breakdown
+    QUERY_WIDTH = 40
+
+    @staticmethod
+    def format_bytes(size):
+        """
+        Format a byte count with a binary unit
+
+        Args:
+            size: Number of bytes
+
+        Returns:
+            str: Size such as 512 B, 1.5 KiB or 3.2 MiB
+        """
+        size = float(size or 0)
+        for unit in ("B", "KiB", "MiB", "GiB"):
+            if size < 1024 or unit == "GiB":
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+
+    @staticmethod
+    def average_latency(metrics):
+        """
+        Average latency of the requests in milliseconds, 0 without requests
+        """
+        requests = metrics.get("requests", 0)
+        return metrics.get("total_latency_ms", 0) / requests if requests else 0
+
+    @staticmethod
+    def session_table(session):
+        """
+        Build the table of the session totals
+
+        Args:
+            session: Session metrics dictionary from the SQL library
+
+        Returns:
+            Table: One row per metric
+        """
+        table = Table(box=HEAVY_HEAD, show_header=False)
+        table.add_column("Metric", style="green")
+        table.add_column("Value", style="dim white", justify="right")
+        table.add_row("Requests", f"{session.get('requests', 0):,}")
+        table.add_row("Sent", SessionStats.format_bytes(session.get("request_bytes")))
+        table.add_row(
+            "Received", SessionStats.format_bytes(session.get("response_bytes"))
+        )
+        table.add_row(
+            "Average latency", f"{SessionStats.average_latency(session):,.1f} ms"
+        )
+        table.add_row("Max latency", f"{session.get('max_latency_ms', 0):,.1f} ms")
+        table.add_row("New connections", f"{session.get('new_connections', 0):,}")
+        table.add_row("TLS handshakes", f"{session.get('tls_handshakes', 0):,}")
+        table.add_row("Reused connections", f"{session.get('reused_connections', 0):,}")
+        return table
+
+    @staticmethod
+    def queries_table(queries):
+        """
+        Build the per-query breakdown
+
+        Args:
+            queries: Query metrics dictionaries from the SQL library, newest first
+
+        Returns:
+            Table: One row per query
+        """
+        table = Table(box=HEAVY_HEAD)
+        table.add_column("Query", style="dim white", overflow="ellipsis", no_wrap=True)
+        table.add_column("Requests", justify="right")
+        table.add_column("Sent", justify="right")
+        table.add_column("Received", justify="right")
+        table.add_column("Avg ms", justify="right")
+        table.add_column("Max ms", justify="right")
+        table.add_column("New conn", justify="right")
+        table.add_column("TLS", justify="right")
+        table.add_column("Reused", justify="right")
+        for query in queries:
+            text = " ".join(str(query.get("query") or "").split())
+            if len(text) > SessionStats.QUERY_WIDTH:
+                text = text[: SessionStats.QUERY_WIDTH - 1] + "…"
+            table.add_row(
+                escape(text),
+                f"{query.get('requests', 0):,}",
+                SessionStats.format_bytes(query.get("request_bytes")),
+                SessionStats.format_bytes(query.get("response_bytes")),
+                f"{SessionStats.average_latency(query):,.1f}",
+                f"{query.get('max_latency_ms', 0):,.1f}",
+                f"{query.get('new_connections', 0):,}",
+                f"{query.get('tls_handshakes', 0):,}",
+                f"{query.get('reused_connections', 0):,}",
+            )
+        return table
+
+    @staticmethod
+    def display_stats(connection, print_function=None):
+        """
+        Display the HTTP metrics of the session and of its recent queries
+
+        Args:
+            connection: Connection object to get the metrics from
+            print_function: Function to use for printing (default: console.print)
+
+        Returns:
+            bool: True if the metrics were displayed, False otherwise
+        """
+        if print_function is None:
+            print_function = console.print
+
+        stats = connection.get_http_stats()
+        if not isinstance(stats, dict):
+            print_function("[red]\nSession stats are not available.[/red]")
+            return False
+
+        print_function("[green]\nSession:[/green]")
+        print_function(SessionStats.session_table(stats.get("session", {})))
+
+        queries = stats.get("queries", [])
+        if queries:
+            print_function("[green]Recent queries:[/green]")
+            print_function(SessionStats.queries_table(queries))
+        return True
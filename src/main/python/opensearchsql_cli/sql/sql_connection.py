@@ -5,6 +5,7 @@ Handles connection to SQL library and OpenSearch Cluster configuration.
 """
 
 from py4j.java_gateway import JavaGateway, GatewayParameters
+import json
 import sys
 from rich.console import Console
 from .sql_library_manager import sql_library_manager
@@ -253,6 +254,159 @@ class SqlConnection:
         result = query_service.queryExecution(query, is_ppl, format)
         return result
 
+    def cancel_query(self):
+        """
+        Cancel the cluster tasks of the query being executed, if any
+
+        Returns:
+            int: Number of tasks cancelled
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return 0
+
+        try:
+            return self.sql_lib.entry_point.cancelQuery()
+        except Exception as e:
+            self.error_message = f"Unable to cancel query: {str(e)}"
+            return 0
+
+    def get_retry_stats(self):
+        """
+        Get the retry counters of the SQL library's OpenSearch client
+
+        Returns:
+            dict: retries, recovered and exhausted calls of the session, and the
+            number of retries of the last query, or None if not connected
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return None
+
+        try:
+            return json.loads(self.sql_lib.entry_point.getRetryStats())
+        except Exception as e:
+            self.error_message = f"Unable to get retry stats: {str(e)}"
+            return None
+
+    def get_http_stats(self):
+        """
+        Get the HTTP metrics of the SQL library's OpenSearch client
+
+        Returns:
+            dict: session totals and the metrics of the most recent queries,
+            or None if not connected
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return None
+
+        try:
+            return json.loads(self.sql_lib.entry_point.getHttpStats())
+        except Exception as e:
+            self.error_message = f"Unable to get HTTP stats: {str(e)}"
+            return None
+
+    def get_last_query_info(self):
+        """
+        Get details of the last query executed by the SQL library
+
+        Returns:
+            dict: query_id, retries and, when reported by the cluster, total_hits
+            and total_hits_relation ("eq" or "gte"), or None if not connected
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return None
+
+        try:
+            return json.loads(self.sql_lib.entry_point.getLastQueryInfo())
+        except Exception as e:
+            self.error_message = f"Unable to get last query info: {str(e)}"
+            return None
+
+    def start_export(self, index, path, slices=0):
+        """
+        Start exporting every document of an index in the background
+
+        Args:
+            index: Name of the index to export
+            path: Absolute path of the output file
+            slices: Number of slices read concurrently, 0 for the configured default
+
+        Returns:
+            tuple: (success, error message)
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return False, "Not connected to SQL library"
+
+        try:
+            error = self.sql_lib.entry_point.startExport(index, path, slices)
+        except Exception as e:
+            return False, f"Unable to start export: {str(e)}"
+
+        return not error, error
+
+    def get_export_progress(self):
+        """
+        Get the progress of the last export
+
+        Returns:
+            dict: state, documents written overall and per slice, rows per second,
+            or None if not connected
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return None
+
+        try:
+            return json.loads(self.sql_lib.entry_point.getExportProgress())
+        except Exception as e:
+            self.error_message = f"Unable to get export progress: {str(e)}"
+            return None
+
+    def cancel_export(self):
+        """
+        Stop the running export, if any
+        """
+        if self.sql_connected and self.sql_lib:
+            try:
+                self.sql_lib.entry_point.cancelExport()
+            except Exception as e:
+                self.error_message = f"Unable to cancel export: {str(e)}"
+
+    def get_session_settings(self):
+        """
+        Get the search settings of the current session
+
+        Returns:
+            dict: setting names and values, or None if not connected
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return None
+
+        try:
+            return json.loads(self.sql_lib.entry_point.getSessionSettings())
+        except Exception as e:
+            self.error_message = f"Unable to get session settings: {str(e)}"
+            return None
+
+    def set_session_setting(self, key, value):
+        """
+        Change a search setting of the current session
+
+        Args:
+            key: Setting name, e.g. request_cache or preference
+            value: New value of the setting
+
+        Returns:
+            tuple: (success, error message)
+        """
+        if not self.sql_connected or not self.sql_lib:
+            return False, "Not connected to SQL library"
+
+        try:
+            error = self.sql_lib.entry_point.setSessionSetting(key, value)
+        except Exception as e:
+            return False, f"Unable to change session setting: {str(e)}"
+
+        return not error, error
+
 
 # Create a global connection instance
 sql_connection = SqlConnection()
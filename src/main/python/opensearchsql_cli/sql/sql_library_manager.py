@@ -13,6 +13,7 @@ import time
 import threading
 import socket
 from datetime import datetime
+from py4j.java_gateway import JavaGateway, GatewayParameters
 from .sql_version import sql_version
 
 
@@ -197,6 +198,23 @@ class SqlLibraryManager:
                 self.logger.error(error_msg)
             return False
 
+    def _shutdown_gateway(self):
+        """
+        Ask the Gateway server to stop its client thread pool and close its connections
+        before the process is terminated
+        """
+        try:
+            gateway = JavaGateway(
+                gateway_parameters=GatewayParameters(port=self.gateway_port)
+            )
+            try:
+                gateway.entry_point.shutdown()
+            finally:
+                gateway.close()
+        except Exception as e:
+            if hasattr(self, "logger"):
+                self.logger.warning(f"Unable to shut down Gateway server cleanly: {e}")
+
     def stop(self):
         """
         Clean up SQL Library resources
@@ -212,6 +230,8 @@ class SqlLibraryManager:
             self.thread_running = False
 
             if hasattr(self, "process") and self.process:
+                self._shutdown_gateway()
+
                 self.logger.info("Terminating Gateway server process")
 
                 if sys.platform.startswith("win"):
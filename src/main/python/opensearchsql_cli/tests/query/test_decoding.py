@@ -0,0 +1,79 @@
+"""
+Tests for Result Decoding.
+
+This module contains tests for the JSON backends and the schema-driven
+conversion of datarows into columns.
+"""
+
+import gc
+import json
+import pytest
+from array import array
+from opensearchsql_cli.query import decoding
+
+
+class TestDecoding:
+    """
+    Test class for the decoding functions.
+    """
+
+    @pytest.mark.parametrize("backend", ["json", "orjson", "msgspec"])
+    def test_loads(self, backend):
+        """Test that every backend decodes the same values and errors."""
+        if backend != "json":
+            pytest.importorskip(backend)
+
+        assert decoding.loads('{"a": [1, 2.5, "x", null]}', backend) == {
+            "a": [1, 2.5, "x", None]
+        }
+        with pytest.raises(json.JSONDecodeError):
+            decoding.loads("name,age", backend)
+
+    @pytest.mark.parametrize(
+        "field_type, values, expected_type",
+        [
+            ("long", [1, 2, 3], array),
+            ("long", [1, None, 3], list),
+            ("long", [1, 2**64], list),
+            ("integer", [1, 2.5], list),
+            ("double", [1.5, 2.25], array),
+            ("double", [1.5, 2], list),
+            ("keyword", ["a", "b"], list),
+        ],
+    )
+    def test_typed_column(self, field_type, values, expected_type):
+        """Test that only columns that keep their values become arrays."""
+        column = decoding.typed_column(list(values), field_type)
+
+        assert type(column) is expected_type
+        assert list(column) == values
+
+    def test_typed_column_low_cardinality(self):
+        """Test that repeated strings share one object."""
+        values = [json.loads('"GET"') for _ in range(10)] + [None]
+        assert values[0] is not values[1]
+
+        column = decoding.typed_column(values, "keyword")
+
+        assert all(value is column[0] for value in column[:10])
+        assert column[10] is None
+
+    def test_decode_columns(self):
+        """Test that rows are turned into columns and released."""
+        schema = [{"name": "a", "type": "long"}, {"name": "b", "type": "keyword"}]
+        datarows = [[1, "x"], [2]]
+
+        columns = decoding.decode_columns(schema, datarows)
+
+        assert columns == [array("q", [1, 2]), ["x", None]]
+        assert datarows == []
+        assert decoding.decode_columns(schema, []) == [[], []]
+
+    def test_paused_gc(self):
+        """Test that the garbage collector is paused and restored."""
+        assert gc.isenabled()
+        with pytest.raises(ValueError):
+            with decoding.paused_gc():
+                assert not gc.isenabled()
+                raise ValueError()
+        assert gc.isenabled()
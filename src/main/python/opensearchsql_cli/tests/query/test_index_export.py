@@ -0,0 +1,127 @@
+"""
+Tests for Index Export.
+
+This module contains tests for the IndexExport class that runs sliced
+index exports through the SQL library.
+"""
+
+import signal
+import pytest
+from unittest.mock import patch, MagicMock
+from opensearchsql_cli.query.index_export import IndexExport
+
+
+def progress(state, docs=(0, 0), error=None):
+    """Build an export progress dictionary as returned by the SQL library."""
+    result = {
+        "state": state,
+        "docs": sum(docs),
+        "elapsed_seconds": 2.0,
+        "rows_per_second": sum(docs) / 2.0,
+        "slices": [
+            {"id": i, "docs": d, "done": state == "done"} for i, d in enumerate(docs)
+        ],
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+class TestIndexExport:
+    """
+    Test class for IndexExport functionality.
+    """
+
+    def test_format_progress(self):
+        """Test the progress line with documents per slice."""
+        line = IndexExport.format_progress(progress("running", (1500, 20)))
+
+        assert "Exported 1,520 documents" in line
+        assert "760 rows/s" in line
+        assert "0: 1,500" in line
+        assert "1: 20" in line
+
+    @pytest.mark.parametrize(
+        "final_progress, expected_result, expected_message",
+        [
+            (progress("done", (10, 5)), True, "Exported 15 documents of accounts"),
+            (progress("failed", error="boom"), False, "Export failed: boom"),
+            (progress("cancelled"), False, "Export cancelled."),
+            ({}, False, "Unable to follow the export"),
+        ],
+    )
+    @patch("opensearchsql_cli.query.index_export.time.sleep")
+    @patch("opensearchsql_cli.query.index_export.console")
+    def test_export_index(
+        self,
+        mock_console,
+        mock_sleep,
+        final_progress,
+        expected_result,
+        expected_message,
+    ):
+        """Test following an export until it ends."""
+        connection = MagicMock()
+        connection.start_export.return_value = (True, "")
+        connection.get_export_progress.side_effect = [
+            progress("running", (4, 2)),
+            final_progress,
+        ]
+        mock_print = MagicMock()
+
+        result = IndexExport.export_index(
+            connection, "accounts", "/tmp/accounts.ndjson", 2, mock_print
+        )
+
+        assert result is expected_result
+        connection.start_export.assert_called_once_with(
+            "accounts", "/tmp/accounts.ndjson", 2
+        )
+        printed = " ".join(str(call.args[0]) for call in mock_print.call_args_list)
+        assert expected_message in printed
+
+    @patch("opensearchsql_cli.query.index_export.time.sleep")
+    @patch("opensearchsql_cli.query.index_export.console")
+    def test_export_index_ctrl_c(self, mock_console, mock_sleep):
+        """Test that Ctrl+C cancels the export instead of running the CLI handler."""
+        connection = MagicMock()
+        connection.start_export.return_value = (True, "")
+        connection.get_export_progress.return_value = progress("running", (4, 2))
+        mock_sleep.side_effect = lambda seconds: signal.raise_signal(signal.SIGINT)
+        shutdowns = []
+
+        def shutdown(sig, frame):
+            shutdowns.append(sig)
+
+        previous = signal.signal(signal.SIGINT, shutdown)
+        mock_print = MagicMock()
+
+        try:
+            result = IndexExport.export_index(
+                connection, "accounts", "out.ndjson", print_function=mock_print
+            )
+            restored = signal.getsignal(signal.SIGINT)
+        finally:
+            signal.signal(signal.SIGINT, previous)
+
+        assert result is False
+        connection.cancel_export.assert_called_once()
+        assert shutdowns == []
+        assert restored is shutdown
+        assert "Export cancelled." in mock_print.call_args[0][0]
+
+    @patch("opensearchsql_cli.query.index_export.console")
+    def test_export_index_not_started(self, mock_console):
+        """Test an export rejected by the SQL library."""
+        connection = MagicMock()
+        connection.start_export.return_value = (False, "An export is still running")
+        mock_print = MagicMock()
+
+        result = IndexExport.export_index(
+            connection, "accounts", "out.ndjson", print_function=mock_print
+        )
+
+        assert result is False
+        connection.get_export_progress.assert_not_called()
+        mock_print.assert_called_once()
+        assert "An export is still running" in mock_print.call_args[0][0]
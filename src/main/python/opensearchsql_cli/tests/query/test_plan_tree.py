@@ -0,0 +1,138 @@
+"""
+Tests for the Plan Tree.
+
+This module contains tests for the PlanNode class that parses Calcite and legacy
+explain output into a tree of operators.
+"""
+
+import json
+import pytest
+from opensearchsql_cli.query.plan_tree import PlanNode, parse_value, split_top_level
+
+COST_PLAN = """LogicalSort(sort0=[$1], dir0=[DESC], fetch=[10]): rowcount = 10.0, cumulative cost = {130.0 rows, 540.0 cpu, 0.0 io}, id = 40
+  LogicalAggregate(group=[{0}], count()=[COUNT()]): rowcount = 10.0, cumulative cost = {120.0 rows, 500.0 cpu, 0.0 io}, id = 38
+    LogicalFilter(condition=[AND(>($3, 30), =($2, 'R&D, Labs'))])
+      LogicalJoin(condition=[=($0, $4)], joinType=[inner])
+        CalciteLogicalIndexScan(table=[[OpenSearch, employees]])
+        CalciteLogicalIndexScan(table=[[OpenSearch, departments]])
+"""
+
+
+class TestPlanTree:
+    """
+    Test class for PlanNode functionality.
+    """
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("a, [b, c], f(d, e)", ["a", "[b, c]", "f(d, e)"]),
+            ("'x, y', \"{,}\"", ["'x, y'", '"{,}"']),
+            ("", []),
+        ],
+    )
+    def test_split_top_level(self, text, expected):
+        """Test that commas inside brackets and quotes do not split."""
+        assert split_top_level(text) == expected
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("[a, [b, c]]", ["a", ["b", "c"]]),
+            ('{"from": 0}', {"from": 0}),
+            ("{0, 1}", "{0, 1}"),
+            ("PROJECT->[a, b]", {"PROJECT": ["a", "b"]}),
+            ("FILTER->>($1, 30)", {"FILTER": ">($1, 30)"}),
+            (
+                "Request(index=logs, size=10)",
+                {"Request": {"index": "logs", "size": "10"}},
+            ),
+            ("AND(>($3, 30), <($3, 40))", "AND(>($3, 30), <($3, 40))"),
+            ("COUNT()", "COUNT()"),
+        ],
+    )
+    def test_parse_value(self, text, expected):
+        """Test parsing lists, JSON, push down operations, objects and expressions."""
+        assert parse_value(text) == expected
+
+    def test_from_calcite(self):
+        """Test a plan with a sort, an aggregate, a filter and a join."""
+        root = PlanNode.from_calcite(COST_PLAN)
+
+        assert [node.kind for node in root.walk()] == [
+            "sort",
+            "aggregate",
+            "filter",
+            "join",
+            "scan",
+            "scan",
+        ]
+        assert root.attributes == {"sort0": "$1", "dir0": "DESC", "fetch": "10"}
+        assert root.cost == {
+            "rows": 10.0,
+            "cumulative": {"rows": 130.0, "cpu": 540.0, "io": 0.0},
+            "id": 40.0,
+        }
+        aggregate = root.children[0]
+        assert aggregate.attributes == {"group": "{0}", "count()": "COUNT()"}
+        join = aggregate.children[0].children[0]
+        assert aggregate.children[0].attributes["condition"] == (
+            "AND(>($3, 30), =($2, 'R&D, Labs'))"
+        )
+        assert [scan.attributes["table"][1] for scan in join.children] == [
+            "employees",
+            "departments",
+        ]
+
+    def test_push_down_context(self, mock_calcite_explain):
+        """Test that the push down context of the physical plan is kept whole."""
+        plans = PlanNode.from_explain(mock_calcite_explain)
+
+        scan = plans["physical"]
+        assert scan.kind == "scan"
+        context = scan.attributes["PushDownContext"]
+        assert context[0] == [{"PROJECT": ["name", "hire_date", "department", "age"]}]
+        request = context[1]["OpenSearchRequestBuilder"]
+        assert request["sourceBuilder"]["_source"]["includes"][0] == "name"
+        assert request["requestedTotalSize"] == "99999"
+        assert plans["logical"].children[0].name == "CalciteLogicalIndexScan"
+
+    def test_from_legacy(self, mock_legacy_explain):
+        """Test a legacy plan with its request parsed."""
+        root = PlanNode.from_explain(mock_legacy_explain)["root"]
+
+        assert root.kind == "project"
+        assert root.attributes["fields"] == ["name", "hire_date", "department", "age"]
+        request = root.children[0].attributes["request"]["OpenSearchQueryRequest"]
+        assert request["indexName"] == "employees"
+        assert request["sourceBuilder"]["size"] == 10000
+
+    def test_lines(self):
+        """Test the indented tree rendering."""
+        lines = PlanNode.from_calcite(COST_PLAN).lines()
+
+        assert lines[0] == (
+            "LogicalSort  (rows 10, cumulative 130 rows, 540 cpu, 0 io, id 40)"
+        )
+        assert lines[1] == "│   sort0: $1"
+        assert "            ├── CalciteLogicalIndexScan" in lines
+        assert lines[-1] == "                    table: [OpenSearch, departments]"
+
+    def test_to_dict(self, mock_calcite_explain):
+        """Test that a tree converts to JSON."""
+        data = json.loads(
+            json.dumps(PlanNode.from_explain(mock_calcite_explain)["logical"].to_dict())
+        )
+
+        assert data["name"] == "LogicalProject"
+        assert data["attributes"]["age"] == "$3"
+        assert data["children"][0]["kind"] == "scan"
+        assert "cost" not in data
+
+    def test_malformed_lines(self):
+        """Test that lines that are not operators are kept rather than dropped."""
+        root = PlanNode.from_calcite("LogicalProject(a=[$0]\n  some text\n")
+
+        assert root.name == "LogicalProject(a=[$0]"
+        assert root.children[0].name == "some text"
+        assert PlanNode.from_calcite("\n") is None
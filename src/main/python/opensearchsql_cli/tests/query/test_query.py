@@ -4,13 +4,18 @@ Tests for the execute_query module.
 This module contains tests for the query execution functionality.
 """
 
+import io
 import pytest
 import json
 from rich.console import Console
+from rich.text import Text
 from unittest.mock import patch, MagicMock
 from opensearchsql_cli.query.execute_query import ExecuteQuery
 from opensearchsql_cli.query.query_results import QueryResults
 from opensearchsql_cli.query.explain_results import ExplainResults
+from opensearchsql_cli.query.renderers import PlainTable
+from opensearchsql_cli.query.result_set import ResultSet
+from opensearchsql_cli.query.result_cache import ResultCache
 
 # Create a console instance for printing
 console = Console()
@@ -390,3 +395,373 @@ class TestQuery:
             is_vertical=is_vertical,
             expected_success=expected_success,
         )
+
+    @pytest.mark.parametrize(
+        "query_info, expected_message",
+        [
+            (None, "Fetched 1 rows with a total of 1 hits"),
+            (
+                {"total_hits": 250, "total_hits_relation": "eq"},
+                "Fetched 1 rows with a total of 1 hits",
+            ),
+            (
+                {"total_hits": 1, "total_hits_relation": "gte"},
+                "Fetched 1 rows with a total of ≥ 1 hits",
+            ),
+            (
+                {"total_hits": 10000, "total_hits_relation": "gte"},
+                "Fetched 1 rows with a total of 1 hits",
+            ),
+            # TRACK_TOTAL_HITS off: no hit count, the engine total is exact
+            (
+                {"total_hits": None, "total_hits_relation": "gte"},
+                "Fetched 1 rows with a total of 1 hits",
+            ),
+        ],
+    )
+    def test_table_format_total_hits(
+        self, mock_json_response, query_info, expected_message
+    ):
+        """Test the hit count message, including lower bounds from track_total_hits."""
+        table_data = QueryResults.table_format(mock_json_response, False, query_info)
+
+        assert table_data["message"] == expected_message
+
+    @pytest.mark.parametrize(
+        "query_info, expected_phases",
+        [
+            (
+                {
+                    "timings": {
+                        "parse": 1.0,
+                        "engine": 4.0,
+                        "opensearch": 20.0,
+                        "format": 2.0,
+                        "total": 27.0,
+                    }
+                },
+                "parse 1.0 ms | engine 4.0 ms | opensearch 20.0 ms | format 2.0 ms | "
+                "transfer 3.0 ms | decode 5.0 ms | render 8.0 ms | total 45.0 ms",
+            ),
+            (None, "call 30.0 ms | decode 5.0 ms | render 8.0 ms | total 45.0 ms"),
+        ],
+    )
+    def test_format_timings(self, query_info, expected_phases):
+        """Test the timing breakdown with and without the library's phases."""
+        timings = {"call": 30.0, "decode": 5.0, "render": 8.0, "total": 45.0}
+
+        line = ExecuteQuery.format_timings(timings, query_info)
+
+        assert expected_phases in line
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_show_timing(self, mock_console, mock_json_response):
+        """Test the timing breakdown printed after a query."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_json_response
+        connection.get_last_query_info.return_value = {
+            "timings": {"parse": 1.0, "total": 2.0}
+        }
+        mock_print = MagicMock()
+
+        success, _, _ = ExecuteQuery.execute_query(
+            connection, "select 1", False, False, "json", print_function=mock_print
+        )
+        assert success is True
+        assert "Timing:" not in str(mock_print.call_args_list)
+
+        mock_print.reset_mock()
+        ExecuteQuery.execute_query(
+            connection,
+            "select 1",
+            False,
+            False,
+            "json",
+            print_function=mock_print,
+            show_timing=True,
+        )
+        line = mock_print.call_args_list[-1][0][0]
+        assert line.startswith("[green]Timing:[/green]")
+        assert "parse 1.0 ms" in line
+        assert "render" in line
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_log(self, mock_console, mock_json_response):
+        """Test that a query is recorded in the query log with its phases."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_json_response
+        connection.get_last_query_info.return_value = {
+            "rows": 1,
+            "timings": {"parse": 1.0, "total": 2.0},
+        }
+        query_log = MagicMock()
+
+        ExecuteQuery.execute_query(
+            connection,
+            "source=test",
+            True,
+            False,
+            "json",
+            print_function=MagicMock(),
+            query_log=query_log,
+        )
+
+        query, language, success, rows, timings = query_log.record.call_args[0]
+        assert (query, language, success, rows) == ("source=test", "PPL", True, 1)
+        assert timings["parse"] == 1.0
+        assert {"transfer", "render", "total"} <= set(timings)
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_info_fetched_once(self, mock_console, mock_json_response):
+        """Test that a table query fetches the last query details only once."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_json_response
+        connection.get_last_query_info.return_value = {
+            "rows": 1,
+            "timings": {"parse": 1.0, "total": 2.0},
+        }
+        query_log = MagicMock()
+
+        success, _, _ = ExecuteQuery.execute_query(
+            connection,
+            "select 1",
+            False,
+            False,
+            "table",
+            print_function=MagicMock(),
+            show_timing=True,
+            query_log=query_log,
+        )
+
+        assert success is True
+        connection.get_last_query_info.assert_called_once()
+        assert query_log.record.call_args[0][3] == 1
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_log_explain_fallback(self, mock_console):
+        """Test that an explain output without a plan is logged as a success."""
+        connection = MagicMock()
+        connection.query_executor.return_value = '{"other": 1}'
+        connection.get_last_query_info.return_value = None
+        query_log = MagicMock()
+
+        success, result, _ = ExecuteQuery.execute_query(
+            connection,
+            "select 1",
+            False,
+            True,
+            "json",
+            print_function=MagicMock(),
+            query_log=query_log,
+        )
+
+        assert (success, result) == (True, '{"other": 1}')
+        assert query_log.record.call_args[0][2] is True
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_cached(self, mock_console, mock_json_response):
+        """Test that a repeated query is served from the result cache."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_json_response
+        connection.get_last_query_info.return_value = None
+        result_cache = ResultCache()
+        mock_print = MagicMock()
+
+        for _ in range(2):
+            success, _, formatted_result = ExecuteQuery.execute_query(
+                connection,
+                "select 1",
+                False,
+                False,
+                "table",
+                print_function=mock_print,
+                result_cache=result_cache,
+            )
+
+        assert success is True
+        connection.query_executor.assert_called_once()
+        cached, _ = result_cache.get(result_cache.key("select 1", False, "table"))
+        assert isinstance(cached, ResultSet)
+        assert cached is formatted_result
+        mock_print.assert_any_call("[dim white]cached (age 0s)[/dim white]")
+
+    @pytest.mark.parametrize("format", ["table", "json"])
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_without_display(
+        self, mock_console, mock_json_response, format
+    ):
+        """Test that a result can be fetched without being displayed."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_json_response
+        connection.get_last_query_info.return_value = None
+        mock_print = MagicMock()
+
+        with patch.object(QueryResults, "display_raw_result") as mock_raw:
+            success, _, formatted_result = ExecuteQuery.execute_query(
+                connection,
+                "select 1",
+                False,
+                False,
+                format,
+                print_function=mock_print,
+                display=False,
+            )
+
+        assert success is True
+        mock_print.assert_not_called()
+        mock_raw.assert_not_called()
+        if format == "table":
+            assert isinstance(formatted_result, ResultSet)
+        else:
+            assert formatted_result == mock_json_response
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_not_cached_write(self, mock_console):
+        """Test that a statement that writes is sent every time."""
+        connection = MagicMock()
+        connection.query_executor.return_value = '{"deleted": 1}'
+        result_cache = ResultCache()
+
+        for _ in range(2):
+            ExecuteQuery.execute_query(
+                connection,
+                "delete from t where a = 1",
+                False,
+                False,
+                "json",
+                print_function=MagicMock(),
+                result_cache=result_cache,
+            )
+
+        assert connection.query_executor.call_count == 2
+        assert result_cache.stats()["memory_entries"] == 0
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_explain_tree(self, mock_console, mock_calcite_explain):
+        """Test that explain in table format prints the operator trees."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_calcite_explain
+        mock_print = MagicMock()
+
+        ExecuteQuery.execute_query(
+            connection,
+            "explain source=employees",
+            True,
+            True,
+            "table",
+            False,
+            mock_print,
+        )
+
+        printed = mock_print.call_args[0][0]
+        assert printed.startswith("Logical plan:\nLogicalProject")
+        assert "Physical plan:\nCalciteEnumerableIndexScan" in printed
+
+    @pytest.mark.parametrize("format", ["table", "json"])
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            '{"other": "[red]1[/red]"}',
+            '{"calcite": {"logical": "LogicalProject(a=[$0])\n  Calcite',
+        ],
+    )
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_explain_fallback(self, mock_console, payload, format):
+        """Test that an explain output that is not a plan is printed as it is."""
+        connection = MagicMock()
+        connection.query_executor.return_value = payload
+        mock_print = MagicMock()
+
+        outcome = ExecuteQuery.execute_query(
+            connection, "explain select 1", False, True, format, False, mock_print
+        )
+
+        assert outcome == (True, payload, payload)
+        printed = mock_print.call_args[0][0]
+        assert Text.from_markup(printed).plain == payload
+
+    def test_explain_calcite_structured(self, mock_calcite_explain):
+        """Test that explain JSON holds the parsed plans."""
+        data = json.loads(ExplainResults.explain_calcite(mock_calcite_explain))
+
+        assert data["calcite"]["logical"]["name"] == "LogicalProject"
+        assert data["calcite"]["physical"]["kind"] == "scan"
+
+    @pytest.mark.parametrize(
+        "format, expected",
+        [
+            ("csv", b"name,hire_date,department,age\nTest,"),
+            ("json", b'{\n  "schema": ['),
+        ],
+    )
+    def test_display_result(self, mock_json_response, format, expected):
+        """Test that a decoded result is written again in another format."""
+        result_set = ResultSet.from_json(mock_json_response)
+        output = io.BytesIO()
+        mock_print = MagicMock()
+
+        QueryResults.display_result(
+            result_set, format, print_function=mock_print, output=output
+        )
+
+        assert output.getvalue().startswith(expected)
+        mock_print.assert_called_once_with(
+            "[dim white]Written to the output file[/dim white]"
+        )
+
+    def test_display_raw_result_stdout(self, mock_csv_response, capsysbinary):
+        """Test that CSV goes to stdout as bytes, without markup."""
+        mock_print = MagicMock()
+
+        QueryResults.display_raw_result(mock_csv_response, "csv", mock_print)
+
+        assert capsysbinary.readouterr().out == mock_csv_response.encode() + b"\n"
+        mock_print.assert_not_called()
+
+    @pytest.mark.parametrize("isatty, highlighted", [(True, True), (False, False)])
+    def test_display_raw_result_highlight(self, mock_csv_response, isatty, highlighted):
+        """Test that highlighting only applies to a terminal."""
+        mock_print = MagicMock()
+
+        with patch("sys.stdout.isatty", return_value=isatty):
+            QueryResults.display_raw_result(
+                mock_csv_response, "csv", mock_print, highlight=True
+            )
+
+        assert mock_print.called is highlighted
+
+    def test_display_result_table(self, mock_json_response):
+        """Test that a decoded result is displayed again as a table."""
+        result_set = ResultSet.from_json(mock_json_response)
+        mock_print = MagicMock()
+
+        QueryResults.display_result(result_set, "table", print_function=mock_print)
+
+        mock_print.assert_any_call("Fetched 1 rows with a total of 1 hits")
+
+    def test_table_format_plain(self, mock_json_response, capsys):
+        """Test that results above the threshold are written as a plain table."""
+        with patch.object(QueryResults, "PLAIN_TABLE_ROWS", 0):
+            table_data = QueryResults.table_format(mock_json_response)
+        mock_print = MagicMock()
+
+        QueryResults.display_table_result(table_data, mock_print)
+
+        assert isinstance(table_data["table"], PlainTable)
+        mock_print.assert_called_once_with(table_data["message"])
+        assert "┃ name" in capsys.readouterr().out
+
+    @patch("opensearchsql_cli.query.execute_query.console")
+    def test_execute_query_result_set(self, mock_console, mock_json_response):
+        """Test that the table format returns the decoded result set."""
+        connection = MagicMock()
+        connection.query_executor.return_value = mock_json_response
+        connection.get_last_query_info.return_value = None
+
+        success, _, formatted_result = ExecuteQuery.execute_query(
+            connection, "select 1", False, False, "table", print_function=MagicMock()
+        )
+
+        assert success is True
+        assert isinstance(formatted_result, ResultSet)
+        assert formatted_result.names == ["name", "hire_date", "department", "age"]
@@ -0,0 +1,109 @@
+"""
+Tests for the Query Log.
+
+This module contains tests for the QueryLog class that records queries and
+aggregates them by fingerprint.
+"""
+
+import os
+import json
+import pytest
+from unittest.mock import MagicMock
+from opensearchsql_cli.query.query_log import QueryLog
+
+
+@pytest.fixture
+def query_log(tmp_path):
+    """
+    Fixture that returns a query log in a temporary directory.
+    """
+    return QueryLog(path=str(tmp_path / "query_log.jsonl"))
+
+
+class TestQueryLog:
+    """
+    Test class for QueryLog functionality.
+    """
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            (
+                "source=accounts | where age > 30 and name = 'Bob' | head 10",
+                "source=accounts | where age > ? and name = ? | head ?",
+            ),
+            (
+                "SELECT *\n  FROM t WHERE id IN (1, 2, 3) AND x = 1.5e3;",
+                "select * from t where id in (?) and x = ?",
+            ),
+            (
+                'SELECT a FROM logs-2024 WHERE b = "it\'s"',
+                "select a from logs-2024 where b = ?",
+            ),
+            ("select field1 from t2", "select field1 from t2"),
+            (
+                "source=logs-2024.01 | where x = -5",
+                "source=logs-2024.01 | where x = -?",
+            ),
+        ],
+    )
+    def test_fingerprint(self, query, expected):
+        """Test that literals and layout do not change the fingerprint."""
+        assert QueryLog.fingerprint(query) == expected
+
+    def test_record(self, query_log):
+        """Test that a query is appended with its fingerprint and timings."""
+        assert query_log.record("select 1", "SQL", True, 1, {"total": 12.5})
+
+        with open(query_log.path) as f:
+            entry = json.loads(f.readline())
+        assert entry["fingerprint"] == "select ?"
+        assert entry["language"] == "SQL"
+        assert entry["rows"] == 1
+        assert entry["timings"] == {"total": 12.5}
+
+    def test_rotation(self, tmp_path):
+        """Test that a full log is rotated and the previous log is still read."""
+        query_log = QueryLog(path=str(tmp_path / "query_log.jsonl"), max_bytes=1)
+        for total in (1.0, 2.0, 3.0):
+            query_log.record("select 1", "SQL", True, 1, {"total": total})
+
+        assert os.path.exists(query_log.path + ".1")
+        totals = [entry["timings"]["total"] for entry in query_log.entries()]
+        assert totals == [2.0, 3.0]
+
+    def test_top(self, query_log):
+        """Test the aggregation of queries by fingerprint."""
+        for total in range(1, 101):
+            query_log.record(f"select {total}", "SQL", True, 1, {"total": total})
+        query_log.record("source=a | head 5", "PPL", True, 5, {"total": 1.0})
+        with open(query_log.path, "a") as f:
+            f.write("not json\n")
+
+        top = query_log.top()
+
+        assert [group["language"] for group in top] == ["SQL", "PPL"]
+        assert top[0]["count"] == 100
+        assert (top[0]["p50"], top[0]["p95"], top[0]["p99"]) == (50, 95, 99)
+        assert top[0]["total"] == 5050
+        assert query_log.top(1) == top[:1]
+
+    def test_top_skips_failures(self, query_log):
+        """Test that failed queries are left out of the latencies."""
+        query_log.record("select 1", "SQL", True, 1, {"total": 10.0})
+        query_log.record("select 2", "SQL", False, None, {"total": 1000.0})
+
+        top = query_log.top()
+
+        assert top[0]["count"] == 1
+        assert top[0]["total"] == 10.0
+
+    def test_display_top(self, query_log):
+        """Test the -top table and the message for an empty log."""
+        mock_print = MagicMock()
+        assert query_log.display_top(print_function=mock_print) is False
+
+        query_log.record("select 1", "SQL", True, 1, {"total": 2.0})
+        mock_print.reset_mock()
+        assert query_log.display_top(print_function=mock_print) is True
+        assert mock_print.call_count == 2
@@ -0,0 +1,133 @@
+"""
+Tests for the Result Renderers.
+
+This module contains tests for the PlainTable and VerticalRecords classes
+that render large results without Rich.
+"""
+
+import io
+from unittest.mock import MagicMock, patch
+from opensearchsql_cli.query import renderers
+from opensearchsql_cli.query.renderers import PlainTable, VerticalRecords
+
+
+class TestPlainTable:
+    """
+    Test class for PlainTable functionality.
+    """
+
+    def test_lines(self):
+        """Test the borders, header and padded rows of the table."""
+        table = PlainTable(["id", "name"], [[1, "alice"], [22, None]])
+
+        assert str(table).splitlines() == [
+            "┏━━━━┳━━━━━━━━┓",
+            "┃ id ┃ name   ┃",
+            "┡━━━━╇━━━━━━━━┩",
+            "│ 1  │ alice  │",
+            "│ 22 │ <null> │",
+            "└────┴────────┘",
+        ]
+
+    def test_short_rows(self):
+        """Test that missing values are shown as null."""
+        table = PlainTable(["a", "b"], [[1]])
+
+        assert "│ 1 │ <null> │" in str(table)
+
+    def test_sampled_widths(self):
+        """Test that columns are sized from a sample and capped."""
+        assert PlainTable(["c"], [["x" * 100]]).widths == [PlainTable.MAX_COLUMN_WIDTH]
+
+        # Every second row is sampled, values longer than their column are cut
+        rows = [["yyy"], ["longer"], ["yyy"], ["longer"]]
+        with patch.object(PlainTable, "SAMPLE_ROWS", 2):
+            table = PlainTable(["c"], rows)
+        assert table.widths == [3]
+        assert "│ lo… │" in str(table)
+        assert "│ yyy │" in str(table)
+        assert table.line(["x" * 100]) == "│ xx… │"
+
+    def test_wide_and_control_characters(self):
+        """Test that wide characters are measured in columns and breaks escaped."""
+        table = PlainTable(["名前", "note"], [["日本", "a\nb\tc"], ["x", "é"]])
+
+        assert str(table).splitlines() == [
+            "┏━━━━━━┳━━━━━━━━━┓",
+            "┃ 名前 ┃ note    ┃",
+            "┡━━━━━━╇━━━━━━━━━┩",
+            "│ 日本 │ a\\nb\\tc │",
+            "│ x    │ é       │",
+            "└──────┴─────────┘",
+        ]
+        assert PlainTable(["c"], [["日" * 40]]).line(["日" * 40]).endswith("日 … │")
+
+    def test_write(self):
+        """Test that the table is written in chunks."""
+        rows = [[i] for i in range(25)]
+        table = PlainTable(["n"], rows)
+        stream = io.StringIO()
+
+        with patch.object(renderers, "CHUNK_LINES", 10):
+            table.write(stream)
+
+        assert stream.getvalue() == str(table) + "\n"
+
+
+class TestVerticalRecords:
+    """
+    Test class for VerticalRecords functionality.
+    """
+
+    def test_lines(self):
+        """Test the title and field lines of each record."""
+        records = VerticalRecords(["id", "comment"], [[1, "a\nb"], [2]])
+
+        assert str(records).splitlines() == [
+            "─[ RECORD 1 ]",
+            "id      │ 1",
+            "comment │ a",
+            "        │ b",
+            "─[ RECORD 2 ]",
+            "id      │ 2",
+            "comment │ <null>",
+        ]
+
+    def test_streaming(self):
+        """Test that records are formatted only as they are written."""
+        rows = MagicMock()
+        rows.__iter__.return_value = iter([[1], [2], [3]])
+        records = VerticalRecords(["id"], rows)
+        stream = MagicMock()
+
+        with patch.object(records, "record_lines", wraps=records.record_lines) as fmt:
+            with patch.object(renderers, "CHUNK_LINES", 2):
+                lines = records.lines()
+                assert fmt.call_count == 0
+                records.write(stream)
+
+        assert fmt.call_count == 3
+        assert stream.write.call_count == 3
+
+
+class TestWriteRaw:
+    """
+    Test class for write_raw functionality.
+    """
+
+    def test_bytes(self):
+        """Test that the text is written as UTF-8 bytes with a line break."""
+        stream = io.BytesIO()
+
+        renderers.write_raw('{"name": "café"}', stream)
+
+        assert stream.getvalue() == '{"name": "café"}\n'.encode("utf-8")
+
+    def test_text_stdout(self):
+        """Test that a stdout without a binary buffer gets the text as it is."""
+        stdout = io.StringIO()
+
+        with patch.object(renderers.sys, "stdout", stdout):
+            renderers.write_raw("a,b\n1,2")
+
+        assert stdout.getvalue() == "a,b\n1,2\n"
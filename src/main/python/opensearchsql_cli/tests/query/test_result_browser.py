@@ -0,0 +1,111 @@
+"""
+Tests for the Result Browser.
+
+This module contains tests for the ResultBrowser class that shows large
+results full screen.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
+from opensearchsql_cli.query.result_browser import ResultBrowser
+
+
+@pytest.fixture
+def browser():
+    """
+    Fixture that returns a browser for 100 rows of three columns.
+    """
+    rows = [[i, f"name{i}", None] for i in range(100)]
+    return ResultBrowser(["id", "name", "empty"], rows, "select * from test")
+
+
+class TestResultBrowser:
+    """
+    Test class for ResultBrowser functionality.
+    """
+
+    def test_from_result(self, mock_json_response):
+        """Test that only table results can be browsed."""
+        browser = ResultBrowser.from_result(mock_json_response)
+
+        assert browser.table.headers == ["name", "hire_date", "department", "age"]
+        assert len(browser.rows) == 1
+        assert ResultBrowser.from_result("name,age\nTest,20") is None
+        assert ResultBrowser.from_result(None) is None
+
+    def test_move_to(self, browser):
+        """Test that the cursor stays on screen and within the result."""
+        browser.move_to(50, height=15)
+        assert (browser.cursor, browser.top) == (50, 40)
+
+        browser.move_to(10, height=15)
+        assert (browser.cursor, browser.top) == (10, 10)
+
+        browser.move_to(500, height=15)
+        assert browser.cursor == 99
+
+    def test_visible_lines(self, browser):
+        """Test that only the rows on screen are formatted."""
+        browser.move_to(2, height=8)
+        fragments = browser.visible_lines(height=8, width=12)
+        lines = [text for style, text in fragments if text != "\n"]
+
+        assert len(lines) == 4
+        assert lines[0] == "│ 0  │ name0"
+        assert ("class:cursor", "│ 2  │ name2") in fragments
+
+    def test_scroll_columns(self, browser):
+        """Test horizontal scrolling from column to column."""
+        browser.scroll_columns(1)
+        assert browser.left == 5
+        browser.scroll_columns(1)
+        browser.scroll_columns(1)
+        browser.scroll_columns(1)
+        assert browser.left == 14
+        browser.scroll_columns(-1)
+        assert browser.left == 5
+
+    def test_jump(self, browser):
+        """Test jumping to a row number counted from 1."""
+        assert browser.jump("42", height=15) is True
+        assert browser.cursor == 41
+        assert browser.jump("abc", height=15) is False
+        assert browser.message == "Not a row number: abc"
+
+    def test_search(self, browser):
+        """Test incremental search and moving between matches."""
+        browser.search("name9", height=15)
+        assert browser.cursor == 9
+
+        browser.search_next(1, height=15)
+        assert browser.cursor == 90
+        browser.search_next(-1, height=15)
+        assert browser.cursor == 9
+
+        browser.search("missing", height=15)
+        assert browser.cursor == 0
+        assert browser.message == "Not found: missing"
+
+    def test_search_formats_rows_once(self, browser):
+        """Test that typing a search formats each row once."""
+        with patch.object(browser.table, "cells", wraps=browser.table.cells) as cells:
+            for length in range(1, 6):
+                browser.search("missing"[:length], height=15)
+
+        assert cells.call_count == 100
+
+    def test_application(self, browser):
+        """Test the key bindings of the full-screen application."""
+        with create_pipe_input() as pipe_input:
+            with create_app_session(input=pipe_input, output=DummyOutput()):
+                pipe_input.send_text("jj/name5\r:30\rlq")
+                browser.run()
+
+        assert browser.cursor == 29
+        assert browser.search_text == "name5"
+        assert browser.left == 5
+        assert browser.mode is None
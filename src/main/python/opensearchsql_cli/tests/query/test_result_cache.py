@@ -0,0 +1,182 @@
+"""
+Tests for the Result Cache.
+
+This module contains tests for the ResultCache class that keeps query results
+in memory and on disk.
+"""
+
+import os
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from opensearchsql_cli.query.result_cache import ResultCache
+from opensearchsql_cli.query.result_set import ResultSet
+
+
+@pytest.fixture
+def result_cache(tmp_path):
+    """
+    Fixture that returns a cache with its disk tier in a temporary directory.
+    """
+    return ResultCache(
+        cluster="http://localhost:9200",
+        version="3.1.0.0",
+        disk_path=str(tmp_path / "result_cache"),
+    )
+
+
+class TestResultCache:
+    """
+    Test class for ResultCache functionality.
+    """
+
+    def test_key(self, result_cache):
+        """Test that layout and a trailing semicolon do not change the key."""
+        key = result_cache.key("select *\n  from t;", False, "Table")
+
+        assert key == result_cache.key("select * from t", False, "table")
+        assert key != result_cache.key("select * from t", True, "table")
+        assert key != result_cache.key("select * from t", False, "json")
+        assert key[3:] == ("3.1.0.0", "http://localhost:9200")
+
+    def test_memory_hit(self, result_cache):
+        """Test that a cached result is served from memory with its age."""
+        key = result_cache.key("source=t", True, "json")
+        assert result_cache.get(key) == (None, None)
+
+        result_cache.put(key, '{"a": 1}')
+        value, age = result_cache.get(key)
+
+        assert value == '{"a": 1}'
+        assert 0 <= age < 5
+        assert (result_cache.memory_hits, result_cache.misses) == (1, 1)
+
+    def test_result_set_replaces_string(self, result_cache):
+        """Test that a decoded result replaces its string in memory only."""
+        key = result_cache.key("source=t", True, "table")
+        result_cache.put(key, '{"a": 1}')
+        result_set = ResultSet(["a"], ["integer"], [[1, 2, 3]])
+
+        result_cache.put(key, result_set, persist=False)
+
+        assert result_cache.get(key)[0] is result_set
+        assert result_cache.size == result_cache.cost(result_set)
+        assert result_cache.size > len('{"a": 1}')
+        assert result_cache.read_disk(key, time.time())[0] == '{"a": 1}'
+
+    def test_result_set_too_large(self):
+        """Test that a decoded result beyond the memory size keeps its string."""
+        cache = ResultCache(memory_bytes=20)
+        key = cache.key("source=t", True, "table")
+        cache.put(key, '{"a": 1}')
+
+        cache.put(key, ResultSet(["a"], ["string"], [["x" * 100]]), persist=False)
+
+        assert cache.get(key)[0] == '{"a": 1}'
+        assert cache.size == len('{"a": 1}')
+
+    @pytest.mark.parametrize(
+        "query, is_ppl_mode, expected",
+        [
+            ("SELECT * FROM t", False, True),
+            ("  show tables like %", False, True),
+            ("describe tables like t", False, True),
+            ("DELETE FROM t WHERE a = 1", False, False),
+            ("update t set a = 1", False, False),
+            ("insert into t values (1)", False, False),
+            ("selection", False, False),
+            ("source=t | head 5", True, True),
+            ("search source=t", True, True),
+            ("describe t", True, True),
+            ("delete t", True, False),
+        ],
+    )
+    def test_cacheable(self, result_cache, query, is_ppl_mode, expected):
+        """Test that only read-only statements are cached."""
+        assert result_cache.cacheable(query, is_ppl_mode) is expected
+
+    def test_lru_eviction(self):
+        """Test that the least recently used results leave memory first."""
+        cache = ResultCache(memory_bytes=10)
+        first, second, third = (cache.key(q, True, "json") for q in "abc")
+        cache.put(first, "aaaa")
+        cache.put(second, "bbbb")
+        cache.get(first)
+
+        cache.put(third, "cccc")
+
+        assert list(cache.entries) == [first, third]
+        assert cache.size == 8
+
+    def test_memory_ttl(self):
+        """Test that expired results are not served from memory."""
+        cache = ResultCache(memory_ttl=10)
+        key = cache.key("source=t", True, "json")
+        cache.put(key, "result")
+
+        with patch("time.time", return_value=time.time() + 11):
+            assert cache.get(key) == (None, None)
+        assert key not in cache.entries
+
+    def test_disk_hit(self, result_cache, tmp_path):
+        """Test that a result survives the session on disk and is promoted."""
+        key = result_cache.key("source=t", True, "json")
+        result_cache.put(key, "result " * 100)
+
+        cache = ResultCache(
+            cluster="http://localhost:9200",
+            version="3.1.0.0",
+            disk_path=str(tmp_path / "result_cache"),
+        )
+        value, _ = cache.get(key)
+
+        assert value == "result " * 100
+        assert cache.disk_hits == 1
+        assert key in cache.entries
+        assert os.path.getsize(cache.disk_file(key)) < len(value)
+
+    def test_disk_ttl(self, result_cache):
+        """Test that expired files are removed from disk."""
+        key = result_cache.key("source=t", True, "json")
+        result_cache.put(key, "result")
+        result_cache.entries.clear()
+
+        with patch("time.time", return_value=time.time() + 3601):
+            assert result_cache.get(key) == (None, None)
+        assert not os.path.exists(result_cache.disk_file(key))
+
+    def test_disabled(self, result_cache):
+        """Test that a disabled cache neither stores nor serves results."""
+        key = result_cache.key("source=t", True, "json")
+        result_cache.enabled = False
+
+        result_cache.put(key, "result")
+
+        assert result_cache.get(key) == (None, None)
+        assert result_cache.stats()["memory_entries"] == 0
+
+    def test_clear(self, result_cache):
+        """Test that clear empties both tiers."""
+        key = result_cache.key("source=t", True, "json")
+        result_cache.put(key, "result")
+
+        result_cache.clear()
+
+        stats = result_cache.stats()
+        assert (stats["memory_entries"], stats["disk_entries"]) == (0, 0)
+        assert result_cache.get(key) == (None, None)
+
+    def test_display_stats(self, result_cache):
+        """Test that the hit rate and both tiers are displayed."""
+        key = result_cache.key("source=t", True, "json")
+        result_cache.get(key)
+        result_cache.put(key, "result")
+        result_cache.get(key)
+        mock_print = MagicMock()
+
+        result_cache.display_stats(mock_print)
+
+        output = "\n".join(call[0][0] for call in mock_print.call_args_list)
+        assert "1 (50%), 1 from memory, 0 from disk" in output
+        assert "Disk:" in output
+        assert "TTL 300s" in output
@@ -0,0 +1,202 @@
+"""
+Tests for the Result Set.
+
+This module contains tests for the ResultSet class that stores decoded
+table results column by column.
+"""
+
+import json
+import pytest
+from opensearchsql_cli.query.result_set import ResultSet
+
+
+def jdbc(schema, datarows):
+    """Build a JDBC result string."""
+    return json.dumps(
+        {
+            "schema": [{"name": name, "type": kind} for name, kind in schema],
+            "datarows": datarows,
+            "total": len(datarows),
+            "size": len(datarows),
+        }
+    )
+
+
+class TestResultSet:
+    """
+    Test class for ResultSet functionality.
+    """
+
+    def test_from_json(self, mock_json_response):
+        """Test decoding a JDBC result into columns."""
+        result_set = ResultSet.from_json(mock_json_response)
+
+        assert result_set.names == ["name", "hire_date", "department", "age"]
+        assert result_set.types == ["string", "timestamp", "string", "integer"]
+        assert (result_set.total, result_set.size) == (1, 1)
+        assert len(result_set) == 1
+        assert result_set[0] == ["Test", "1999-01-01 00:00:00", "Engineering", 20]
+        assert list(result_set) == [("Test", "1999-01-01 00:00:00", "Engineering", 20)]
+
+    def test_from_json_not_a_table(self):
+        """Test results that are not tables."""
+        assert ResultSet.from_json('{"status": 200}') is None
+        with pytest.raises(json.JSONDecodeError):
+            ResultSet.from_json("name,age")
+
+    def test_alias_and_short_rows(self):
+        """Test that aliases name the columns and short rows are padded."""
+        result = json.dumps(
+            {
+                "schema": [
+                    {"name": "a", "alias": "x", "type": "long"},
+                    {"name": "b", "type": "keyword"},
+                ],
+                "datarows": [[1, "k"], [2]],
+                "total": 2,
+                "size": 2,
+            }
+        )
+        result_set = ResultSet.from_json(result)
+
+        assert result_set.names == ["x", "b"]
+        assert result_set[0:2] == [[1, "k"], [2, None]]
+
+    def test_empty(self):
+        """Test a result without rows."""
+        result_set = ResultSet.from_json(jdbc([("a", "long")], []))
+
+        assert len(result_set) == 0
+        assert result_set.columns == [[]]
+        assert list(result_set) == []
+
+    def test_slots(self, mock_json_response):
+        """Test that a result set has no per-instance dictionary."""
+        result_set = ResultSet.from_json(mock_json_response)
+
+        with pytest.raises(AttributeError):
+            result_set.extra = 1
+
+    def test_to_json(self, mock_json_response):
+        """Test writing a result back in the JSON format of the SQL library."""
+        data = json.loads(ResultSet.from_json(mock_json_response).to_json())
+
+        assert data["schema"][3] == {"name": "age", "type": "integer"}
+        assert data["datarows"] == [["Test", "1999-01-01 00:00:00", "Engineering", 20]]
+        assert (data["total"], data["size"]) == (1, 1)
+
+    def test_csv_round_trip(self):
+        """Test writing a result as CSV and reading it back as strings."""
+        result_set = ResultSet.from_json(
+            jdbc([("a", "long"), ("b", "keyword")], [[1, "x,y"], [2, None]])
+        )
+
+        text = result_set.to_csv()
+        decoded = ResultSet.from_csv(text)
+
+        assert text == 'a,b\n1,"x,y"\n2,'
+        assert decoded.names == ["a", "b"]
+        assert list(decoded) == [("1", "x,y"), ("2", None)]
+        assert (decoded.total, decoded.size) == (2, 2)
+
+    @pytest.mark.parametrize(
+        "result, format, expected",
+        [
+            (jdbc([("a", "long")], [[1]]), "json", [(1,)]),
+            ("a\n1", "CSV", [("1",)]),
+            ("", "csv", None),
+            ("name,age", "table", None),
+        ],
+    )
+    def test_parse(self, result, format, expected):
+        """Test decoding a result in the format it was fetched in."""
+        result_set = ResultSet.parse(result, format)
+
+        assert (list(result_set) if result_set else None) == expected
+
+
+@pytest.fixture
+def logs():
+    """
+    Fixture that returns a result set with a typed, a nullable and a string column.
+    """
+    return ResultSet.from_json(
+        jdbc(
+            [("status", "integer"), ("bytes", "long"), ("host", "keyword")],
+            [[500, 10, "a"], [200, None, "b"], [404, 30, "a"], [500, 5, "c"]],
+        )
+    )
+
+
+class TestResultSetRefinements:
+    """
+    Test class for sorting, filtering and projecting result sets.
+    """
+
+    def test_select(self, logs):
+        """Test that a projection keeps the columns in order and shares them."""
+        selected = logs.select(["HOST", "status"])
+
+        assert selected.names == ["host", "status"]
+        assert selected.columns[1] is logs.columns[0]
+        with pytest.raises(ValueError, match="Unknown column: nope"):
+            logs.select(["nope"])
+
+    @pytest.mark.parametrize(
+        "name, descending, expected",
+        [
+            ("status", False, [200, 404, 500, 500]),
+            ("status", True, [500, 500, 404, 200]),
+            ("bytes", False, [5, 10, 30, None]),
+            ("bytes", True, [30, 10, 5, None]),
+        ],
+    )
+    def test_sort(self, logs, name, descending, expected):
+        """Test sorting by typed and nullable columns, nulls last."""
+        sorted_logs = logs.sort(name, descending)
+
+        assert list(sorted_logs.columns[logs.column_index(name)]) == expected
+        assert logs[0] == [500, 10, "a"]
+
+    def test_sort_keeps_typed_arrays(self, logs):
+        """Test that the columns of a sorted result keep their storage."""
+        sorted_logs = logs.sort("host")
+
+        assert type(sorted_logs.columns[0]) is type(logs.columns[0])
+        assert list(sorted_logs.columns[2]) == ["a", "a", "b", "c"]
+
+    @pytest.mark.parametrize(
+        "name, op, value, expected",
+        [
+            ("status", "=", "500", [10, 5]),
+            ("status", ">=", "404", [10, 30, 5]),
+            ("status", "!=", "500", [None, 30]),
+            ("bytes", "<", "20", [10, 5]),
+            ("bytes", "=", "null", [None]),
+            ("host", "=", "'a'", [10, 30]),
+            ("host", "~", "B", [None]),
+        ],
+    )
+    def test_where(self, logs, name, op, value, expected):
+        """Test filtering with each kind of column and operator."""
+        filtered = logs.where(name, op, value)
+
+        assert list(filtered.columns[1]) == expected
+        assert filtered.total == filtered.size == len(expected)
+        assert len(logs) == 4
+
+    def test_where_errors(self, logs):
+        """Test that unknown operators and values of the wrong type are rejected."""
+        with pytest.raises(ValueError, match="Unknown operator"):
+            logs.where("status", "<>", "1")
+        with pytest.raises(ValueError, match="Not a number: abc"):
+            logs.where("status", "=", "abc")
+
+    def test_where_boolean(self):
+        """Test that boolean columns only compare to true or false."""
+        flags = ResultSet(["ok"], ["boolean"], [[True, False, None, True]])
+
+        assert len(flags.where("ok", "=", "TRUE")) == 2
+        assert len(flags.where("ok", "!=", "true")) == 1
+        with pytest.raises(ValueError, match="Not a boolean: yes, use true or false"):
+            flags.where("ok", "=", "yes")
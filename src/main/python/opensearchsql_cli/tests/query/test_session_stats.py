@@ -0,0 +1,85 @@
+"""
+Tests for Session Statistics.
+
+This module contains tests for the SessionStats class that displays the
+HTTP metrics recorded by the SQL library.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from rich.console import Console
+from opensearchsql_cli.query.session_stats import SessionStats
+
+
+def render(table):
+    """Render a Rich table to plain text."""
+    console = Console(width=200, record=True)
+    console.print(table)
+    return console.export_text()
+
+
+class TestSessionStats:
+    """
+    Test class for SessionStats functionality.
+    """
+
+    @pytest.mark.parametrize(
+        "size, expected",
+        [
+            (None, "0 B"),
+            (512, "512 B"),
+            (1536, "1.5 KiB"),
+            (3 * 1024 * 1024, "3.0 MiB"),
+            (5 * 1024**4, "5120.0 GiB"),
+        ],
+    )
+    def test_format_bytes(self, size, expected):
+        """Test byte counts with binary units."""
+        assert SessionStats.format_bytes(size) == expected
+
+    def test_display_stats(self):
+        """Test the session totals and the per-query breakdown."""
+        connection = MagicMock()
+        connection.get_http_stats.return_value = {
+            "session": {
+                "requests": 4,
+                "request_bytes": 2048,
+                "response_bytes": 10240,
+                "total_latency_ms": 100.0,
+                "max_latency_ms": 60.0,
+                "new_connections": 1,
+                "tls_handshakes": 1,
+                "reused_connections": 3,
+            },
+            "queries": [
+                {
+                    "query_id": "abc",
+                    "query": "select *\n  from accounts",
+                    "requests": 3,
+                    "total_latency_ms": 30.0,
+                }
+            ],
+        }
+        printed = []
+
+        result = SessionStats.display_stats(connection, printed.append)
+
+        assert result is True
+        session = render(printed[1])
+        assert "Average latency" in session
+        assert "25.0 ms" in session
+        assert "10.0 KiB" in session
+        queries = render(printed[3])
+        assert "select * from accounts" in queries
+        assert "10.0" in queries
+
+    def test_display_stats_unavailable(self):
+        """Test the message shown when the SQL library has no metrics."""
+        connection = MagicMock()
+        connection.get_http_stats.return_value = None
+        mock_print = MagicMock()
+
+        result = SessionStats.display_stats(connection, mock_print)
+
+        assert result is False
+        assert "not available" in mock_print.call_args[0][0]
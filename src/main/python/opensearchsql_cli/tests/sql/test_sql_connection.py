@@ -67,3 +67,104 @@ class TestSqlConnection:
         mock_java_gateway.assert_called_once()
 
         print(f"Result: {'Success' if result == expected_result else 'Failed'}")
+
+    @pytest.mark.parametrize(
+        "test_id, description, connected, side_effect, expected_result",
+        [
+            (1, "Tasks cancelled", True, [2], 2),
+            (2, "Not connected", False, [2], 0),
+            (3, "Gateway unreachable", True, Exception("Connection refused"), 0),
+        ],
+    )
+    def test_cancel_query(
+        self, test_id, description, connected, side_effect, expected_result
+    ):
+        """
+        Test the cancel_query method of SqlConnection.
+        """
+        print(f"\n=== Test Case #{test_id}: {description} ===")
+
+        connection = SqlConnection()
+        connection.sql_connected = connected
+        connection.sql_lib = MagicMock()
+        connection.sql_lib.entry_point.cancelQuery.side_effect = side_effect
+
+        result = connection.cancel_query()
+
+        assert result == expected_result
+        if not connected:
+            connection.sql_lib.entry_point.cancelQuery.assert_not_called()
+
+        print(f"Result: {'Success' if result == expected_result else 'Failed'}")
+
+    @pytest.mark.parametrize(
+        "test_id, description, connected, response, expected_result",
+        [
+            (
+                1,
+                "Retry stats parsed from the gateway",
+                True,
+                '{"retries": 2, "recovered": 1, "exhausted": 0, "last_query_retries": 2}',
+                {"retries": 2, "recovered": 1, "exhausted": 0, "last_query_retries": 2},
+            ),
+            (2, "No retry stats when not connected", False, None, None),
+            (3, "No retry stats on invalid response", True, "not json", None),
+        ],
+    )
+    def test_get_retry_stats(
+        self, test_id, description, connected, response, expected_result
+    ):
+        """
+        Test the get_retry_stats method of SqlConnection.
+        """
+        print(f"\n=== Test Case #{test_id}: {description} ===")
+
+        connection = SqlConnection()
+        connection.sql_connected = connected
+        connection.sql_lib = MagicMock()
+        connection.sql_lib.entry_point.getRetryStats.return_value = response
+
+        result = connection.get_retry_stats()
+
+        assert result == expected_result
+        if not connected:
+            connection.sql_lib.entry_point.getRetryStats.assert_not_called()
+
+        print(f"Result: {'Success' if result == expected_result else 'Failed'}")
+
+    @pytest.mark.parametrize(
+        "test_id, description, connected, error, expected_result",
+        [
+            (1, "Setting changed", True, "", (True, "")),
+            (
+                2,
+                "Setting rejected by the gateway",
+                True,
+                "Unknown session setting: foo",
+                (False, "Unknown session setting: foo"),
+            ),
+            (3, "Not connected", False, None, (False, "Not connected to SQL library")),
+        ],
+    )
+    def test_set_session_setting(
+        self, test_id, description, connected, error, expected_result
+    ):
+        """
+        Test the set_session_setting method of SqlConnection.
+        """
+        print(f"\n=== Test Case #{test_id}: {description} ===")
+
+        connection = SqlConnection()
+        connection.sql_connected = connected
+        connection.sql_lib = MagicMock()
+        connection.sql_lib.entry_point.setSessionSetting.return_value = error
+
+        result = connection.set_session_setting("request_cache", "off")
+
+        assert result == expected_result
+        if connected:
+            connection.sql_lib.entry_point.setSessionSetting.assert_called_once_with(
+                "request_cache", "off"
+            )
+
+        print(f"Result: {'Success' if result == expected_result else 'Failed'}")
@@ -88,3 +88,24 @@ class TestSqlLibraryManager:
 
         if thread_called:
             mock_thread.assert_called_once()
+
+    @patch("opensearchsql_cli.sql.sql_library_manager.JavaGateway")
+    def test_stop_shuts_down_gateway(self, mock_gateway_class, mock_process):
+        """
+        Test that stopping the SQL Library shuts down the Gateway client before killing it
+        """
+        mock_gateway = MagicMock()
+        mock_gateway_class.return_value = mock_gateway
+        calls = []
+        mock_gateway.entry_point.shutdown.side_effect = lambda: calls.append("shutdown")
+        mock_process.kill.side_effect = lambda: calls.append("kill")
+
+        manager = SqlLibraryManager()
+        manager.logger = MagicMock()
+        manager.process = mock_process
+        manager.started = True
+
+        assert manager.stop() is True
+        assert calls == ["shutdown", "kill"]
+        mock_gateway.close.assert_called_once()
+        assert manager.started is False
@@ -7,11 +7,13 @@ interactive shell functionality for OpenSearch SQL CLI.
 
 import os
 import pytest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock, call, ANY
 from prompt_toolkit.history import FileHistory
 from prompt_toolkit.shortcuts import PromptSession
 
 from ..interactive_shell import InteractiveShell
+from ..query.execute_query import ExecuteQuery
+from ..query.result_set import ResultSet
 from ..literals.opensearch_literals import Literals
 
 
@@ -145,6 +147,10 @@ class TestInteractiveShell:
         assert args[4] == "table"  # format
         assert args[5] is False  # is_vertical
 
+        # Verify the result is kept to display again, unless it is an explain plan
+        assert shell.latest_result == (None if is_explain else "formatted_result")
+        assert shell.latest_format == "table"
+
         # Verify result
         assert result is True
 
@@ -173,6 +179,138 @@ class TestInteractiveShell:
         # Verify result
         assert result is False
 
+    @patch("opensearchsql_cli.interactive_shell.console")
+    def test_display_retry_stats_rate_limits(self, mock_console):
+        """Test the -retries output with the rate limiter counters."""
+        shell = InteractiveShell(MagicMock(), MagicMock())
+        shell.sql_connection.get_retry_stats.return_value = {
+            "retries": 3,
+            "recovered": 2,
+            "exhausted": 1,
+            "last_query_retries": 0,
+            "rejections": 4,
+            "throttled": 12,
+            "requests_per_second_limit": 12.5,
+            "in_flight_limit": 2,
+        }
+
+        shell.display_retry_stats()
+
+        printed = " ".join(call.args[0] for call in mock_console.print.call_args_list)
+        assert "Rejected by the cluster:" in printed
+        assert "Throttled by the rate limiter:[/green] [dim white]12" in printed
+        assert "12.5 req/s, 2 in flight" in printed
+
+    @patch("opensearchsql_cli.interactive_shell.ResultBrowser")
+    @patch("opensearchsql_cli.interactive_shell.console")
+    def test_browse_result(self, mock_console, mock_result_browser):
+        """Test -b with the latest result, with a query and without a result."""
+        shell = InteractiveShell(MagicMock(), MagicMock())
+        shell.latest_query = "source=test"
+        shell.latest_result = latest = ResultSet(["a"], ["long"], [[1]])
+
+        shell.browse_result("-b")
+        mock_result_browser.from_result.assert_called_once_with(latest, "source=test")
+        mock_result_browser.from_result.return_value.run.assert_called_once()
+
+        mock_result_browser.reset_mock()
+        fetched = ResultSet(["b"], ["long"], [[2]])
+        with patch.object(
+            ExecuteQuery, "execute_query", return_value=(True, "result", fetched)
+        ) as mock_execute:
+            shell.browse_result("-b source=big | head 100000")
+        assert mock_execute.call_args.args[1] == "source=big | head 100000"
+        assert mock_execute.call_args.kwargs["display"] is False
+        assert mock_execute.call_args.kwargs["query_log"] is shell.query_log
+        assert mock_execute.call_args.kwargs["result_cache"] is shell.result_cache
+        mock_result_browser.from_result.assert_called_once_with(
+            fetched, "source=big | head 100000"
+        )
+        assert shell.latest_result is fetched
+
+        mock_result_browser.reset_mock()
+        with patch.object(
+            ExecuteQuery, "execute_query", return_value=(False, "error", "error")
+        ):
+            shell.browse_result("-b source=missing")
+        mock_result_browser.from_result.assert_not_called()
+
+        mock_result_browser.reset_mock()
+        mock_result_browser.from_result.return_value = None
+        shell.browse_result("-b")
+        assert "No result to browse" in mock_console.print.call_args[0][0]
+
+    @patch("opensearchsql_cli.interactive_shell.QueryResults")
+    @patch("opensearchsql_cli.interactive_shell.console")
+    def test_rerender_result(self, mock_console, mock_query_results):
+        """Test -r with a JSON result displayed again as CSV and without a result."""
+        shell = InteractiveShell(MagicMock(), MagicMock())
+        shell.format = "json"
+        shell.latest_query = "source=test"
+        shell.keep_result("source=test", True, '{"schema": [], "datarows": []}')
+        shell.format = "csv"
+
+        shell.rerender_result()
+
+        result_set, format, vertical, _ = mock_query_results.display_result.call_args[0]
+        assert isinstance(result_set, ResultSet)
+        assert (format, vertical) == ("csv", False)
+        assert shell.latest_result is result_set
+
+        shell.keep_result("source=test", False, "error")
+        shell.rerender_result()
+        assert "No result to display again" in mock_console.print.call_args[0][0]
+
+    @patch("opensearchsql_cli.interactive_shell.QueryResults")
+    @patch("opensearchsql_cli.interactive_shell.console")
+    def test_refine_result(self, mock_console, mock_query_results):
+        """Test that refinements chain over the latest result and -reset undoes them."""
+        shell = InteractiveShell(MagicMock(), MagicMock())
+        shell.latest_result = latest = ResultSet(
+            ["status", "host"],
+            ["integer", "keyword"],
+            [[500, 200, 500], ["a", "b", "c"]],
+        )
+
+        shell.refine_result("-where status=500")
+        shell.refine_result("-sort host desc")
+        shell.refine_result("-cols host")
+
+        view = mock_query_results.display_result.call_args[0][0]
+        assert view is shell.latest_view
+        assert list(view) == [("c",), ("a",)]
+        assert len(latest) == 3
+
+        shell.refine_result("-reset")
+        assert shell.latest_view is None
+        assert mock_query_results.display_result.call_args[0][0] is latest
+
+        shell.refine_result("-sort host sideways")
+        assert "Use -sort" in mock_console.print.call_args[0][0]
+        shell.refine_result("-where nope = 1")
+        assert "Unknown column: nope" in mock_console.print.call_args[0][0]
+        shell.refine_result("-where status = yes")
+        assert "Not a number: yes" in mock_console.print.call_args[0][0]
+        assert "Use -where" in mock_console.print.call_args[0][0]
+
+    @patch("opensearchsql_cli.interactive_shell.console")
+    def test_set_output(self, mock_console, tmp_path):
+        """Test that -o opens a file for the results and -o alone closes it."""
+        shell = InteractiveShell(MagicMock(), MagicMock())
+        path = tmp_path / "results.csv"
+
+        shell.set_output(f"-o {path}")
+        output = shell.output
+        assert output.name == str(path)
+
+        shell.set_output("-o")
+        assert output.closed
+        assert shell.output is None
+
+        shell.set_output(f"-o {tmp_path / 'missing' / 'results.csv'}")
+        assert shell.output is None
+        assert "Unable to open" in mock_console.print.call_args[0][0]
+
     @pytest.mark.parametrize(
         "language, format_option, expected_language_mode, expected_is_ppl, expected_format, is_language_valid, is_format_valid",
         [
@@ -234,9 +372,17 @@ class TestInteractiveShell:
             "[bold green]\nDisconnected. Goodbye!!!\n[/bold green]"
         )
 
+    @patch("opensearchsql_cli.interactive_shell.ResultCache")
+    @patch("opensearchsql_cli.interactive_shell.QueryLog")
     @patch("opensearchsql_cli.interactive_shell.PromptSession")
     @patch("opensearchsql_cli.interactive_shell.config_manager")
-    def test_start_command_processing(self, mock_config_manager, mock_prompt_session):
+    def test_start_command_processing(
+        self,
+        mock_config_manager,
+        mock_prompt_session,
+        mock_query_log,
+        mock_result_cache,
+    ):
         """Test start method command processing."""
         # Setup mocks
         mock_session = MagicMock()
@@ -250,21 +396,40 @@ class TestInteractiveShell:
             "-f json",
             "-f invalid",
             "-v",
+            "-t",
+            "-top 5",
+            "-cache",
+            "-cache clear",
+            "-cache off",
+            "-r",
+            "-sort name",
+            "-b",
             "-s --list",
             "-s --save test",
             "-s --load test",
             "-s --remove test",
             "-s",
+            "-retries",
+            "-stats",
+            "-set",
+            "-set request_cache off",
             "select * from test",
             "exit",
         ]
 
-        mock_config_manager.get_boolean.return_value = False
+        mock_config_manager.get_boolean.side_effect = (
+            lambda section, key, default=False: key == "query_log"
+        )
+        mock_config_manager.get.return_value = 1
 
         # Create shell with mocked dependencies
         shell = InteractiveShell(MagicMock(), MagicMock())
         shell.execute_query = MagicMock(return_value=True)
         shell.latest_query = "select * from test"
+        shell.sql_connection.get_session_settings.return_value = {
+            "request_cache": "true"
+        }
+        shell.sql_connection.set_session_setting.return_value = (True, "")
 
         # Configure the loading_query mock to return expected values
         shell.saved_queries.loading_query.return_value = (
@@ -285,6 +450,30 @@ class TestInteractiveShell:
         shell.saved_queries.loading_query.assert_called_once()
         shell.saved_queries.removing_query.assert_called_once_with("test")
 
+        # Verify retry stats and HTTP metrics were requested
+        shell.sql_connection.get_retry_stats.assert_called_once()
+        shell.sql_connection.get_http_stats.assert_called_once()
+
+        # Verify session settings were shown and changed
+        shell.sql_connection.get_session_settings.assert_called_once()
+        shell.sql_connection.set_session_setting.assert_called_once_with(
+            "request_cache", "off"
+        )
+
+        # Verify the timing breakdown was turned on
+        assert shell.show_timing is True
+
+        # Verify the query log was sized from the config and queried by -top
+        mock_query_log.assert_called_once_with(max_bytes=1024 * 1024)
+        mock_query_log.return_value.display_top.assert_called_once_with(5, ANY)
+
+        # Verify the result cache was shown, emptied, turned off and used by --load
+        cache = mock_result_cache.return_value
+        cache.display_stats.assert_called_once_with(ANY)
+        cache.clear.assert_called_once()
+        assert cache.enabled is False
+        assert shell.saved_queries.loading_query.call_args[1]["result_cache"] is cache
+
         # Verify query execution
         shell.execute_query.assert_called_once_with("select * from test")
 
@@ -0,0 +1,88 @@
+/*
+ * Copyright OpenSearch Contributors
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+package client;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertTimeoutPreemptively;
+
+import com.sun.net.httpserver.HttpExchange;
+import com.sun.net.httpserver.HttpServer;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.net.InetSocketAddress;
+import java.nio.charset.StandardCharsets;
+import java.time.Duration;
+import java.util.List;
+import java.util.concurrent.CopyOnWriteArrayList;
+import org.apache.hc.core5.http.HttpHost;
+import org.junit.jupiter.api.AfterEach;
+import org.junit.jupiter.api.BeforeEach;
+import org.junit.jupiter.api.Test;
+import org.opensearch.client.RestClient;
+import org.opensearch.client.RestHighLevelClient;
+
+/** Cancelling a query must not wait for the in-flight slots the query itself holds. */
+class CancelTasksTest {
+
+  private static final String TASKS =
+      "{\"tasks\": [{\"node\": \"n1\", \"id\": 7, \"cancellable\": true,"
+          + " \"headers\": {\"X-Opaque-Id\": \"query-1\"}},"
+          + " {\"node\": \"n1\", \"id\": 8, \"cancellable\": true,"
+          + " \"headers\": {\"X-Opaque-Id\": \"other\"}}]}";
+
+  private final List<String> requests = new CopyOnWriteArrayList<>();
+  private HttpServer server;
+  private OpenSearchRestClientImpl client;
+
+  @BeforeEach
+  void setUp() throws IOException {
+    server = HttpServer.create(new InetSocketAddress("localhost", 0), 0);
+    server.createContext(
+        "/_tasks",
+        exchange -> {
+          requests.add(exchange.getRequestMethod() + " " + exchange.getRequestURI().getPath());
+          respond(exchange, "GET".equals(exchange.getRequestMethod()) ? TASKS : "{}");
+        });
+    server.start();
+
+    RestHighLevelClient restClient =
+        new RestHighLevelClient(
+            RestClient.builder(new HttpHost("http", "localhost", server.getAddress().getPort())));
+    client =
+        new OpenSearchRestClientImpl(
+            restClient, ClientOptions.builder().maxInFlightRequests(1).build());
+  }
+
+  @AfterEach
+  void tearDown() throws IOException {
+    client.close();
+    server.stop(0);
+  }
+
+  @Test
+  void cancelTasksDoesNotWaitForHeldSlot() throws InterruptedException {
+    // The query being cancelled holds the only in-flight slot
+    client.getRateLimiter().acquire();
+    try {
+      int cancelled =
+          assertTimeoutPreemptively(Duration.ofSeconds(5), () -> client.cancelTasks("query-1"));
+
+      assertEquals(1, cancelled);
+      assertEquals(List.of("GET /_tasks", "POST /_tasks/n1:7/_cancel"), requests);
+    } finally {
+      client.getRateLimiter().release();
+    }
+  }
+
+  private static void respond(HttpExchange exchange, String body) throws IOException {
+    byte[] bytes = body.getBytes(StandardCharsets.UTF_8);
+    exchange.getResponseHeaders().add("Content-Type", "application/json");
+    exchange.sendResponseHeaders(200, bytes.length);
+    try (OutputStream out = exchange.getResponseBody()) {
+      out.write(bytes);
+    }
+  }
+}